@@ -14,7 +14,7 @@ class FileExplorerApp:
             [
                 sg.Button('Up'), sg.Button('New Folder'), sg.Button('New File'),
                 sg.Button('Write File'), sg.Button('Encrypt'), sg.Button('Decrypt'), sg.Button('Delete'),
-                sg.Button('Refresh'), sg.Button('Close')
+                sg.Button('Search'), sg.Button('Refresh'), sg.Button('Close')
             ]
         ]
         self.window = sg.Window('File Explorer', self.layout, finalize=True)
@@ -59,6 +59,9 @@ class FileExplorerApp:
                     entries.append(f'[FILE] {entry_name}')
         return sorted(entries)
 
+    def _child_path(self, name):
+        return '/' + name if self.current_path == '/' else self.current_path.rstrip('/') + '/' + name
+
     def _get_selected_item_details(self, values):
         if not values['-FILELIST-']:
             return None, None, None # full_path, entry_name_only, entry_obj
@@ -98,6 +101,12 @@ class FileExplorerApp:
             self.window['-FILELIST-'].update(self._get_entries(self.current_path))
             self.window['-CURPATH-'].update(self.current_path)
 
+        elif event == 'Search':
+            query = sg.popup_get_text("Search for (part of a name, or a pattern like *.txt):")
+            if query:
+                results = self.fs.search(name=query, path=self.current_path)
+                sg.popup_scrolled('\n'.join(results) if results else "No matches.", title=f"Search: {query}")
+
         elif event == 'Up':
             if self.current_path != '/':
                 self.current_path = os.path.dirname(self.current_path.rstrip('/'))
@@ -136,7 +145,7 @@ class FileExplorerApp:
                 if folder_name in dir_obj.entries:
                     sg.popup_error("A file or folder with that name already exists.")
                 else:
-                    dir_obj.entries[folder_name] = Directory(folder_name)
+                    self.fs.mkdir(self._child_path(folder_name))
                     self.fs.save()
                     self.window['-FILELIST-'].update(self._get_entries(self.current_path))
 
@@ -147,7 +156,7 @@ class FileExplorerApp:
                 if file_name in dir_obj.entries:
                     sg.popup_error("A file or folder with that name already exists.")
                 else:
-                    dir_obj.entries[file_name] = File(file_name, "")
+                    self.fs.create_file(self._child_path(file_name))
                     self.fs.save()
                     self.window['-FILELIST-'].update(self._get_entries(self.current_path))
 
@@ -158,8 +167,14 @@ class FileExplorerApp:
                 return
             confirm = sg.popup_yes_no(f"Delete '{entry_name_only}'?")
             if confirm == 'Yes':
-                parent_dir_obj, item_name_in_parent = self.fs._resolve(full_path)
-                del parent_dir_obj.entries[item_name_in_parent]
+                try:
+                    if isinstance(entry_obj, Directory):
+                        self.fs.rmdir(full_path)
+                    else:
+                        self.fs.delete_file(full_path)
+                except OSError as e:
+                    sg.popup_error(f"Delete failed: {e}")
+                    return
                 self.fs.save()
                 self.window['-FILELIST-'].update(self._get_entries(self.current_path))
 
@@ -168,7 +183,7 @@ class FileExplorerApp:
             if isinstance(entry_obj, File) and not entry_obj.encrypted:
                 password = sg.popup_get_text("Enter password to encrypt:")
                 if password:
-                    entry_obj.encrypt(password)
+                    self.fs.encrypt_file(full_path, password)
                     self.fs.save()
                     self.window['-FILELIST-'].update(self._get_entries(self.current_path))
             else:
@@ -180,7 +195,7 @@ class FileExplorerApp:
                 password = sg.popup_get_text("Enter password to decrypt:")
                 if password:
                     try:
-                        entry_obj.decrypt(password)
+                        self.fs.decrypt_file(full_path, password)
                         self.fs.save()
                         self.window['-FILELIST-'].update(self._get_entries(self.current_path))
                     except Exception as e:
@@ -203,7 +218,7 @@ class FileExplorerApp:
                         current_content = str(current_content)
                 new_content = sg.popup_get_text(f"Edit file: {entry_name_only}", default_text=current_content)
                 if new_content is not None:
-                    entry_obj.write(new_content.encode())
+                    self.fs.write_file(full_path, new_content.encode())
                     self.fs.save()
                     self.window['-FILELIST-'].update(self._get_entries(self.current_path))
             else:
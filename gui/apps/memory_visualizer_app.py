@@ -1,6 +1,6 @@
 import PySimpleGUI as sg
 from os_core.memory_manager import MemoryManager
-from os_core.process import PCB
+from os_core.process import PCB, PidAllocator
 
 class MemoryVisualizerApp:
     def _show_settings_dialog(self):
@@ -66,7 +66,7 @@ class MemoryVisualizerApp:
             self.window['-PAGE_TABLE_DISPLAY-'].update("")
 
     def __init__(self):
-        PCB.reset_pid_counter()
+        self.pids = PidAllocator()
 
         initial_settings = self._show_settings_dialog()
 
@@ -194,11 +194,13 @@ class MemoryVisualizerApp:
                 if mem_req_bytes <= 0:
                     sg.popup_error("Memory requirement must be positive.", title="Input Error")
                     return
-                new_pcb = PCB(name=name_prefix, memory_requirements_bytes=mem_req_bytes, page_size=self.mm.page_size)
+                new_pcb = PCB(name=name_prefix, memory_requirements_bytes=mem_req_bytes, page_size=self.mm.page_size,
+                              pids=self.pids)
                 if self.mm.allocate_memory(new_pcb):
                     self.simulated_processes[new_pcb.pid] = new_pcb
                     self._update_process_list_display()
                 else:
+                    self.pids.release(new_pcb.pid)
                     sg.popup_error(f"Failed to allocate memory for PID {new_pcb.pid}.\nNot enough memory or other issue.", title="Allocation Error")
             except ValueError:
                 sg.popup_error("Invalid memory requirement. Must be an integer.", title="Input Error")
@@ -217,6 +219,7 @@ class MemoryVisualizerApp:
                     if self.mm.deallocate_memory(pid_to_dealloc):
                         if pid_to_dealloc in self.simulated_processes:
                             del self.simulated_processes[pid_to_dealloc]
+                            self.pids.release(pid_to_dealloc)
                         self._update_process_list_display()
                         self._update_selected_process_info(None)
                     else:
@@ -1,23 +1,31 @@
 import PySimpleGUI as sg
-from os_core.process import PCB
-from os_core.scheduler import FIFOScheduler, RoundRobinScheduler, MLFQScheduler
+from os_core.scheduler import (FIFOScheduler, RoundRobinScheduler, MLFQScheduler, SJFScheduler, SRTFScheduler,
+                                PriorityScheduler, LotteryScheduler, StrideScheduler, CFSScheduler)
+from os_core.simulation import SchedulerSimulation
+from os_core.metrics import MetricsCollector
 
 class ProcessManagerVisualizerApp:
+    EXTRA_SCHEDULER_EVENTS = {
+        "-SJF-": "SJF", "-SRTF-": "SRTF", "-PRIO-": "Priority",
+        "-LOTTERY-": "Lottery", "-STRIDE-": "Stride", "-CFS-": "CFS",
+    }
+    QUEUE_PAGE_SIZE = 20 # PCBs rendered per queue; the rest are summarized as "... N more"
+
     def __init__(self):
-        PCB.reset_pid_counter()
-        self.processes = {} # pid: PCB
-        self.scheduler = FIFOScheduler()
+        self.metrics = MetricsCollector()
+        self.sim = SchedulerSimulation(FIFOScheduler(), observers=[self.metrics])
         self.current_scheduler_type = "FIFO"
-        self.running_process = None
-        self.current_time_slice = 0
-        self.time_slice_elapsed = 0
         self.simulation_time = 0
+        self.queue_page = 0
 
         scheduler_selection_layout = [
             sg.Radio("FIFO", "SCHEDULER", key="-FIFO-", default=True, enable_events=True),
             sg.Radio("Round Robin", "SCHEDULER", key="-RR-", enable_events=True),
             sg.Radio("MLFQ", "SCHEDULER", key="-MLFQ-", enable_events=True)
         ]
+        extra_scheduler_selection_layout = [
+            sg.Radio(name, "SCHEDULER", key=key, enable_events=True) for key, name in self.EXTRA_SCHEDULER_EVENTS.items()
+        ]
 
         process_creation_layout = [
             sg.Text("Name:"), sg.Input("P", size=(3,1), key="-PROC_NAME_PREFIX-"),
@@ -28,6 +36,7 @@ class ProcessManagerVisualizerApp:
         simulation_controls_layout = [
             sg.Button("Next Step", key="-NEXT_STEP-"),
             sg.Button("Reset Sim", key="-RESET_SIM-"),
+            sg.Text("Switch cost:"), sg.Input("0", size=(3,1), key="-SWITCH_COST-"),
             sg.Text(f"Time: {self.simulation_time}", key="-SIM_TIME-", size=(10,1))
         ]
 
@@ -35,13 +44,16 @@ class ProcessManagerVisualizerApp:
             [sg.Text("Running: None", key="-RUNNING_PROC-", size=(40,1))],
             [sg.Text("Finished Processes:", key="-FINISHED_HEADER-")],
             [sg.Multiline("", key="-FINISHED_PROCS-", size=(40,3), disabled=True, autoscroll=True)],
-            [sg.Text("Ready Queues:", key="-QUEUES_HEADER-")],
+            [sg.Text("", key="-METRICS-", size=(40,3))],
+            [sg.Text("Ready Queues:", key="-QUEUES_HEADER-", size=(25,1)),
+             sg.Button("<", key="-QUEUE_PREV-"), sg.Button(">", key="-QUEUE_NEXT-")],
             [sg.Multiline("", key="-QUEUES-", size=(40, 5), disabled=True, autoscroll=True)]
         ]
 
         layout = [
             [sg.Text("Process Scheduling Visualizer", font=("Helvetica", 16))],
             [scheduler_selection_layout],
+            [extra_scheduler_selection_layout],
             [process_creation_layout],
             [sg.Frame("Status", status_layout)],
             [simulation_controls_layout],
@@ -56,76 +68,76 @@ class ProcessManagerVisualizerApp:
             return
 
         self.current_scheduler_type = scheduler_type
-        if scheduler_type == "FIFO":
-            self.scheduler = FIFOScheduler()
-        elif scheduler_type == "Round Robin":
-            self.scheduler = RoundRobinScheduler(time_quantum=5) # Default TQ for RR
-        elif scheduler_type == "MLFQ":
-            self.scheduler = MLFQScheduler(levels=3, time_quanta=[3, 6, 9]) # Default TQs for MLFQ
-
-        # Re-add existing non-terminated processes to the new scheduler
-        # Terminated processes should not be re-added.
-        # Running process needs special handling if scheduler changes mid-run.
-        # For simplicity, we'll clear running and re-add all non-finished.
-        
-        temp_processes_to_readd = []
-        if self.running_process:
-            self.running_process.state = 'READY' # Mark as ready to be re-added
-            self.running_process.time_in_current_quantum = 0
-            temp_processes_to_readd.append(self.running_process)
-            self.running_process = None
-            self.current_time_slice = 0
-            self.time_slice_elapsed = 0
-            self.window["-RUNNING_PROC-"].update("Running: None")
-
-
-        for pid, pcb in list(self.processes.items()): # Iterate over a copy for modification
-            if pcb.state != 'TERMINATED':
-                temp_processes_to_readd.append(pcb)
-        
-        # Clear internal queues of the old scheduler if possible (or just let it be GC'd)
-        # Then add to new scheduler
-        for pcb in temp_processes_to_readd:
-            if pcb.state != 'TERMINATED': # Double check
-                 # For MLFQ, add to the highest priority queue by default when switching
-                if isinstance(self.scheduler, MLFQScheduler):
-                    self.scheduler.add_process(pcb, level=0)
-                else:
-                    self.scheduler.add_process(pcb)
-
+        self.sim.set_scheduler(self._make_scheduler(scheduler_type))
+        self.window["-RUNNING_PROC-"].update("Running: None")
         self._update_queue_display()
 
+    def _make_scheduler(self, scheduler_type):
+        if scheduler_type == "Round Robin":
+            return RoundRobinScheduler(time_quantum=5) # Default TQ for RR
+        if scheduler_type == "MLFQ":
+            return MLFQScheduler(levels=3, time_quanta=[3, 6, 9], boost_interval=50) # Default TQs for MLFQ
+        if scheduler_type == "SJF":
+            return SJFScheduler()
+        if scheduler_type == "SRTF":
+            return SRTFScheduler()
+        if scheduler_type == "Priority":
+            return PriorityScheduler(preemptive=True)
+        if scheduler_type == "Lottery":
+            return LotteryScheduler(time_quantum=5)
+        if scheduler_type == "Stride":
+            return StrideScheduler(time_quantum=5)
+        if scheduler_type == "CFS":
+            return CFSScheduler()
+        return FIFOScheduler()
 
     def _update_queue_display(self):
-        if hasattr(self.scheduler, 'get_all_queues_str_list'):
-            queues_str = "\n".join(self.scheduler.get_all_queues_str_list())
+        scheduler = self.sim.scheduler
+        if hasattr(scheduler, 'get_all_queues_str_list'):
+            queues_str = "\n".join(scheduler.get_all_queues_str_list(max_items=self.QUEUE_PAGE_SIZE, page=self.queue_page))
             self.window["-QUEUES-"].update(queues_str)
+            self.window["-QUEUES_HEADER-"].update(f"Ready Queues ({scheduler.summary()['ready']}), page {self.queue_page + 1}:")
         else: # Fallback for schedulers not implementing the new method
             self.window["-QUEUES-"].update("Queue display not available for this scheduler.")
 
     def _update_finished_display(self):
-        finished_text = "\n".join([f"PID {pid}: {pcb.name}" for pid, pcb in self.processes.items() if pcb.state == 'TERMINATED'])
+        finished_text = "\n".join([f"PID {pid}: {pcb.name}" for pid, pcb in self.sim.processes.items() if pcb.state == 'TERMINATED'])
         self.window["-FINISHED_PROCS-"].update(finished_text)
-
-    def _reset_simulation(self):
-        PCB.reset_pid_counter()
-        self.processes.clear()
-        self.running_process = None
-        self.current_time_slice = 0
-        self.time_slice_elapsed = 0
+        self._update_metrics_display()
+
+    def _update_metrics_display(self):
+        summary = self.metrics.summary()
+        utilization = self.sim.busy_time / self.sim.time if self.sim.time else 0.0
+        lines = [f"Done: {summary['completed']}  CPU: {utilization:.0%}  Switches: {summary['context_switches']}"]
+        for key in ('waiting', 'turnaround'):
+            stats = summary[key]
+            if stats['count']:
+                lines.append(f"{key.capitalize()} p50/p95/p99: {stats['p50']:g}/{stats['p95']:g}/{stats['p99']:g}")
+        self.window["-METRICS-"].update("\n".join(lines))
+
+    def _reset_simulation(self, context_switch_cost=0):
+        self.metrics = MetricsCollector() # A new simulation also starts a new PID namespace
+        self.sim = SchedulerSimulation(self._make_scheduler(self.current_scheduler_type), observers=[self.metrics],
+                                       context_switch_cost=context_switch_cost)
         self.simulation_time = 0
-        # Re-initialize scheduler based on current selection
-        self._select_scheduler(self.current_scheduler_type) # This will clear and set up the chosen scheduler
-        # If _select_scheduler doesn't re-instantiate, do it manually:
-        # if self.current_scheduler_type == "FIFO": self.scheduler = FIFOScheduler()
-        # elif self.current_scheduler_type == "Round Robin": self.scheduler = RoundRobinScheduler(time_quantum=5)
-        # elif self.current_scheduler_type == "MLFQ": self.scheduler = MLFQScheduler(levels=3, time_quanta=[3, 6, 9])
 
         self.window["-RUNNING_PROC-"].update("Running: None")
         self.window["-SIM_TIME-"].update(f"Time: {self.simulation_time}")
         self._update_queue_display()
         self._update_finished_display()
 
+    def _running_status(self):
+        pcb = self.sim.last_process
+        if self.sim.last_event == 'finished':
+            return f"Running: {pcb.name} (PID {pcb.pid}) - Finished!"
+        if self.sim.last_event == 'expired':
+            return f"Running: {pcb.name} (PID {pcb.pid}) - Quantum Expired"
+        pcb = self.sim.running_process
+        if pcb is None:
+            return "Running: None (Idle)"
+        slice_remaining = self.sim.current_time_slice - self.sim.time_slice_elapsed
+        return f"Running: {pcb.name} (PID {pcb.pid}) - Rem: {pcb.remaining_time}, SliceRem: {slice_remaining}"
+
     def handle_event(self, event, values): # run metodu handle_event olarak değiştirildi
         if event in (sg.WIN_CLOSED, "Close"):
             return 'close'
@@ -136,6 +148,8 @@ class ProcessManagerVisualizerApp:
             self._select_scheduler("Round Robin")
         elif event == "-MLFQ-":
             self._select_scheduler("MLFQ")
+        elif event in self.EXTRA_SCHEDULER_EVENTS:
+            self._select_scheduler(self.EXTRA_SCHEDULER_EVENTS[event])
 
         elif event == "-CREATE_PROC-":
             try:
@@ -143,78 +157,40 @@ class ProcessManagerVisualizerApp:
                 if burst_time <= 0:
                     sg.popup_error("Burst time must be positive.")
                     return None
-                
-                # Define a default page_size for processes in this visualizer.
-                # This app focuses on CPU scheduling; memory details are secondary here.
-                # Processes created here have memory_requirements_bytes=0.
-                default_page_size_for_scheduler = 4096 
-
-                pcb = PCB(name=f"{values['-PROC_NAME_PREFIX-']}{PCB._pid_counter.__reduce__()[1][0]}",
-                          memory_requirements_bytes=0, 
-                          page_size=default_page_size_for_scheduler, # MODIFIED: Added page_size
-                          burst_time=burst_time)
-                self.processes[pcb.pid] = pcb
-                
-                if isinstance(self.scheduler, MLFQScheduler):
-                    self.scheduler.add_process(pcb, level=0) 
-                else:
-                    self.scheduler.add_process(pcb)
+
+                prefix = values['-PROC_NAME_PREFIX-']
+                pcb = self.sim.add_process(prefix, burst_time)
+                pcb.name = f"{prefix}{pcb.pid}"
                 self._update_queue_display()
             except ValueError:
                 sg.popup_error("Invalid burst time. Must be an integer.")
 
         elif event == "-RESET_SIM-":
-            self._reset_simulation()
+            try:
+                context_switch_cost = int(values["-SWITCH_COST-"])
+                if context_switch_cost < 0:
+                    raise ValueError
+            except ValueError:
+                sg.popup_error("Switch cost must be a non-negative integer.")
+                return None
+            self._reset_simulation(context_switch_cost) # Switch cost applies from the next run
+
+        elif event in ("-QUEUE_PREV-", "-QUEUE_NEXT-"):
+            longest = max(self.sim.scheduler.queue_lengths(), default=0)
+            last_page = max(0, (longest - 1) // self.QUEUE_PAGE_SIZE)
+            step = -1 if event == "-QUEUE_PREV-" else 1
+            self.queue_page = max(0, min(self.queue_page + step, last_page))
+            self._update_queue_display()
 
         elif event == "-NEXT_STEP-":
-            self.simulation_time += 1
+            event_name = self.sim.step()
+            self.simulation_time = self.sim.time
             self.window["-SIM_TIME-"].update(f"Time: {self.simulation_time}")
-
-            if self.running_process:
-                self.running_process.remaining_time -= 1
-                self.running_process.time_in_current_quantum +=1
-                self.time_slice_elapsed +=1
-
-                if self.running_process.remaining_time <= 0:
-                    self.running_process.state = 'TERMINATED'
-                    self.window["-RUNNING_PROC-"].update(f"Running: {self.running_process.name} (PID {self.running_process.pid}) - Finished!")
-                    self._update_finished_display()
-                    self.running_process = None
-                    self.time_slice_elapsed = 0
-                elif self.time_slice_elapsed >= self.current_time_slice:
-                    if isinstance(self.scheduler, RoundRobinScheduler):
-                        self.running_process.state = 'READY'
-                        self.running_process.time_in_current_quantum = 0
-                        self.scheduler.add_process(self.running_process) 
-                    elif isinstance(self.scheduler, MLFQScheduler):
-                        self.running_process.state = 'READY'
-                        original_level = -1
-                        for i, tq in enumerate(self.scheduler.time_quanta):
-                            if tq == self.current_time_slice: 
-                                original_level = i
-                                break
-                        
-                        new_level = min(original_level + 1, self.scheduler.levels - 1) if original_level != -1 else 0
-                        self.running_process.time_in_current_quantum = 0
-                        self.scheduler.add_process(self.running_process, level=new_level)
-
-                    self.window["-RUNNING_PROC-"].update(f"Running: {self.running_process.name} (PID {self.running_process.pid}) - Quantum Expired")
-                    self.running_process = None
-                    self.time_slice_elapsed = 0
-                else:
-                    self.window["-RUNNING_PROC-"].update(f"Running: {self.running_process.name} (PID {self.running_process.pid}) - Rem: {self.running_process.remaining_time}, SliceRem: {self.current_time_slice - self.time_slice_elapsed}")
-
-            if not self.running_process:
-                next_proc, time_slice = self.scheduler.get_next()
-                if next_proc:
-                    self.running_process = next_proc
-                    self.current_time_slice = time_slice if time_slice != float('inf') else self.running_process.remaining_time
-                    self.time_slice_elapsed = 0
-                    self.running_process.time_in_current_quantum = 0
-                    self.window["-RUNNING_PROC-"].update(f"Running: {self.running_process.name} (PID {self.running_process.pid}) - Rem: {self.running_process.remaining_time}, SliceRem: {self.current_time_slice - self.time_slice_elapsed}")
-                else:
-                    self.window["-RUNNING_PROC-"].update("Running: None (Idle)")
-            
+            self.window["-RUNNING_PROC-"].update(self._running_status())
+            if event_name == 'finished':
+                self._update_finished_display()
+            else:
+                self._update_metrics_display()
             self._update_queue_display()
         return None # handle_event metodundan None döndür
 
@@ -33,6 +33,42 @@ class TerminalApp:
     def _print_prompt(self):
         self._print(self._prompt(), end='')
 
+    def _path(self, arg):
+        """Absolute path of a command argument, relative to the current directory."""
+        if arg.startswith('/'):
+            return arg
+        return self.cwd.rstrip('/') + '/' + arg if self.cwd != '/' else '/' + arg
+
+    def _find_args(self, args):
+        """Parses `[path] [-name PATTERN] [-ext EXT] [-type f|d] [-size [+|-]N]` into keyword arguments.
+
+        `-size +N` is at least N bytes, `-size -N` at most N and `-size N`
+        exactly N. Malformed arguments raise IndexError or ValueError.
+        """
+        options = {'path': self.cwd}
+        i = 0
+        while i < len(args):
+            if args[i] == '-name':
+                options['name'] = args[i + 1]
+            elif args[i] == '-ext':
+                options['ext'] = args[i + 1]
+            elif args[i] == '-type':
+                options['kind'] = args[i + 1]
+            elif args[i] == '-size':
+                size = args[i + 1]
+                sign = size[0] if size[:1] in ('+', '-') else ''
+                value = int(size[len(sign):])
+                if sign != '-':
+                    options['min_size'] = value
+                if sign != '+':
+                    options['max_size'] = value
+            else:
+                options['path'] = self._path(args[i])
+                i += 1
+                continue
+            i += 2
+        return options
+
     def _handle_command(self, cmd):
         parts = cmd.strip().split()
         if not parts:
@@ -108,6 +144,19 @@ class TerminalApp:
                 self._print(f"Error: {e}")
             except Exception as e:
                 self._print(f"Error reading file: {e}")
+        elif parts[0] == 'echo' and '>>' in parts:
+            try:
+                idx = parts.index('>>')
+                text = ' '.join(parts[1:idx])
+                path = self._path(parts[idx+1])
+                with self.fs.open(path, 'a') as f:
+                    f.write((text + '\n').encode('utf-8'))
+                self.fs.save()
+                self._print(f"Appended to {path}")
+            except IndexError:
+                self._print("Error: No filename specified after >>")
+            except Exception as e:
+                self._print(f"Error: {e}")
         elif parts[0] == 'echo' and '>' in parts:
             try:
                 idx = parts.index('>')
@@ -132,21 +181,30 @@ class TerminalApp:
                 self._print("Error: No filename specified after >")
             except Exception as e:
                 self._print(f"Error: {e}")
-        elif parts[0] == 'run' and len(parts) > 1 and parts[1].endswith('.py'):
-            path = parts[1] if parts[1].startswith('/') else (self.cwd.rstrip('/') + '/' + parts[1] if self.cwd != '/' else '/' + parts[1])
+        elif parts[0] == 'run' and len(parts) > 1 and parts[-1].endswith('.py'):
+            sandboxed = parts[1] == '--sandbox'
+            script = parts[-1]
+            path = self._path(script)
             try:
                 content_bytes, _ = self.fs.read_file(path, decrypt_if_able=True)
                 code = content_bytes.decode('utf-8')
+                # With --sandbox the script gets an O(1) copy-on-write clone and its changes are discarded
+                script_globals = {'__name__': '__main__', 'fs': self.fs.clone() if sandboxed else self.fs,
+                                  'cwd': self.cwd}
                 
                 old_stdout = sys.stdout
                 redirected_output = io.StringIO()
                 sys.stdout = redirected_output
                 try:
-                    exec(code, {'__name__': '__main__', 'fs': self.fs, 'cwd': self.cwd})
+                    exec(code, script_globals)
                 except Exception as e:
-                    print(f"Runtime error in {parts[1]}: {e}", file=sys.stderr)
+                    print(f"Runtime error in {script}: {e}", file=sys.stderr)
                 finally:
                     sys.stdout = old_stdout
+                if sandboxed:
+                    # Drop the clone, then reclaim the blocks only it was keeping alive
+                    script_globals.clear()
+                    self.fs.gc()
                 
                 output_val = redirected_output.getvalue()
                 if output_val:
@@ -156,6 +214,85 @@ class TerminalApp:
             except Exception as e:
                 self._print(f"Error running script: {e}")
 
+        elif parts[0] in ('cp', 'mv') and len(parts) > 2:
+            recursive = parts[1] == '-r'
+            args = parts[2:] if recursive else parts[1:]
+            try:
+                src, dst = self._path(args[0]), self._path(args[1])
+                if parts[0] == 'mv':
+                    self.fs.rename(src, dst)
+                elif recursive:
+                    self.fs.copy(src, dst)
+                else:
+                    self.fs.copy_file(src, dst)
+                self.fs.save()
+            except IndexError:
+                self._print(f"Usage: {parts[0]} {'[-r] ' if parts[0] == 'cp' else ''}<source> <destination>")
+            except Exception as e:
+                self._print(f"Error: {e}")
+        elif parts[0] == 'rm' and len(parts) > 1:
+            try:
+                if parts[1] == '-r':
+                    self.fs.remove(self._path(parts[2]))
+                else:
+                    self.fs.delete_file(self._path(parts[1]))
+                self.fs.save()
+            except IndexError:
+                self._print("Usage: rm [-r] <path>")
+            except Exception as e:
+                self._print(f"Error: {e}")
+        elif parts[0] == 'du':
+            try:
+                size, files = self.fs.du(self._path(parts[1]) if len(parts) > 1 else self.cwd)
+                self._print(f"{size} bytes in {files} file(s)")
+            except Exception as e:
+                self._print(f"Error: {e}")
+        elif parts[0] == 'find':
+            try:
+                options = self._find_args(parts[1:])
+            except (IndexError, ValueError):
+                self._print("Usage: find [path] [-name PATTERN] [-ext EXT] [-type f|d] [-size [+|-]N]")
+            else:
+                try:
+                    self._print('\n'.join(self.fs.search(**options)))
+                except Exception as e:
+                    self._print(f"Error: {e}")
+        elif parts[0] == 'locate' and len(parts) > 1:
+            results = self.fs.search(name=' '.join(parts[1:]))
+            self._print('\n'.join(results) if results else f"No matches for '{' '.join(parts[1:])}'")
+        elif parts[0] == 'tree':
+            try:
+                for dirpath, dirnames, filenames in self.fs.walk(self._path(parts[1]) if len(parts) > 1 else self.cwd):
+                    depth = dirpath.count('/') if dirpath != '/' else 0
+                    self._print('  ' * depth + (dirpath.rsplit('/', 1)[-1] or '/') + '/')
+                    for name in filenames:
+                        self._print('  ' * (depth + 1) + name)
+            except Exception as e:
+                self._print(f"Error: {e}")
+        elif parts[0] == 'snapshot' and len(parts) > 1:
+            try:
+                self.fs.snapshot(parts[1])
+                self._print(f"Snapshot '{parts[1]}' created (in memory only; lost when the filesystem is reloaded)")
+            except Exception as e:
+                self._print(f"Error: {e}")
+        elif parts[0] == 'snapshots':
+            names = self.fs.snapshots()
+            self._print('\n'.join(names + ["(Snapshots are kept in memory only and lost on reload)"]) if names
+                        else "No snapshots (they are kept in memory only and lost on reload)")
+        elif parts[0] == 'rollback' and len(parts) > 1:
+            try:
+                if parts[1] not in self.fs.snapshots():
+                    raise FileNotFoundError(f"Snapshot not found: {parts[1]}")
+                # The rollback is checkpointed, so every change made after the snapshot is gone for good
+                if sg.popup_yes_no(f"Roll back to '{parts[1]}'? Changes made since the snapshot will be "
+                                   f"permanently lost.") != 'Yes':
+                    self._print("Rollback cancelled")
+                    return
+                self.fs.rollback(parts[1])
+                self.cwd = '/'
+                self._print(f"Rolled back to snapshot '{parts[1]}'")
+            except Exception as e:
+                self._print(f"Error: {e}")
         elif parts[0] == 'help':
             self._print(
                 "Available commands:\n"
@@ -166,7 +303,20 @@ class TerminalApp:
                 "  touch <file>      - Create a new empty file\n"
                 "  cat <file>        - Display file content (shows raw if encrypted)\n"
                 "  echo [text] > <file> - Write text to a file (overwrite)\n"
-                "  run <file.py>     - Execute a Python script from the filesystem (decrypts if needed)\n"
+                "  echo [text] >> <file> - Append a line of text to a file\n"
+                "  run [--sandbox] <file.py> - Execute a Python script from the filesystem (decrypts if needed);\n"
+                "                      with --sandbox it runs on a copy and its changes are discarded\n"
+                "  cp [-r] <src> <dst> - Copy a file, or a directory tree with -r\n"
+                "  mv <src> <dst>    - Move or rename a file or directory\n"
+                "  rm [-r] <path>    - Remove a file, or a directory tree with -r\n"
+                "  du [path]         - Show the size of a file or directory tree\n"
+                "  find [path] [-name PATTERN] [-ext EXT] [-type f|d] [-size [+|-]N] - Search for files\n"
+                "  locate <text>     - List every path whose name contains text\n"
+                "  tree [path]       - Show a directory tree\n"
+                "  snapshot <name>   - Take a snapshot of the filesystem (in memory only, lost on reload)\n"
+                "  snapshots         - List snapshots\n"
+                "  rollback <name>   - Restore the filesystem to a snapshot after confirmation;\n"
+                "                      changes made since the snapshot are permanently lost\n"
                 "  help              - Show this help message\n"
                 "  Up/Down Arrows    - Navigate command history"
             )
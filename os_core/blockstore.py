@@ -0,0 +1,125 @@
+import hashlib
+import random
+
+DEFAULT_BLOCK_SIZE = 64 * 1024
+CHUNKING_MODES = ('fixed', 'cdc')
+HASHES = ('blake2b', 'sha256')
+
+# Content-defined chunking: a gear rolling hash over the bytes; a block ends where the
+# low bits of the hash are all zero, so boundaries follow the content and an insertion
+# only changes the blocks around it. Blocks are kept between a quarter and four times
+# the target size.
+_rng = random.Random(0x6D696E69)  # Fixed seed: boundaries must not change between runs
+_GEAR = [_rng.getrandbits(64) for _ in range(256)]
+del _rng
+_MASK64 = (1 << 64) - 1
+
+
+def _digest(hash_name, data):
+    if hash_name == 'blake2b':
+        return hashlib.blake2b(data, digest_size=32).digest()
+    return hashlib.sha256(data).digest()
+
+
+class BlockStore:
+    """Content-addressed, reference-counted block storage shared by a file system.
+
+    `put()` splits data into blocks (fixed-size, or content-defined with
+    `chunking='cdc'`), stores every distinct block once under its hash and
+    returns the digests. Each digest handed out holds one reference: `ref()`
+    adds references (e.g. for a copy) and `release()` drops them, freeing a
+    block when its count reaches zero.
+    """
+
+    def __init__(self, chunking='fixed', block_size=DEFAULT_BLOCK_SIZE, hash_name='blake2b'):
+        if chunking not in CHUNKING_MODES:
+            raise ValueError(f"chunking must be one of {CHUNKING_MODES}.")
+        if hash_name not in HASHES:
+            raise ValueError(f"hash_name must be one of {HASHES}.")
+        if block_size <= 0:
+            raise ValueError("block_size must be positive.")
+        self.chunking = chunking
+        self.block_size = block_size
+        self.hash_name = hash_name
+        self._blocks = {}  # digest: bytes
+        self._refs = {}  # digest: reference count
+        self.stored_bytes = 0  # Bytes of distinct blocks
+        self.logical_bytes = 0  # Bytes referenced, counting every reference
+
+    def split(self, data):
+        """Yields the block boundaries of `data` as memoryview slices."""
+        view = memoryview(data)
+        if self.chunking == 'fixed':
+            for start in range(0, len(view), self.block_size):
+                yield view[start:start + self.block_size]
+            return
+        min_size, max_size = max(1, self.block_size // 4), self.block_size * 4
+        mask = (1 << max(1, self.block_size.bit_length() - 1)) - 1
+        gear = _GEAR
+        start = 0
+        h = 0
+        for i, byte in enumerate(view):
+            h = ((h << 1) + gear[byte]) & _MASK64
+            size = i + 1 - start
+            if (size >= min_size and not h & mask) or size >= max_size:
+                yield view[start:i + 1]
+                start = i + 1
+                h = 0
+        if start < len(view):
+            yield view[start:]
+
+    def put(self, data):
+        """Stores `data` and returns its block digests, holding one reference to each."""
+        digests = []
+        for block in self.split(data):
+            digest = _digest(self.hash_name, block)
+            if digest not in self._blocks:
+                self._blocks[digest] = bytes(block)
+                self._refs[digest] = 0
+                self.stored_bytes += len(block)
+            self._refs[digest] += 1
+            self.logical_bytes += len(block)
+            digests.append(digest)
+        return tuple(digests)
+
+    def ref(self, digests):
+        for digest in digests:
+            self._refs[digest] += 1
+            self.logical_bytes += len(self._blocks[digest])
+
+    def release(self, digests):
+        for digest in digests:
+            refs = self._refs[digest] - 1
+            block = self._blocks[digest]
+            self.logical_bytes -= len(block)
+            if refs:
+                self._refs[digest] = refs
+            else:
+                del self._refs[digest], self._blocks[digest]
+                self.stored_bytes -= len(block)
+
+    def recount(self, refs):
+        """Replaces all reference counts with `refs` (digest: count); blocks not in it are freed."""
+        self._refs = {digest: count for digest, count in refs.items() if digest in self._blocks and count > 0}
+        self._blocks = {digest: block for digest, block in self._blocks.items() if digest in self._refs}
+        self.stored_bytes = sum(len(block) for block in self._blocks.values())
+        self.logical_bytes = sum(len(self._blocks[digest]) * count for digest, count in self._refs.items())
+
+    def get(self, digest):
+        return self._blocks[digest]
+
+    def read(self, digests):
+        if len(digests) == 1:
+            return self._blocks[digests[0]]
+        return b''.join(self._blocks[digest] for digest in digests)
+
+    def refcount(self, digest):
+        return self._refs.get(digest, 0)
+
+    def stats(self):
+        return {
+            'blocks': len(self._blocks),
+            'stored_bytes': self.stored_bytes,
+            'logical_bytes': self.logical_bytes,
+            'dedup_ratio': self.logical_bytes / self.stored_bytes if self.stored_bytes else 1.0,
+        }
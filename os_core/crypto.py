@@ -0,0 +1,253 @@
+import base64
+import functools
+import hashlib
+import hmac
+import os
+import struct
+from collections import OrderedDict
+from cryptography.fernet import Fernet, InvalidToken
+
+# Encrypted content layout: <8sIQ header (magic, chunk size, plaintext size), then one
+# Fernet token per chunk of plaintext. A token encrypts <Q (chunk index, top bit set on
+# the last chunk) + up to chunk_size bytes, so tokens cannot be reordered, dropped or
+# truncated unnoticed. All tokens but the last have the same length, which makes chunk
+# i addressable without touching the chunks before it.
+ENC_MAGIC = b"MOSENC1\0"
+ENC_CHUNK_SIZE = 64 * 1024
+_HEADER = struct.Struct('<8sIQ')
+_CHUNK_TAG = struct.Struct('<Q')
+_LAST = 1 << 63
+HEADER_SIZE = _HEADER.size
+
+# Password keys: a tunable KDF turns (password, salt) into a master key, and a cheap
+# HMAC step turns the master key and a per-file salt into the file's Fernet key.
+# Files encrypted together can share the KDF salt, so one derivation (cached below)
+# serves all of them while every file still gets a distinct key.
+DEFAULT_KDF = 'scrypt'
+KDF_COSTS = {'scrypt': (14, 8, 1), 'pbkdf2': (600000,)}  # (log2 N, r, p) and (iterations,)
+KDF_CACHE_SIZE = 32
+KDF_SPEC_SIZE = 60  # Longest spec that fits the KDF field of a disk image inode
+_master_keys = OrderedDict()  # (algorithm, cost, salt, SHA-256 of password): master key, LRU order
+
+
+@functools.lru_cache(maxsize=128)
+def cipher(key):
+    """Fernet for a key, built once instead of on every chunk."""
+    return Fernet(key)
+
+
+def token_size(plain_len):
+    """Length of the Fernet token for `plain_len` bytes of plaintext."""
+    raw = 1 + 8 + 16 + (plain_len // 16 + 1) * 16 + 32  # version, timestamp, IV, padded body, HMAC
+    return -(-raw // 3) * 4
+
+
+def is_chunked(content):
+    return bytes(content[:len(ENC_MAGIC)]) == ENC_MAGIC
+
+
+def _chunk_count(size, chunk_size):
+    return max(1, -(-size // chunk_size))  # An empty file still has one (empty) last chunk
+
+
+def _chunk_offset(index, chunk_size):
+    return HEADER_SIZE + index * token_size(_CHUNK_TAG.size + chunk_size)
+
+
+def _encrypted_length(size, chunk_size):
+    last = _chunk_count(size, chunk_size) - 1
+    return _chunk_offset(last, chunk_size) + token_size(_CHUNK_TAG.size + size - last * chunk_size)
+
+
+def _encrypt_chunk(key, index, last, data):
+    return cipher(key).encrypt(_CHUNK_TAG.pack(index | (_LAST if last else 0)) + bytes(data))
+
+
+def _header(size, chunk_size):
+    return _HEADER.pack(ENC_MAGIC, chunk_size, size)
+
+
+def encrypt_stream(key, data, chunk_size=ENC_CHUNK_SIZE):
+    """Yields the header and then one token per chunk, holding one chunk at a time."""
+    data = memoryview(data)
+    count = _chunk_count(len(data), chunk_size)
+    yield _header(len(data), chunk_size)
+    for index in range(count):
+        yield _encrypt_chunk(key, index, index == count - 1, data[index * chunk_size:(index + 1) * chunk_size])
+
+
+def encrypt(key, data, chunk_size=ENC_CHUNK_SIZE):
+    return b''.join(encrypt_stream(key, data, chunk_size))
+
+
+def read_header(read):
+    """Returns `(chunk_size, plaintext size)`; `read(offset, size)` reads the ciphertext."""
+    magic, chunk_size, size = _HEADER.unpack(read(0, HEADER_SIZE))
+    if magic != ENC_MAGIC:
+        raise ValueError("Not chunk-encrypted content.")
+    return chunk_size, size
+
+
+def decrypt_chunk(key, read, index, chunk_size, size):
+    count = _chunk_count(size, chunk_size)
+    if not 0 <= index < count:
+        raise ValueError(f"Chunk {index} out of range.")
+    length = min(chunk_size, size - index * chunk_size)
+    token = read(_chunk_offset(index, chunk_size), token_size(_CHUNK_TAG.size + length))
+    try:
+        plain = cipher(key).decrypt(token)
+    except InvalidToken:
+        raise ValueError("Decryption failed. Invalid token or key.")
+    (tag,) = _CHUNK_TAG.unpack_from(plain)
+    if tag != index | (_LAST if index == count - 1 else 0) or len(plain) - _CHUNK_TAG.size != length:
+        raise ValueError(f"Encrypted content is corrupt at chunk {index}.")
+    return plain[_CHUNK_TAG.size:]
+
+
+def decrypt_stream(key, read):
+    """Yields the plaintext chunk by chunk."""
+    chunk_size, size = read_header(read)
+    for index in range(_chunk_count(size, chunk_size)):
+        yield decrypt_chunk(key, read, index, chunk_size, size)
+
+
+def decrypt(key, content):
+    """Plaintext of encrypted content. Single whole-file tokens written before chunking still decrypt."""
+    if not is_chunked(content):
+        try:
+            return cipher(key).decrypt(bytes(content))
+        except InvalidToken:
+            raise ValueError("Decryption failed. Invalid token or key.")
+    view = memoryview(content)
+    return b''.join(decrypt_stream(key, lambda offset, size: bytes(view[offset:offset + size])))
+
+
+def plaintext_size(read):
+    return read_header(read)[1]
+
+
+def pread(key, read, offset, size):
+    """Decrypts only the chunks overlapping `[offset, offset + size)`."""
+    chunk_size, total = read_header(read)
+    end = min(offset + size, total)
+    parts = []
+    for index in range(offset // chunk_size, -(-end // chunk_size)):
+        chunk = decrypt_chunk(key, read, index, chunk_size, total)
+        base = index * chunk_size
+        parts.append(chunk[max(offset - base, 0):end - base])
+    return b''.join(parts)
+
+
+def pwrite_patch(key, read, offset, data):
+    """Ciphertext patch for writing `data` at plaintext `offset`.
+
+    Returns `(writes, length)`: `(offset, bytes)` writes to apply in order and
+    the new ciphertext length to truncate to. Only the touched chunks are
+    re-encrypted; when the file grows, the old last chunk and any zero-filled
+    gap are rewritten too.
+    """
+    chunk_size, size = read_header(read)
+    end = offset + len(data)
+    new_size = max(size, end)
+    old_count, new_count = _chunk_count(size, chunk_size), _chunk_count(new_size, chunk_size)
+    if new_size > size:
+        first, last = min(offset // chunk_size, old_count - 1), new_count - 1
+    elif data:
+        first, last = offset // chunk_size, (end - 1) // chunk_size
+    else:
+        return [], _encrypted_length(size, chunk_size)
+
+    tokens = []
+    for index in range(first, last + 1):
+        base = index * chunk_size
+        buf = bytearray(decrypt_chunk(key, read, index, chunk_size, size) if index < old_count else b'')
+        length = min(chunk_size, new_size - base)
+        buf.extend(bytes(length - len(buf)))
+        lo, hi = max(offset, base), min(end, base + length)
+        if lo < hi:
+            buf[lo - base:hi - base] = data[lo - offset:hi - offset]
+        tokens.append(_encrypt_chunk(key, index, index == new_count - 1, buf))
+    writes = [(_chunk_offset(first, chunk_size), b''.join(tokens))]
+    if new_size != size:
+        writes.append((0, _header(new_size, chunk_size)))
+    return writes, _encrypted_length(new_size, chunk_size)
+
+
+def truncate_patch(key, read, size):
+    """Ciphertext patch (as for `pwrite_patch`) resizing the plaintext to `size`."""
+    chunk_size, old_size = read_header(read)
+    if size >= old_size:
+        return pwrite_patch(key, read, old_size, bytes(size - old_size))
+    index = _chunk_count(size, chunk_size) - 1
+    chunk = decrypt_chunk(key, read, index, chunk_size, old_size)[:size - index * chunk_size]
+    token = _encrypt_chunk(key, index, True, chunk)
+    writes = [(_chunk_offset(index, chunk_size), token), (0, _header(size, chunk_size))]
+    return writes, _encrypted_length(size, chunk_size)
+
+
+def _b64(raw):
+    return base64.urlsafe_b64encode(raw).rstrip(b'=').decode('ascii')
+
+
+def _unb64(text):
+    return base64.urlsafe_b64decode(text + '=' * (-len(text) % 4))
+
+
+def new_kdf(algorithm=DEFAULT_KDF, cost=None, salt=None):
+    """KDF spec for one file: 'algorithm$cost...$kdf salt$file salt'.
+
+    `cost` defaults to `KDF_COSTS[algorithm]`. `salt` is the salt of the
+    expensive KDF; pass the same one for files encrypted together. The file
+    salt is always fresh.
+    """
+    if algorithm not in KDF_COSTS:
+        raise ValueError(f"Unknown KDF: {algorithm}. Use one of {tuple(KDF_COSTS)}.")
+    if cost is None:
+        cost = KDF_COSTS[algorithm]
+    elif isinstance(cost, int):
+        cost = (cost,)
+    if len(cost) != len(KDF_COSTS[algorithm]):
+        raise ValueError(f"{algorithm} takes {len(KDF_COSTS[algorithm])} cost parameters.")
+    salt = os.urandom(16) if salt is None else salt
+    spec = '$'.join([algorithm, *map(str, cost), _b64(salt), _b64(os.urandom(16))])
+    if len(spec) > KDF_SPEC_SIZE:
+        raise ValueError(f"KDF spec longer than {KDF_SPEC_SIZE} characters; use smaller cost parameters.")
+    return spec
+
+
+def parse_kdf(spec):
+    """Returns `(algorithm, cost, kdf salt, file salt)`."""
+    algorithm, *cost, salt, file_salt = spec.split('$')
+    return algorithm, tuple(int(value) for value in cost), _unb64(salt), _unb64(file_salt)
+
+
+def _master_key(password, algorithm, cost, salt):
+    cache_key = (algorithm, cost, salt, hashlib.sha256(password.encode()).digest())
+    key = _master_keys.get(cache_key)
+    if key is not None:
+        _master_keys.move_to_end(cache_key)
+        return key
+    if algorithm == 'scrypt':
+        log_n, r, p = cost
+        key = hashlib.scrypt(password.encode(), salt=salt, n=1 << log_n, r=r, p=p,
+                             maxmem=256 * r * (1 << log_n) + (1 << 20), dklen=32)
+    elif algorithm == 'pbkdf2':
+        key = hashlib.pbkdf2_hmac('sha256', password.encode(), salt, cost[0], dklen=32)
+    else:
+        raise ValueError(f"Unknown KDF: {algorithm}.")
+    _master_keys[cache_key] = key
+    while len(_master_keys) > KDF_CACHE_SIZE:
+        _master_keys.popitem(last=False)
+    return key
+
+
+def derive_key(password, spec):
+    """Fernet key for a password under a file's KDF spec."""
+    algorithm, cost, salt, file_salt = parse_kdf(spec)
+    master = _master_key(password, algorithm, cost, salt)
+    return base64.urlsafe_b64encode(hmac.new(master, b'file key' + file_salt, hashlib.sha256).digest())
+
+
+def legacy_key(password):
+    """Unsalted SHA-256 key of files encrypted before KDF specs existed."""
+    return base64.urlsafe_b64encode(hashlib.sha256(password.encode()).digest())
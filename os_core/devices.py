@@ -0,0 +1,59 @@
+from collections import deque
+
+
+class IODevice:
+    """FCFS I/O device with a fixed number of service channels.
+
+    `service_time` sets how long a request occupies a channel: None uses the
+    duration the process asked for (its I/O burst), an int is a fixed service
+    time, and a callable receives the requested duration and returns one.
+    """
+
+    def __init__(self, name='disk', service_time=None, channels=1):
+        if channels <= 0:
+            raise ValueError("channels must be a positive integer.")
+        self.name = name
+        self.service_time = service_time
+        self.channels = channels
+        self.queue = deque()  # PCBs waiting for a free channel, with their service times
+        self.in_service = []  # [PCB, ticks left]
+        self.busy_time = 0  # Channel-ticks spent serving requests
+        self.completed = 0
+
+    def __len__(self):
+        return len(self.queue) + len(self.in_service)
+
+    def _service_time(self, duration):
+        if self.service_time is None:
+            return duration
+        if callable(self.service_time):
+            return self.service_time(duration)
+        return self.service_time
+
+    def submit(self, pcb, duration):
+        """Queues an I/O request; the PCB should already be WAITING."""
+        self.queue.append((pcb, max(1, self._service_time(duration))))
+        self._start_requests()
+
+    def _start_requests(self):
+        while self.queue and len(self.in_service) < self.channels:
+            pcb, ticks = self.queue.popleft()
+            self.in_service.append([pcb, ticks])
+
+    def tick(self):
+        """Serves one time unit and returns the PCBs whose I/O completed."""
+        finished = []
+        for request in self.in_service:
+            request[1] -= 1
+            self.busy_time += 1
+            if request[1] <= 0:
+                finished.append(request[0])
+        if finished:
+            self.in_service = [request for request in self.in_service if request[1] > 0]
+            self.completed += len(finished)
+            self._start_requests()
+        return finished
+
+    def queue_str(self):
+        waiting = [f"{pcb.name}({ticks})" for pcb, ticks in self.in_service] + [pcb.name for pcb, _ in self.queue]
+        return f"{self.name}: " + (" -> ".join(waiting) if waiting else "Idle")
@@ -0,0 +1,204 @@
+import mmap
+import os
+import struct
+
+# Image layout, in block_size blocks:
+#   0             superblock
+#   bitmap_start  block bitmap, one bit per block (1 = in use)
+#   inode_start   inode table of fixed-size inodes; inode 0 is unused, 1 is the root
+#   data_start    file and directory data, each stored as one contiguous extent
+# Directory data is a sequence of <IH (inode number, name length) + UTF-8 name.
+# All integers are little-endian.
+IMAGE_MAGIC = b"MOSFS1\0\0"
+IMAGE_VERSION = 1
+DEFAULT_BLOCK_SIZE = 4096
+ROOT_INODE = 1
+MODE_FILE = 1
+MODE_DIR = 2
+FLAG_ENCRYPTED = 1
+# magic, version, block_size, total_blocks, inode_count, bitmap_start, bitmap_blocks,
+# inode_start, inode_blocks, data_start, journal sequence number of the checkpoint
+_SUPERBLOCK = struct.Struct('<8sIIIIIIIIIQ')
+# mode, flags, first data block, size in bytes, mtime, encryption key and KDF spec (both
+# NUL padded). Random keys are stored with an empty spec; password-derived keys are not
+# stored at all, only their spec. 128 bytes
+_INODE = struct.Struct('<BBxxIQd44s60s')
+_DIRENT = struct.Struct('<IH')
+
+
+def _blocks(size, block_size):
+    return -(-size // block_size)
+
+
+def is_image(path):
+    try:
+        with open(path, 'rb') as f:
+            return f.read(len(IMAGE_MAGIC)) == IMAGE_MAGIC
+    except FileNotFoundError:
+        return False
+
+
+def _payload(node, inodes):
+    """Bytes stored for a node: its dirent records, or the file's (zero-copy) content."""
+    if not hasattr(node, 'entries'):
+        return node.view()
+    records = []
+    for name, child in node.entries.items():
+        encoded = name.encode('utf-8')
+        records.append(_DIRENT.pack(inodes[id(child)], len(encoded)) + encoded)
+    return b''.join(records)
+
+
+def write_image(path, root, seq=0, block_size=DEFAULT_BLOCK_SIZE):
+    """Writes a whole tree as a disk image at `path` and fsyncs it.
+
+    Directories are recognised by their `entries` dict; files must provide
+    `size`, `view()`, `encrypted`, `persisted_key()`, `kdf` and `timestamp`.
+    The layout is planned from sizes alone and each payload is fetched only
+    while it is written, so one payload is held at a time and content still
+    living in another image is never copied into memory. Returns
+    `(node, inode)` pairs in inode order.
+    """
+    nodes = [root]
+    inodes = {id(root): ROOT_INODE}
+    for node in nodes:  # Breadth first; the list grows while it is walked
+        for child in getattr(node, 'entries', {}).values():
+            nodes.append(child)
+            inodes[id(child)] = len(nodes)
+
+    # Only lengths are gathered up front; each payload is built or fetched when it is written
+    lengths = []
+    for node in nodes:
+        if hasattr(node, 'entries'):
+            lengths.append(sum(_DIRENT.size + len(name.encode('utf-8')) for name in node.entries))
+        else:
+            lengths.append(node.size)
+
+    inode_blocks = _blocks((len(nodes) + 1) * _INODE.size, block_size)
+    data_blocks = sum(_blocks(length, block_size) for length in lengths)
+    bitmap_blocks = 1
+    while True:
+        total_blocks = 1 + bitmap_blocks + inode_blocks + data_blocks
+        needed = _blocks(_blocks(total_blocks, 8), block_size)
+        if needed <= bitmap_blocks:
+            break
+        bitmap_blocks = needed
+    bitmap_start = 1
+    inode_start = bitmap_start + bitmap_blocks
+    data_start = inode_start + inode_blocks
+
+    # Images are packed, so exactly the first total_blocks blocks are in use
+    bitmap = bytearray(bitmap_blocks * block_size)
+    bitmap[:total_blocks // 8] = b'\xff' * (total_blocks // 8)
+    if total_blocks % 8:
+        bitmap[total_blocks // 8] = (1 << (total_blocks % 8)) - 1
+
+    table = bytearray((len(nodes) + 1) * _INODE.size)
+    starts = []
+    next_block = data_start
+    for ino, (node, length) in enumerate(zip(nodes, lengths), 1):
+        start = next_block if length else 0
+        next_block += _blocks(length, block_size)
+        starts.append(start)
+        if hasattr(node, 'entries'):
+            mode, flags, key, kdf = MODE_DIR, 0, b'', b''
+        else:
+            mode, flags, key = MODE_FILE, FLAG_ENCRYPTED if node.encrypted else 0, node.persisted_key() or b''
+            kdf = (node.kdf or '').encode('ascii')
+            if len(key) > 44 or len(kdf) > 60:
+                raise ValueError(f"Encryption key of {node.name} does not fit in an inode.")
+        _INODE.pack_into(table, ino * _INODE.size, mode, flags, start, length, node.timestamp, key, kdf)
+
+    with open(path, 'wb') as f:
+        f.write(_SUPERBLOCK.pack(IMAGE_MAGIC, IMAGE_VERSION, block_size, total_blocks, len(nodes), bitmap_start,
+                                 bitmap_blocks, inode_start, inode_blocks, data_start, seq))
+        f.seek(bitmap_start * block_size)
+        f.write(bitmap)
+        f.seek(inode_start * block_size)
+        f.write(table)
+        for node, length, start in zip(nodes, lengths, starts):
+            if length:
+                f.seek(start * block_size)
+                f.write(_payload(node, inodes))
+        f.truncate(total_blocks * block_size)
+        f.flush()
+        os.fsync(f.fileno())
+    return list(zip(nodes, range(ROOT_INODE, len(nodes) + 1)))
+
+
+class DiskImage:
+    """Read-only, mmap-backed access to an image written by `write_image`.
+
+    Opening parses only the superblock. Inodes and directories are decoded on
+    demand and file data is handed out as memoryview slices of the mapping, so
+    the OS pages in just the blocks that are actually read.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if len(self._mmap) < _SUPERBLOCK.size:
+                raise ValueError(f"Not a disk image: {path}")
+            (magic, version, self.block_size, self.total_blocks, self.inode_count, self.bitmap_start,
+             self.bitmap_blocks, self.inode_start, self.inode_blocks, self.data_start,
+             self.seq) = _SUPERBLOCK.unpack_from(self._mmap)
+            if magic != IMAGE_MAGIC:
+                raise ValueError(f"Not a disk image: {path}")
+            if version != IMAGE_VERSION:
+                raise ValueError(f"Unsupported disk image version {version}: {path}")
+            if len(self._mmap) < self.total_blocks * self.block_size:
+                raise ValueError(f"Truncated disk image: {path}")
+        except ValueError:
+            self._mmap.close()
+            raise
+
+    def inode(self, ino):
+        """Returns `(mode, encrypted, size, mtime, key, kdf)` for an inode."""
+        mode, flags, _, size, mtime, key, kdf = self._inode(ino)
+        return (mode, bool(flags & FLAG_ENCRYPTED), size, mtime, key.rstrip(b'\0') or None,
+                kdf.rstrip(b'\0').decode('ascii') or None)
+
+    def _inode(self, ino):
+        if not ROOT_INODE <= ino <= self.inode_count:
+            raise ValueError(f"Inode {ino} out of range.")
+        return _INODE.unpack_from(self._mmap, self.inode_start * self.block_size + ino * _INODE.size)
+
+    def view(self, ino):
+        """Zero-copy memoryview of an inode's data."""
+        _, _, start, size, _, _, _ = self._inode(ino)
+        offset = start * self.block_size
+        return memoryview(self._mmap)[offset:offset + size]
+
+    def listdir(self, ino):
+        """Returns `{name: inode}` for a directory inode."""
+        if self._inode(ino)[0] != MODE_DIR:
+            raise NotADirectoryError(f"Inode {ino} is not a directory.")
+        data = self.view(ino)
+        entries = {}
+        offset = 0
+        while offset < len(data):
+            child, length = _DIRENT.unpack_from(data, offset)
+            offset += _DIRENT.size
+            entries[bytes(data[offset:offset + length]).decode('utf-8')] = child
+            offset += length
+        data.release()
+        return entries
+
+    def free_blocks(self):
+        start = self.bitmap_start * self.block_size
+        bitmap = self._mmap[start:start + _blocks(self.total_blocks, 8)]
+        return self.total_blocks - sum(bin(byte).count('1') for byte in bitmap)
+
+    def close(self):
+        try:
+            self._mmap.close()
+        except BufferError:
+            pass  # Views still held by callers keep the mapping alive until they are dropped
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -1,13 +1,39 @@
-from cryptography.fernet import Fernet, InvalidToken
+from cryptography.fernet import Fernet
+import fnmatch
+import io
+import os
+import struct
 import time
+from collections import OrderedDict
 import pickle
+import weakref
+import zlib
+from os_core import crypto
+from os_core.blockstore import BlockStore
+from os_core.diskimage import DiskImage, MODE_DIR, ROOT_INODE, is_image, write_image
+from os_core.search import MetadataIndex
+
+# Journal records: <IIQ header (payload length, CRC32 of payload, sequence number) + pickled operation tuple
+_JOURNAL_HEADER = struct.Struct('<IIQ')
+CHECKPOINT_VERSION = 1
+DENTRY_CACHE_SIZE = 1024
+# Files written through offset-based I/O keep their bytes in bytearrays of this size, so
+# appends and partial overwrites touch only the affected chunks
+CHUNK_SIZE = 64 * 1024
 
 class File:
-    def __init__(self, name, content=b'', encrypted=False, key=None):
+    _owner = None  # Tree allowed to modify this file in place (see FileSystem.snapshot)
+
+    def __init__(self, name, content=b'', encrypted=False, key=None, kdf=None):
         self.name = name
         self.timestamp = time.time()
         self.encrypted = encrypted
-        self.key = key if key else (Fernet.generate_key() if encrypted else None)
+        self.key = key if key or kdf else (Fernet.generate_key() if encrypted else None)
+        # KDF spec when the key was derived from a password (see os_core.crypto). Such keys
+        # are never persisted, only the spec: after a reload the file stays locked until
+        # the password is given again.
+        self.kdf = kdf
+        self._blocks = None
         self.content = content # content şifreliyse şifreli, değilse ham olarak saklanmalı
         if encrypted and content: # Eğer başlangıçta şifreli içerik verildiyse ve bu içerik plaintext ise şifrele
              # Bu kısım create_file veya write_file içinde ele alınmalı.
@@ -16,19 +42,272 @@ class File:
              pass
         self.size = len(self.content)
 
+    # Content lives in exactly one of: _content (bytes), _source (an unread disk image
+    # inode), _chunks (bytearrays edited in place) or _blocks (store and block digests,
+    # deduplicated and reference counted).
+
+    @property
+    def content(self):
+        if self._chunks is not None:
+            return b''.join(self._chunks)
+        if self._blocks is not None:
+            store, digests = self._blocks
+            return store.read(digests)
+        if self._content is None:
+            # Content still lives in a disk image; the first access copies it out
+            disk, ino = self._source
+            self._content = bytes(disk.view(ino))
+            self._source = None
+        return self._content
+
+    @content.setter
+    def content(self, value):
+        self._release()
+        self._content = value
+        self._source = None
+        self._chunks = None
+
+    def view(self):
+        """Zero-copy memoryview of the stored (possibly encrypted) content."""
+        if self._chunks is not None or self._blocks is not None:
+            return memoryview(self.content)
+        if self._content is None:
+            return self._source[0].view(self._source[1])
+        content = self._content
+        return memoryview(content.encode() if isinstance(content, str) else content)
+
+    def _bind(self, disk, ino, size):
+        """Drops in-memory content in favour of an image inode holding the same bytes."""
+        self._release()
+        self._content = None
+        self._source = (disk, ino)
+        self._chunks = None
+        self.size = size
+
+    def _intern(self, store):
+        """Moves in-memory content into a block store; content still in a disk image stays there."""
+        if self._blocks is not None or (self._content is None and self._chunks is None):
+            return
+        view = self.view()
+        digests = store.put(view)
+        view.release()
+        self._content = None
+        self._chunks = None
+        self._blocks = (store, digests)
+
+    def _share(self, other):
+        """Points this file at another file's stored content without copying it."""
+        self._release()
+        self._content, self._source, self._chunks = other._content, other._source, None
+        if other._blocks is not None:
+            store, digests = other._blocks
+            store.ref(digests)
+            self._blocks = other._blocks
+        elif other._chunks is not None:
+            self._content = other.content
+        self.size = other.size
+
+    def _copy(self):
+        """New file with the same metadata sharing this file's content."""
+        copy = File(self.name, encrypted=self.encrypted, key=self.key, kdf=self.kdf)
+        copy._share(self)
+        copy.timestamp = self.timestamp
+        return copy
+
+    def _release(self):
+        if self._blocks is not None:
+            store, digests = self._blocks
+            self._blocks = None
+            store.release(digests)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        if self._blocks is None:
+            state['_content'] = self.content
+        # The store is pickled once alongside the tree, so shared blocks stay shared
+        state['_source'] = None
+        state['_chunks'] = None
+        state.pop('_owner', None)
+        state['key'] = self.persisted_key()
+        return state
+
+    def __setstate__(self, state):
+        if 'content' in state:  # Pickled before content became lazy
+            state['_content'] = state.pop('content')
+            state['_source'] = None
+        state.setdefault('_chunks', None)
+        state.setdefault('_blocks', None)
+        state.setdefault('kdf', None)
+        self.__dict__.update(state)
+
+    # ----- Offset-based I/O -----
+    # Offsets address the plaintext. Encrypted content is chunked (see os_core.crypto),
+    # so reads decrypt and writes re-encrypt only the chunks they overlap.
+
+    def length(self):
+        """Plaintext length (`size` is the length of the stored, possibly encrypted, bytes)."""
+        if not self.encrypted:
+            return self.size
+        if crypto.is_chunked(self._raw_read(0, crypto.HEADER_SIZE)):
+            return crypto.plaintext_size(self._raw_read)
+        return len(self.read())
+
+    def pread(self, offset, size):
+        """Reads up to `size` bytes starting at `offset`."""
+        if offset < 0 or size < 0:
+            raise ValueError("Offset and size must be non-negative.")
+        if not self.encrypted:
+            return self._raw_read(offset, size)
+        if crypto.is_chunked(self._raw_read(0, crypto.HEADER_SIZE)):
+            return crypto.pread(self._require_key(), self._raw_read, offset, size)
+        return self.read()[offset:offset + size]
+
+    def pwrite(self, offset, data):
+        """Writes `data` at `offset`, growing the file (zero-filled) if needed."""
+        if offset < 0:
+            raise ValueError("Offset must be non-negative.")
+        if self.encrypted:
+            self._encrypted_edit(crypto.pwrite_patch, offset, data)
+        else:
+            self._raw_write(offset, data)
+            self.timestamp = time.time()
+        return len(data)
+
+    def truncate(self, size):
+        if size < 0:
+            raise ValueError("Size must be non-negative.")
+        if self.encrypted:
+            self._encrypted_edit(crypto.truncate_patch, size)
+        else:
+            self._raw_truncate(size)
+            self.timestamp = time.time()
+
+    def _encrypted_edit(self, make_patch, *args):
+        """Applies a plaintext edit by patching ciphertext; returns the `(writes, length)` patch."""
+        key = self._require_key()
+        legacy = not crypto.is_chunked(self._raw_read(0, crypto.HEADER_SIZE))
+        if legacy:  # Whole-file token from before chunking: convert once
+            self.content = crypto.encrypt(key, self.read())
+        patch = make_patch(key, self._raw_read, *args)
+        self._patch(*patch)
+        if legacy:
+            return [(0, self.content)], self.size
+        return patch
+
+    def _patch(self, writes, length):
+        for offset, data in writes:
+            self._raw_write(offset, data)
+        self._raw_truncate(length)
+        self.timestamp = time.time()
+
+    def _require_key(self):
+        if not self.key:
+            if self.kdf:
+                raise ValueError("File is locked. Unlock or decrypt it with its password.")
+            raise ValueError("File is marked as encrypted but no key is available.")
+        return self.key
+
+    def persisted_key(self):
+        """Key to write to disk: None for password-derived keys, which only live in memory."""
+        return None if self.kdf else self.key
+
+    def unlock(self, password):
+        """Derives the key of a password-encrypted file again, e.g. after a reload."""
+        if not self.encrypted:
+            raise ValueError("File is not encrypted.")
+        key = crypto.derive_key(password, self.kdf) if self.kdf else crypto.legacy_key(password)
+        try:
+            if crypto.is_chunked(self._raw_read(0, crypto.HEADER_SIZE)):
+                chunk_size, size = crypto.read_header(self._raw_read)
+                crypto.decrypt_chunk(key, self._raw_read, 0, chunk_size, size)  # Authenticates the key
+            else:
+                crypto.decrypt(key, self.view())
+        except ValueError:
+            raise ValueError("Decryption failed. Invalid token or key.")
+        self.key = key
+
+    # Raw access to the stored bytes, whatever their representation
+
+    def _raw_read(self, offset, size):
+        end = min(offset + size, self.size)
+        if offset >= end:
+            return b''
+        if self._blocks is not None:
+            store, digests = self._blocks
+            parts = []
+            base = 0
+            for digest in digests:
+                block = store.get(digest)
+                if base + len(block) > offset:
+                    parts.append(block[max(offset - base, 0):end - base])
+                base += len(block)
+                if base >= end:
+                    break
+            return b''.join(parts)
+        if self._chunks is None:
+            view = self.view()
+            try:
+                return bytes(view[offset:end])
+            finally:
+                view.release()
+        parts = []
+        while offset < end:
+            index, within = divmod(offset, CHUNK_SIZE)
+            take = min(CHUNK_SIZE - within, end - offset)
+            parts.append(self._chunks[index][within:within + take])
+            offset += take
+        return b''.join(parts)
+
+    def _raw_write(self, offset, data):
+        if self._chunks is None:
+            self._split()
+        if offset > self.size:
+            self._write_chunks(self.size, bytes(offset - self.size))
+        self._write_chunks(offset, data)
+
+    def _raw_truncate(self, size):
+        if self._chunks is None:
+            self._split()
+        if size > self.size:
+            self._write_chunks(self.size, bytes(size - self.size))
+        elif size < self.size:
+            index, within = divmod(size, CHUNK_SIZE)
+            del self._chunks[index + 1:]
+            if index < len(self._chunks):
+                del self._chunks[index][within:]
+                if not self._chunks[index]:
+                    self._chunks.pop()
+            self.size = size
+
+    def _split(self):
+        """Switches storage from one bytes object to chunks; done once per file."""
+        view = self.view()
+        self._chunks = [bytearray(view[i:i + CHUNK_SIZE]) for i in range(0, len(view), CHUNK_SIZE)]
+        view.release()
+        self._release()  # Copy-on-write: other files sharing the blocks keep them
+        self._content = None
+        self._source = None
+
+    def _write_chunks(self, offset, data):
+        # Every chunk but the last is full, and offset <= size, so each slice
+        # assignment either overwrites in place or extends the last chunk
+        chunks = self._chunks
+        data = memoryview(data)
+        done = 0
+        while done < len(data):
+            index, within = divmod(offset + done, CHUNK_SIZE)
+            if index == len(chunks):
+                chunks.append(bytearray())
+            take = min(CHUNK_SIZE - within, len(data) - done)
+            chunks[index][within:within + take] = data[done:done + take]
+            done += take
+        self.size = max(self.size, offset + len(data))
+
 
     def read(self, decrypt_if_able=True):
         if self.encrypted:
             if decrypt_if_able:
-                if not self.key:
-                    raise ValueError("File is marked as encrypted but no key is available.")
-                try:
-                    f = Fernet(self.key)
-                    return f.decrypt(self.content)
-                except InvalidToken:
-                    raise ValueError("Decryption failed. Invalid token or key.")
-                except Exception as e:
-                    raise ValueError(f"Decryption failed: {e}")
+                return crypto.decrypt(self._require_key(), self.view())
             else:
                 return self.content # Ham, şifreli içeriği döndür
         return self.content
@@ -38,36 +317,33 @@ class File:
         should_encrypt = self.encrypted if encrypt_override is None else encrypt_override
 
         if should_encrypt:
-            if not self.key:
+            if not self.key and not self.kdf:
                 self.key = Fernet.generate_key()
-            f = Fernet(self.key)
-            self.content = f.encrypt(data_bytes)
+            self.content = crypto.encrypt(self._require_key(), data_bytes)
             self.encrypted = True
         else:
             self.content = data_bytes
             self.encrypted = False
             self.key = None
+            self.kdf = None
         
         self.size = len(self.content)
         self.timestamp = time.time()
 
-    def encrypt(self, password=None):
-        """Encrypts the file content with a password (optional)."""
+    def encrypt(self, password=None, kdf=None):
+        """Encrypts the file content with a password (optional).
+
+        The key is derived with `kdf`, a spec from `crypto.new_kdf()`; by
+        default a fresh scrypt spec with its own salt.
+        """
         if self.encrypted:
             raise ValueError("File is already encrypted.")
         if password:
-            # Derive a Fernet key from the password (simple hash, not secure for real use)
-            import base64, hashlib
-            key = base64.urlsafe_b64encode(hashlib.sha256(password.encode()).digest())
-            self.key = key
+            self.kdf = kdf or crypto.new_kdf()
+            self.key = crypto.derive_key(password, self.kdf)
         elif not self.key:
             self.key = Fernet.generate_key()
-        f = Fernet(self.key)
-        if isinstance(self.content, str):
-            data = self.content.encode()
-        else:
-            data = self.content
-        self.content = f.encrypt(data)
+        self.content = crypto.encrypt(self.key, self.view())
         self.encrypted = True
         self.size = len(self.content)
         self.timestamp = time.time()
@@ -77,48 +353,305 @@ class File:
         if not self.encrypted:
             raise ValueError("File is not encrypted.")
         if password:
-            import base64, hashlib
-            key = base64.urlsafe_b64encode(hashlib.sha256(password.encode()).digest())
+            key = crypto.derive_key(password, self.kdf) if self.kdf else crypto.legacy_key(password)
         else:
             key = self.key
-        f = Fernet(key)
         try:
-            decrypted = f.decrypt(self.content)
+            decrypted = crypto.decrypt(key, self.view())
         except Exception as e:
             raise ValueError(f"Decryption failed: {e}")
         self.content = decrypted
         self.encrypted = False
         self.key = None
+        self.kdf = None
         self.size = len(self.content)
         self.timestamp = time.time()
 
 
 class Directory:
+    _owner = None  # Tree allowed to modify this directory in place (see FileSystem.snapshot)
+    _usage = None  # Cached (bytes, files, largest file) of the subtree; None when stale
+
     def __init__(self, name):
         self.name = name
         self.entries = {} # name: File or Directory object
         self.timestamp = time.time()
 
+    def _copy(self):
+        """New directory with the same entries; the children themselves are shared."""
+        copy = Directory(self.name)
+        copy.entries = dict(self.entries)
+        copy.timestamp = self.timestamp
+        return copy
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop('_owner', None)
+        state.pop('_usage', None)
+        return state
+
+class FileHandle:
+    """Position-tracking handle on a file, returned by `FileSystem.open()`.
+
+    The handle refers to the file by path, and every write goes through the
+    file system so it is journaled like any other change. `pread`/`pwrite`
+    leave the position alone; in 'a' mode every `write` goes to the end.
+    """
+
+    MODES = ('r', 'r+', 'w', 'a')
+
+    def __init__(self, fs, path, mode='r'):
+        self.fs = fs
+        self.path = path
+        self.mode = mode
+        self.position = fs._file(path).length() if mode == 'a' else 0
+        self.closed = False
+
+    def _check(self, access=None):
+        if self.closed:
+            raise ValueError("I/O operation on closed file.")
+        if access == 'write' and self.mode == 'r':
+            raise io.UnsupportedOperation("File not open for writing.")
+        if access == 'read' and self.mode in ('w', 'a'):
+            raise io.UnsupportedOperation("File not open for reading.")
+
+    def read(self, size=-1):
+        self._check('read')
+        if size is None or size < 0:
+            size = max(0, self.fs._file(self.path).length() - self.position)
+        data = self.fs.pread(self.path, self.position, size)
+        self.position += len(data)
+        return data
+
+    def write(self, data):
+        self._check('write')
+        if self.mode == 'a':
+            self.position = self.fs._file(self.path).length()
+        written = self.fs.pwrite(self.path, self.position, data)
+        self.position += written
+        return written
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        self._check()
+        if whence == os.SEEK_CUR:
+            offset += self.position
+        elif whence == os.SEEK_END:
+            offset += self.fs._file(self.path).length()
+        elif whence != os.SEEK_SET:
+            raise ValueError(f"Invalid whence: {whence}")
+        if offset < 0:
+            raise ValueError("Negative seek position.")
+        self.position = offset
+        return offset
+
+    def tell(self):
+        return self.position
+
+    def pread(self, offset, size):
+        self._check('read')
+        return self.fs.pread(self.path, offset, size)
+
+    def pwrite(self, offset, data):
+        self._check('write')
+        return self.fs.pwrite(self.path, offset, data)
+
+    def append(self, data):
+        self._check('write')
+        return self.fs.append(self.path, data)
+
+    def truncate(self, size=None):
+        self._check('write')
+        self.fs.truncate(self.path, self.position if size is None else size)
+
+    def close(self):
+        self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
 class FileSystem:
-    def __init__(self, state_file='fs_state.pkl'):
+    """In-memory file tree persisted as a checkpoint plus a write-ahead journal.
+
+    Every mutation is queued as a small redo record; `save()` appends the queued
+    records to `<state_file>.journal` and fsyncs, so it costs O(change size).
+    Once the journal grows past `checkpoint_bytes`, the whole tree is written to
+    a temporary file and atomically swapped in with `os.replace`, then the
+    journal is emptied. `load()` replays journal records newer than the
+    checkpoint and discards a torn tail left by a crash.
+
+    Password encryption derives keys with `kdf` at `kdf_cost` (see
+    `crypto.KDF_COSTS`). Files encrypted through one FileSystem share a KDF
+    salt and differ in their file salt, so encrypting or decrypting many files
+    under one password runs the expensive KDF once.
+
+    Whole-file writes are stored in a content-addressed `BlockStore` (with
+    `chunking` 'fixed' or 'cdc'), so identical content is kept once and
+    `copy_file` only adds references. Pickle checkpoints carry the store, so
+    they are deduplicated too.
+
+    Checkpoints are pickles unless `disk_image` is set, in which case they are
+    block-based disk images (see `os_core.diskimage`). An image is mapped with
+    mmap on load and file content is only read when a file is touched. `load()`
+    recognises either format.
+
+    Path lookups go through an LRU dentry cache mapping normalized directory
+    paths to Directory nodes, so resolving a path costs one dict lookup once
+    its parent has been seen. Every method that unlinks or moves a directory
+    invalidates the affected cache entries.
+
+    `snapshot()` and `clone()` take O(1): the current tree is frozen and shared,
+    and each later change copies only the directories on its path (and the file
+    it edits) before modifying them, so frozen nodes never change. Snapshots can
+    be browsed read-only with `open_snapshot()` and restored with `rollback()`.
+    A FileSystem created with `state_file=None` (as clones are) lives only in
+    memory and is never journaled.
+
+    `search()` answers metadata queries from a `MetadataIndex` that is built
+    on first use and then updated by every journaled change.
+    """
+
+    def __init__(self, state_file='fs_state.pkl', checkpoint_bytes=1 << 20, disk_image=False,
+                 dentry_cache_size=DENTRY_CACHE_SIZE, kdf=crypto.DEFAULT_KDF, kdf_cost=None, chunking='fixed'):
         self.root = Directory('/')
         self.state_file = state_file
+        self.journal_file = state_file + '.journal' if state_file else None
+        self.checkpoint_bytes = checkpoint_bytes
+        self.disk_image = disk_image
+        self._disk = None  # DiskImage backing files that have not been touched yet
+        self.dentry_cache_size = dentry_cache_size
+        self._dentries = OrderedDict()  # 'a/b': Directory at /a/b, least recently used first
+        self._seq = 0  # Sequence number of the last journaled operation
+        self._pending = []  # Encoded records not yet appended to the journal
+        self.kdf = kdf
+        self.kdf_cost = kdf_cost
+        self.chunking = chunking
+        self.store = BlockStore(chunking)
+        self._kdf_salt = os.urandom(16)
+        self.read_only = False
+        # Nodes whose _owner is this token may be modified in place; all others are shared
+        # with a snapshot or clone and get copied first. Loaded and new trees own everything.
+        self._token = None
+        self._snapshots = {}  # name: frozen root Directory
+        self._index = None  # MetadataIndex, built by the first search() and kept current after that
+        self._family = weakref.WeakSet([self])  # Trees sharing nodes and the block store
 
-    def _resolve(self, path_str):
+    @staticmethod
+    def _normalize(path_str):
+        """Cache key of an absolute path: components joined by '/', without empty ones."""
         if not path_str.startswith('/'):
             raise ValueError("Path must be absolute (start with '/')")
-        if path_str == '/':
-            return self.root, None 
+        key = path_str.strip('/')
+        if '//' in key:
+            key = '/'.join(part for part in key.split('/') if part)
+        return key
+
+    def _resolve(self, path_str):
+        key = self._normalize(path_str)
+        if not key:
+            return self.root, None
+        parent_key, _, entry_name = key.rpartition('/')
+        return self._lookup_dir(parent_key), entry_name
 
-        parts = path_str.strip('/').split('/')
-        current_dir = self.root
-        for i, part in enumerate(parts[:-1]):
-            if part not in current_dir.entries or not isinstance(current_dir.entries[part], Directory):
+    def _lookup_dir(self, key):
+        """Directory at a normalized path ('' is the root), through the dentry cache."""
+        if not key:
+            return self.root
+        cache = self._dentries
+        node = cache.get(key)
+        if node is not None:
+            cache.move_to_end(key)
+            return node
+
+        # Walk down from the deepest cached ancestor, caching each directory on the way
+        missing = []
+        prefix = key
+        node = self.root
+        while prefix:
+            prefix, _, part = prefix.rpartition('/')
+            missing.append(part)
+            cached = cache.get(prefix) if prefix else None
+            if cached is not None:
+                node = cached
+                break
+        for part in reversed(missing):
+            child = node.entries.get(part)
+            if not isinstance(child, Directory):
                 raise FileNotFoundError(f"Path component not found or not a directory: {part}")
-            current_dir = current_dir.entries[part]
-        
-        entry_name = parts[-1]
-        return current_dir, entry_name
+            node = child
+            prefix = f"{prefix}/{part}" if prefix else part
+            cache[prefix] = node
+        while len(cache) > self.dentry_cache_size:
+            cache.popitem(last=False)
+        return node
+
+    def _invalidate(self, path_str):
+        """Drops cached dentries for a path and everything below it."""
+        key = self._normalize(path_str)
+        cache = self._dentries
+        if not key:
+            cache.clear()
+            return
+        cache.pop(key, None)
+        below = key + '/'
+        for stale in [cached for cached in cache if cached.startswith(below)]:
+            del cache[stale]
+
+    # ----- Copy-on-write -----
+
+    def _adopt(self, node):
+        node._owner = self._token
+        return node
+
+    def _own(self, parent_dir, name):
+        """Child of a writable directory, copied first if it is shared."""
+        node = parent_dir.entries[name]
+        if node._owner is not self._token:
+            node = parent_dir.entries[name] = self._adopt(node._copy())
+        return node
+
+    def _check_writable(self):
+        if self.read_only:
+            raise PermissionError("Snapshot is read-only.")
+
+    def _writable_dir(self, key):
+        """Directory at a normalized path that may be modified in place.
+
+        Shared directories on the path are copied top-down and relinked, which
+        costs one copy per directory the first time it is changed after a
+        snapshot or clone.
+        """
+        self._check_writable()
+        node = self._lookup_dir(key)
+        if node._owner is self._token:
+            return node
+        if self.root._owner is not self._token:
+            self.root = self._adopt(self.root._copy())
+        node = self.root
+        cache = self._dentries
+        prefix = ''
+        for part in key.split('/') if key else ():
+            node = self._own(node, part)
+            prefix = f"{prefix}/{part}" if prefix else part
+            if prefix in cache:
+                cache[prefix] = node
+        return node
+
+    def _resolve_writable(self, path_str):
+        key = self._normalize(path_str)
+        if not key:
+            return self._writable_dir(''), None
+        parent_key, _, entry_name = key.rpartition('/')
+        return self._writable_dir(parent_key), entry_name
+
+    def _writable_file(self, path):
+        parent_dir, filename = self._resolve_writable(path)
+        if not isinstance(parent_dir.entries.get(filename), File):
+            raise FileNotFoundError(f"File not found: {path}")
+        return self._own(parent_dir, filename)
 
 
     def read_file(self, path, decrypt_if_able=True):
@@ -130,27 +663,31 @@ class FileSystem:
         raise FileNotFoundError(f"File not found: {path}")
 
     def write_file(self, path, data_bytes):
-        parent_dir, filename = self._resolve(path)
+        parent_dir, filename = self._resolve_writable(path)
         if filename not in parent_dir.entries or not isinstance(parent_dir.entries[filename], File):
             raise FileNotFoundError(f"File not found: {path}. Use create_file first.")
 
-        file_obj = parent_dir.entries[filename]
+        file_obj = self._own(parent_dir, filename)
         file_obj.write(data_bytes)
+        self._journal_put(path, file_obj)
 
     def create_file(self, path, content=b'', encrypted=False):
-        parent_dir, filename = self._resolve(path)
+        parent_dir, filename = self._resolve_writable(path)
         if filename in parent_dir.entries:
             raise FileExistsError(f"File or directory already exists: {path}")
         
-        new_file = File(filename, encrypted=encrypted)
+        new_file = self._adopt(File(filename, encrypted=encrypted))
         new_file.write(content) 
         parent_dir.entries[filename] = new_file
+        self._journal_put(path, new_file)
 
     def mkdir(self, path):
-        parent_dir, dirname = self._resolve(path)
+        parent_dir, dirname = self._resolve_writable(path)
         if dirname in parent_dir.entries:
             raise FileExistsError(f"File or directory already exists: {path}")
-        parent_dir.entries[dirname] = Directory(dirname)
+        parent_dir.entries[dirname] = self._adopt(Directory(dirname))
+        self._dentries.pop(self._normalize(path), None)
+        self._journal('mkdir', path)
 
     def list_dir(self, path):
         target_dir_obj = self.root
@@ -164,32 +701,639 @@ class FileSystem:
 
 
     def delete_file(self, path):
-        parent_dir, filename = self._resolve(path)
+        parent_dir, filename = self._resolve_writable(path)
         if filename in parent_dir.entries and isinstance(parent_dir.entries[filename], File):
-            del parent_dir.entries[filename]
+            file_obj = parent_dir.entries.pop(filename)
+            if file_obj._owner is self._token:
+                file_obj._release()  # A shared file's blocks are reclaimed by gc()
+            self._dentries.pop(self._normalize(path), None)
+            self._journal('delete', path)
         else:
             raise FileNotFoundError(f"File not found or not a file: {path}")
 
     def rmdir(self, path):
-        parent_dir, dirname = self._resolve(path)
+        parent_dir, dirname = self._resolve_writable(path)
         if dirname in parent_dir.entries and isinstance(parent_dir.entries[dirname], Directory):
             if parent_dir.entries[dirname].entries:
                 raise OSError("Directory not empty")
             del parent_dir.entries[dirname]
+            self._invalidate(path)
+            self._journal('delete', path)
         else:
             raise FileNotFoundError(f"Directory not found or not a directory: {path}")
 
+    def rename(self, src, dst):
+        """Moves a file or directory by relinking it; directory contents are not copied."""
+        src_parent, src_name = self._resolve_writable(src)
+        dst_parent, dst_name = self._resolve_writable(dst)
+        if src_name is None or dst_name is None:
+            raise ValueError("Cannot rename the root directory.")
+        node = src_parent.entries.get(src_name)
+        if node is None:
+            raise FileNotFoundError(f"File or directory not found: {src}")
+        if dst_name in dst_parent.entries:
+            raise FileExistsError(f"File or directory already exists: {dst}")
+        src_key, dst_key = self._normalize(src), self._normalize(dst)
+        if isinstance(node, Directory) and (dst_key + '/').startswith(src_key + '/'):
+            raise ValueError(f"Cannot move a directory into itself: {src} -> {dst}")
+        node = self._own(src_parent, src_name)  # The name changes, so a shared node is copied
+        del src_parent.entries[src_name]
+        node.name = dst_name
+        dst_parent.entries[dst_name] = node
+        self._invalidate(src)
+        self._journal('rename', src, dst)
+
+
+    def copy_file(self, src, dst):
+        """Copies a file. The copy shares the stored blocks, so only metadata is new."""
+        self._link_copy(self._file(src), src, dst)
+
+    def copy(self, src, dst):
+        """Copies a file or a whole directory tree (cp -r).
+
+        Every node is duplicated but file content is not: copied files share
+        the stored blocks of the originals.
+        """
+        parent_dir, name = self._resolve(src)
+        node = parent_dir.entries.get(name) if name is not None else self.root
+        if node is None:
+            raise FileNotFoundError(f"File or directory not found: {src}")
+        src_key, dst_key = self._normalize(src), self._normalize(dst)
+        if isinstance(node, Directory) and (dst_key + '/').startswith(src_key + '/' if src_key else ''):
+            raise ValueError(f"Cannot copy a directory into itself: {src} -> {dst}")
+        self._link_copy(node, src, dst)
+
+    def _link_copy(self, node, src, dst):
+        parent_dir, name = self._resolve_writable(dst)
+        if name is None or name in parent_dir.entries:
+            raise FileExistsError(f"File or directory already exists: {dst}")
+        copy = parent_dir.entries[name] = self._copy_tree(node, name, time.time())
+        self._journal('copy', src, dst, copy.timestamp)
+
+    def _copy_tree(self, node, name, timestamp):
+        if isinstance(node, File):
+            node._intern(self.store)
+            copy = self._adopt(node._copy())
+        else:
+            copy = self._adopt(Directory(name))
+            for child_name, child in node.entries.items():
+                copy.entries[child_name] = self._copy_tree(child, child_name, timestamp)
+        copy.name, copy.timestamp = name, timestamp
+        return copy
+
+    def remove(self, path):
+        """Deletes a file, or a directory together with everything below it (rm -r)."""
+        parent_dir, name = self._resolve_writable(path)
+        if name is None:
+            raise ValueError("Cannot remove the root directory.")
+        node = parent_dir.entries.pop(name, None)
+        if node is None:
+            raise FileNotFoundError(f"File or directory not found: {path}")
+        self._release_tree(node)
+        self._invalidate(path)
+        self._journal('delete', path)
+
+    def _release_tree(self, node):
+        """Drops the block references of the files in an unlinked subtree."""
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if node._owner is not self._token:
+                continue  # Shared with a snapshot or clone, and so is everything below it
+            if isinstance(node, Directory):
+                stack.extend(node.entries.values())
+            else:
+                node._release()
+
+    # ----- Traversal -----
+
+    def _dir(self, path):
+        return self._lookup_dir(self._normalize(path))
+
+    def walk(self, path='/'):
+        """Yields `(dirpath, dirnames, filenames)` top-down, like `os.walk`.
+
+        Removing names from `dirnames` before the next iteration skips those
+        subdirectories.
+        """
+        for dirpath, _, dirnames, filenames in self._walk(path):
+            yield dirpath, dirnames, filenames
+
+    def _walk(self, path):
+        stack = [('/' + self._normalize(path), self._dir(path))]
+        while stack:
+            dirpath, node = stack.pop()
+            dirnames, filenames = [], []
+            for name, child in node.entries.items():
+                (dirnames if isinstance(child, Directory) else filenames).append(name)
+            yield dirpath, node, dirnames, filenames
+            base = dirpath.rstrip('/')
+            for name in reversed(dirnames):
+                child = node.entries.get(name)
+                if isinstance(child, Directory):
+                    stack.append((f"{base}/{name}", child))
+
+    def _usage(self, node):
+        usage = node._usage
+        if usage is None:
+            total = files = largest = 0
+            for child in node.entries.values():
+                if isinstance(child, Directory):
+                    size, count, biggest = self._usage(child)
+                else:
+                    size, count, biggest = child.size, 1, child.size
+                total += size
+                files += count
+                largest = max(largest, biggest)
+            usage = node._usage = (total, files, largest)
+        return usage
+
+    def du(self, path='/'):
+        """Returns `(bytes, files)` stored below a path (or of a single file).
+
+        Directories cache these totals and a change only marks its ancestors
+        stale, so repeated calls only revisit the subtrees that changed.
+        """
+        parent_dir, name = self._resolve(path)
+        node = parent_dir.entries.get(name) if name is not None else self.root
+        if isinstance(node, File):
+            return node.size, 1
+        if node is None:
+            raise FileNotFoundError(f"File or directory not found: {path}")
+        return self._usage(node)[:2]
+
+    def find(self, path='/', name=None, kind=None, min_size=None, max_size=None):
+        """Yields the paths below `path` matching every given filter.
+
+        `name` is a glob pattern for the entry name and `kind` is 'f' or 'd'.
+        The inclusive size bounds only match files; subtrees whose largest
+        file is below `min_size` are skipped using the cached aggregates.
+        """
+        sized = min_size is not None or max_size is not None
+        for dirpath, node, dirnames, filenames in self._walk(path):
+            base = dirpath.rstrip('/')
+            if min_size is not None:
+                dirnames[:] = [d for d in dirnames if self._usage(node.entries[d])[2] >= min_size]
+            if kind != 'f' and not sized:
+                for d in dirnames:
+                    if name is None or fnmatch.fnmatchcase(d, name):
+                        yield f"{base}/{d}"
+            if kind == 'd':
+                continue
+            for f in filenames:
+                size = node.entries[f].size
+                if ((name is None or fnmatch.fnmatchcase(f, name)) and (min_size is None or size >= min_size)
+                        and (max_size is None or size <= max_size)):
+                    yield f"{base}/{f}"
+
+    def _file(self, path):
+        parent_dir, filename = self._resolve(path)
+        file_obj = parent_dir.entries.get(filename)
+        if not isinstance(file_obj, File):
+            raise FileNotFoundError(f"File not found: {path}")
+        return file_obj
+
+    def encrypt_file(self, path, password=None):
+        file_obj = self._writable_file(path)
+        file_obj.encrypt(password, kdf=crypto.new_kdf(self.kdf, self.kdf_cost, self._kdf_salt) if password else None)
+        self._journal_put(path, file_obj)
+
+    def unlock_file(self, path, password):
+        """Makes a password-encrypted file readable and writable for this session; nothing is journaled."""
+        self._file(path).unlock(password)
+
+    def decrypt_file(self, path, password=None):
+        file_obj = self._writable_file(path)
+        file_obj.decrypt(password)
+        self._journal_put(path, file_obj)
+
+    # ----- Offset-based I/O -----
+
+    def open(self, path, mode='r'):
+        """Opens a file handle. Modes: 'r', 'r+', 'w' (create or truncate), 'a' (create, append)."""
+        if mode not in FileHandle.MODES:
+            raise ValueError(f"Invalid mode: {mode!r}")
+        if mode in ('w', 'a'):
+            try:
+                self._file(path)
+            except FileNotFoundError:
+                self.create_file(path)
+            else:
+                if mode == 'w':
+                    self.truncate(path, 0)
+        else:
+            self._file(path)
+        return FileHandle(self, path, mode)
+
+    def pread(self, path, offset, size):
+        return self._file(path).pread(offset, size)
+
+    def pwrite(self, path, offset, data):
+        file_obj = self._writable_file(path)
+        if file_obj.encrypted:
+            # Journal the re-encrypted chunks, never the plaintext
+            writes, length = file_obj._encrypted_edit(crypto.pwrite_patch, offset, data)
+            self._journal('patch', path, writes, length, file_obj.timestamp)
+            return len(data)
+        written = file_obj.pwrite(offset, data)
+        self._journal('pwrite', path, offset, bytes(data), file_obj.timestamp)
+        return written
+
+    def append(self, path, data):
+        """Appends to a file; costs O(len(data)) however large the file is."""
+        return self.pwrite(path, self._file(path).length(), data)
+
+    def truncate(self, path, size):
+        file_obj = self._writable_file(path)
+        if file_obj.encrypted:
+            writes, length = file_obj._encrypted_edit(crypto.truncate_patch, size)
+            self._journal('patch', path, writes, length, file_obj.timestamp)
+            return
+        file_obj.truncate(size)
+        self._journal('truncate', path, size, file_obj.timestamp)
+
+    # ----- Search -----
+
+    def search(self, name=None, ext=None, kind=None, min_size=None, max_size=None, after=None, before=None,
+               path='/'):
+        """Sorted paths below `path` matching every given filter (see `MetadataIndex.search`).
+
+        The index is built on the first call and then updated by every
+        change, so later searches never walk the tree.
+        """
+        if self._index is None:
+            self._index = MetadataIndex(self._index_entries('/', self.root))
+        return self._index.search(name=name, ext=ext, kind=kind, min_size=min_size, max_size=max_size,
+                                  after=after, before=before, path=path)
+
+    @staticmethod
+    def _index_entries(path, node):
+        """`(path, is_dir, size, mtime)` of a node and everything below it; the root itself is left out."""
+        stack = [(path, node)]
+        while stack:
+            path, node = stack.pop()
+            if isinstance(node, File):
+                yield path, False, node.size, node.timestamp
+                continue
+            if path != '/':
+                yield path, True, 0, node.timestamp
+            base = path.rstrip('/')
+            stack.extend((f"{base}/{name}", child) for name, child in node.entries.items())
+
+    def _reindex(self, record):
+        op, path = record[0], record[1]
+        if op in ('delete', 'rename'):
+            self._index.remove_tree('/' + self._normalize(path))
+        if op == 'delete':
+            return
+        if op in ('rename', 'copy'):
+            path = record[2]
+        parent_dir, name = self._resolve(path)
+        node = parent_dir.entries.get(name)
+        if node is not None:
+            self._index.update(self._index_entries('/' + self._normalize(path), node))
+
+    # ----- Snapshots and clones -----
+
+    def snapshot(self, name):
+        """Freezes the current tree under `name` in O(1), whatever its size.
+
+        Snapshots live in memory only: checkpoints do not store them and
+        `load()` drops them.
+        """
+        if name in self._snapshots:
+            raise FileExistsError(f"Snapshot already exists: {name}")
+        self._snapshots[name] = self.root
+        self._token = object()  # Everything reachable now is shared with the snapshot
+        return name
+
+    def snapshots(self):
+        return list(self._snapshots)
+
+    def _snapshot_root(self, name):
+        try:
+            return self._snapshots[name]
+        except KeyError:
+            raise FileNotFoundError(f"Snapshot not found: {name}") from None
+
+    def delete_snapshot(self, name):
+        self._snapshot_root(name)
+        del self._snapshots[name]
+        self.gc()
+
+    def open_snapshot(self, name):
+        """Read-only FileSystem over a snapshot; changing it raises PermissionError."""
+        view = self._tree(self._snapshot_root(name))
+        view.read_only = True
+        return view
+
+    def rollback(self, name):
+        """Makes a snapshot the current tree again. The snapshot itself is kept.
+
+        The journal cannot express this as a redo record, so a persistent file
+        system writes a checkpoint right away; state newer than the snapshot is
+        then gone for good.
+        """
+        self._check_writable()
+        self.root = self._snapshot_root(name)
+        self._token = object()
+        self._dentries.clear()
+        self._index = None
+        if self.state_file:
+            self.checkpoint()
+        else:
+            self.gc()
+
+    def clone(self):
+        """Writable in-memory copy of the current tree, made in O(1).
+
+        Both trees share their nodes and block store until either side changes
+        them; changes to the clone are never journaled or saved.
+        """
+        self._token = object()
+        return self._tree(self.root)
+
+    def _tree(self, root):
+        tree = FileSystem(None, self.checkpoint_bytes, self.disk_image, self.dentry_cache_size, self.kdf,
+                          self.kdf_cost, self.chunking)
+        tree.root, tree.store, tree._disk, tree._kdf_salt = root, self.store, self._disk, self._kdf_salt
+        tree._token = object()
+        tree._family = self._family
+        self._family.add(tree)
+        return tree
+
+    def gc(self):
+        """Recounts block references over every tree sharing the store and frees unreferenced blocks.
+
+        Files shared with a snapshot or clone keep their references when they
+        are deleted or overwritten, since another tree may still read them;
+        this reclaims those that nothing refers to anymore.
+        """
+        refs = {}
+        for node in self._files(self._family):
+            if node._blocks is not None and node._blocks[0] is self.store:
+                for digest in node._blocks[1]:
+                    refs[digest] = refs.get(digest, 0) + 1
+        self.store.recount(refs)
+
+    @staticmethod
+    def _files(trees):
+        """Every distinct file reachable from the trees and their snapshots."""
+        seen = set()
+        stack = [root for tree in list(trees) for root in (tree.root, *tree._snapshots.values())]
+        while stack:
+            node = stack.pop()
+            if id(node) in seen:
+                continue
+            seen.add(id(node))
+            if isinstance(node, Directory):
+                stack.extend(node.entries.values())
+            else:
+                yield node
+
+    def _release_disk(self, trees, rebound=()):
+        """Unmaps the current image, e.g. before it is replaced; Windows refuses to replace a mapped file.
+
+        Files of `trees` still reading from it copy their content out first,
+        except those in `rebound`, which are about to be bound to a new image.
+        """
+        disk = self._disk
+        if disk is None:
+            return
+        rebound = {id(node) for node in rebound}
+        for node in self._files(trees):
+            if node._source is not None and node._source[0] is disk and id(node) not in rebound:
+                node.content  # Copies it out of the mapping
+        disk.close()
+
+    # ----- Journal -----
+
+    def _changed(self, record):
+        """Marks the cached size aggregates above the paths of an operation stale."""
+        paths = record[1:3] if record[0] in ('rename', 'copy') else record[1:2]
+        for path in paths:
+            node = self.root
+            node._usage = None
+            for part in self._normalize(path).split('/')[:-1]:
+                node = node.entries.get(part)
+                if not isinstance(node, Directory):
+                    break
+                node._usage = None
+        if self._index is not None:
+            self._reindex(record)
+
+    def _journal(self, op, *args):
+        # Every change to the tree is journaled, so aggregates are invalidated here
+        self._changed((op,) + args)
+        if not self.state_file:
+            return
+        self._seq += 1
+        payload = pickle.dumps((op,) + args, protocol=pickle.HIGHEST_PROTOCOL)
+        self._pending.append(_JOURNAL_HEADER.pack(len(payload), zlib.crc32(payload), self._seq) + payload)
+
+    def _journal_put(self, path, file_obj):
+        # Every whole-content write ends up here, so this is where content is deduplicated
+        file_obj._intern(self.store)
+        # Redo records carry the resulting bytes, so replay never re-encrypts (Fernet output is random)
+        self._journal('put', path, file_obj.content, file_obj.encrypted, file_obj.persisted_key(),
+                      file_obj.timestamp, file_obj.kdf)
+
+    def _apply(self, record):
+        """Redoes one journaled operation on the in-memory tree."""
+        op, path = record[0], record[1]
+        parent_dir, name = self._resolve(path)
+        if op == 'mkdir':
+            parent_dir.entries[name] = Directory(name)
+            self._dentries.pop(self._normalize(path), None)
+        elif op == 'put':
+            content, encrypted, key, timestamp = record[2:6]
+            file_obj = parent_dir.entries.get(name)
+            if not isinstance(file_obj, File):
+                file_obj = parent_dir.entries[name] = File(name)
+            file_obj.content, file_obj.encrypted, file_obj.key = content, encrypted, key
+            file_obj.kdf = record[6] if len(record) > 6 else None
+            file_obj._intern(self.store)
+            file_obj.size = len(content)
+            file_obj.timestamp = timestamp
+        elif op in ('pwrite', 'truncate', 'patch'):
+            file_obj = parent_dir.entries.get(name)
+            if not isinstance(file_obj, File):
+                raise FileNotFoundError(f"File not found: {path}")
+            if op == 'pwrite':
+                file_obj.pwrite(record[2], record[3])
+            elif op == 'truncate':
+                file_obj.truncate(record[2])
+            else:
+                file_obj._patch(record[2], record[3])
+            file_obj.timestamp = record[-1]
+        elif op == 'copy':
+            node = parent_dir.entries.get(name)
+            if node is None:
+                raise FileNotFoundError(f"File or directory not found: {path}")
+            dst_parent, dst_name = self._resolve(record[2])
+            dst_parent.entries[dst_name] = self._copy_tree(node, dst_name, record[3])
+        elif op == 'delete':
+            node = parent_dir.entries.pop(name, None)
+            if node is not None:
+                self._release_tree(node)
+            self._invalidate(path)
+        elif op == 'rename':
+            dst_parent, dst_name = self._resolve(record[2])
+            node = parent_dir.entries.pop(name, None)
+            if node is None:
+                raise FileNotFoundError(f"File or directory not found: {path}")
+            node.name = dst_name
+            dst_parent.entries[dst_name] = node
+            self._invalidate(path)
+        else:
+            raise ValueError(f"Unknown journal operation: {op}")
+        self._changed(record)
+
+    def _read_journal(self, after_seq):
+        """Yields (end offset, seq, record) for intact records; stops at a torn or corrupt tail."""
+        try:
+            f = open(self.journal_file, 'rb')
+        except FileNotFoundError:
+            return
+        with f:
+            offset = 0
+            while True:
+                header = f.read(_JOURNAL_HEADER.size)
+                if len(header) < _JOURNAL_HEADER.size:
+                    return
+                length, crc, seq = _JOURNAL_HEADER.unpack(header)
+                payload = f.read(length)
+                if len(payload) < length or zlib.crc32(payload) != crc:
+                    return
+                offset += _JOURNAL_HEADER.size + length
+                if seq > after_seq:
+                    yield offset, seq, pickle.loads(payload)
+                else:
+                    yield offset, seq, None
 
     def save(self):
-        with open(self.state_file, 'wb') as f:
-            pickle.dump(self.root, f)
+        """Commits pending changes to the journal, checkpointing when it has grown large."""
+        if not self.state_file:
+            return
+        if self._pending:
+            with open(self.journal_file, 'ab') as f:
+                f.write(b''.join(self._pending))
+                f.flush()
+                os.fsync(f.fileno())
+            self._pending = []
+        try:
+            journal_size = os.path.getsize(self.journal_file)
+        except FileNotFoundError:
+            journal_size = 0
+        if journal_size > self.checkpoint_bytes:
+            self.checkpoint()
+
+    def checkpoint(self):
+        """Writes the whole tree atomically and empties the journal."""
+        if not self.state_file:
+            return
+        tmp_file = self.state_file + '.tmp'
+        if self.disk_image:
+            inodes = write_image(tmp_file, self.root, seq=self._seq)
+            # Files only snapshots or clones still have in the old image are copied out of it
+            self._release_disk(self._family, [node for node, _ in inodes])
+        else:
+            stack = [self.root]
+            while stack:
+                for node in stack.pop().entries.values():
+                    if isinstance(node, Directory):
+                        stack.append(node)
+                    else:
+                        node._intern(self.store)
+            self.gc()  # Blocks only dropped clones or deleted shared files used are not written
+            with open(tmp_file, 'wb') as f:
+                pickle.dump({'version': CHECKPOINT_VERSION, 'seq': self._seq, 'root': self.root,
+                             'store': self.store}, f, protocol=pickle.HIGHEST_PROTOCOL)
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_file, self.state_file)
+        if self.disk_image:
+            # Everything is on disk now: serve content from the new image and free the in-memory copies
+            disk = DiskImage(self.state_file)
+            for node, ino in inodes:
+                if isinstance(node, File):
+                    node._bind(disk, ino, node.size)
+            for tree in self._family:
+                tree._attach(disk)
+            self.gc()
+        # A crash before this truncation is harmless: load() skips records the checkpoint already holds
+        with open(self.journal_file, 'wb'):
+            pass
+        self._pending = []
+
+    def _attach(self, disk):
+        # Not closed here: checkpoint() and load() unmap an image once no tree reads from it
+        self._disk = disk
+
+    def _load_image(self, disk):
+        """Builds the tree from an image's metadata; file content stays in the mapping."""
+        self.root.timestamp = disk.inode(ROOT_INODE)[3]
+        stack = [(self.root, ROOT_INODE)]
+        while stack:
+            dir_obj, dir_ino = stack.pop()
+            for name, ino in disk.listdir(dir_ino).items():
+                mode, encrypted, size, mtime, key, kdf = disk.inode(ino)
+                if mode == MODE_DIR:
+                    node = Directory(name)
+                    stack.append((node, ino))
+                else:
+                    node = File(name, encrypted=encrypted, key=key, kdf=kdf)
+                    node._bind(disk, ino, size)
+                node.timestamp = mtime
+                dir_obj.entries[name] = node
+        self._seq = disk.seq
 
     def load(self):
+        self.root = Directory('/')
+        self._seq = 0
+        self._pending = []
+        self._dentries.clear()
+        self._family.discard(self)
+        # Clones made before the reload keep working from memory; the image may be replaced later
+        self._release_disk(self._family)
+        self._attach(None)
+        self.store = BlockStore(self.chunking)
+        self._token = None
+        self._snapshots = {}
+        self._index = None
+        self._family = weakref.WeakSet([self])
+        if not self.state_file:
+            return
         try:
-            with open(self.state_file, 'rb') as f:
-                self.root = pickle.load(f)
+            if is_image(self.state_file):
+                self._attach(DiskImage(self.state_file))
+                self._load_image(self._disk)
+            else:
+                with open(self.state_file, 'rb') as f:
+                    state = pickle.load(f)
+                if isinstance(state, Directory):  # Checkpoint written before journaling existed
+                    self.root = state
+                else:
+                    self.root, self._seq = state['root'], state['seq']
+                    self.store = state.get('store') or self.store
         except FileNotFoundError:
-            self.root = Directory('/')
+            pass
         except Exception as e:
             print(f"Error loading filesystem state: {e}. Starting with a new filesystem.")
-            self.root = Directory('/')
\ No newline at end of file
+            self.root = Directory('/')
+            self._seq = 0
+            self.store = BlockStore(self.chunking)
+
+        checkpoint_seq = self._seq
+        good_offset = 0
+        for good_offset, seq, record in self._read_journal(checkpoint_seq):
+            if record is not None:
+                try:
+                    self._apply(record)
+                except (FileNotFoundError, ValueError) as e:
+                    print(f"Skipping journal record {seq}: {e}")
+            self._seq = max(self._seq, seq)
+        # Drop a torn tail so later appends start on a record boundary
+        if os.path.exists(self.journal_file) and os.path.getsize(self.journal_file) > good_offset:
+            with open(self.journal_file, 'r+b') as f:
+                f.truncate(good_offset)
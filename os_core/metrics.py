@@ -0,0 +1,148 @@
+class StreamingHistogram:
+    """HDR-style log-linear histogram for streaming percentiles.
+
+    Values are bucketed by their top `significant_bits` bits, so every recorded
+    value is represented within a relative error of 2**-(significant_bits - 1)
+    (values below 2**significant_bits are exact). Memory depends only on the
+    value range, never on the number of samples, and histograms can be merged.
+    Values are non-negative and multiplied by `scale` before bucketing, so
+    fractional inputs keep their precision.
+    """
+
+    def __init__(self, significant_bits=7, scale=1):
+        if significant_bits < 2:
+            raise ValueError("significant_bits must be at least 2.")
+        self.significant_bits = significant_bits
+        self.scale = scale
+        self.counts = {}  # (shift, mantissa): samples
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def _bucket(self, value):
+        shift = max(0, value.bit_length() - self.significant_bits)
+        return shift, value >> shift
+
+    def record(self, value, count=1):
+        if value < 0:
+            raise ValueError("StreamingHistogram only records non-negative values.")
+        key = self._bucket(int(round(value * self.scale)))
+        self.counts[key] = self.counts.get(key, 0) + count
+        self.count += count
+        self.total += value * count
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other):
+        """Adds another histogram with the same precision and scale into this one."""
+        if (other.significant_bits, other.scale) != (self.significant_bits, self.scale):
+            raise ValueError("Histograms must share significant_bits and scale to merge.")
+        for key, count in other.counts.items():
+            self.counts[key] = self.counts.get(key, 0) + count
+        self.count += other.count
+        self.total += other.total
+        if other.count:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    def percentile(self, p):
+        """Value at percentile `p` (0..100), within the histogram's precision."""
+        if not self.count:
+            return None
+        rank = max(1, -(-p * self.count // 100))
+        seen = 0
+        for shift, mantissa in sorted(self.counts):
+            seen += self.counts[(shift, mantissa)]
+            if seen >= rank:
+                low = mantissa << shift
+                high = ((mantissa + 1) << shift) - 1
+                value = (low + high) / 2 / self.scale
+                # The extremes are tracked exactly, never report past them
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'mean': self.mean(),
+            'min': self.min,
+            'max': self.max,
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'p99': self.percentile(99),
+        }
+
+
+class MetricsCollector:
+    """Scheduler metrics fed by simulation state-transition events.
+
+    Register it as an observer of a `SchedulerSimulation` (or every CPU of an
+    `SMPSimulation`). It keeps counters and one `StreamingHistogram` per
+    latency metric, so memory stays constant however many processes finish.
+    Events are `arrive`, `dispatch`, `expire`, `preempt`, `block`, `wakeup` and
+    `exit`, each delivered as `on_event(event, time, pcb)`.
+    """
+
+    def __init__(self, num_cpus=1, significant_bits=7):
+        self.num_cpus = num_cpus
+        self.turnaround = StreamingHistogram(significant_bits)
+        self.waiting = StreamingHistogram(significant_bits)
+        self.response = StreamingHistogram(significant_bits)
+        self.arrivals = 0
+        self.completed = 0
+        self.dispatches = 0
+        self.context_switches = 0
+        self.busy_time = 0
+        self.start_time = None
+        self.end_time = 0
+        self._running_since = {}  # pid: (time it was dispatched, its overhead_time then); running processes only
+        self._last_pid = {}  # cpu: pid dispatched last on it
+
+    def on_event(self, event, time, pcb):
+        if self.start_time is None:
+            self.start_time = time
+        self.end_time = max(self.end_time, time)
+
+        if event == 'arrive':
+            self.arrivals += 1
+        elif event == 'dispatch':
+            self.dispatches += 1
+            last = self._last_pid.get(pcb.cpu)
+            if last is not None and last != pcb.pid:
+                self.context_switches += 1
+            self._last_pid[pcb.cpu] = pcb.pid
+            self._running_since[pcb.pid] = (time, pcb.overhead_time)
+        elif event in ('expire', 'preempt', 'block', 'exit'):
+            since = self._running_since.pop(pcb.pid, None)
+            if since is not None:
+                # Dispatch overhead ticks are not useful work
+                self.busy_time += time - since[0] - (pcb.overhead_time - since[1])
+            if event == 'exit':
+                self.completed += 1
+                turnaround = time - pcb.arrival_time
+                self.turnaround.record(turnaround)
+                self.waiting.record(max(0, turnaround - pcb.burst_time - pcb.io_time))
+                self.response.record(pcb.first_run_time - pcb.arrival_time)
+
+    def elapsed(self):
+        return self.end_time - self.start_time if self.start_time is not None else 0
+
+    def summary(self):
+        """Throughput, CPU utilization, context switches and latency percentiles."""
+        elapsed = self.elapsed()
+        return {
+            'elapsed': elapsed,
+            'arrivals': self.arrivals,
+            'completed': self.completed,
+            'throughput': self.completed / elapsed if elapsed else 0.0,
+            'cpu_utilization': self.busy_time / (elapsed * self.num_cpus) if elapsed else 0.0,
+            'dispatches': self.dispatches,
+            'context_switches': self.context_switches,
+            'turnaround': self.turnaround.summary(),
+            'waiting': self.waiting.summary(),
+            'response': self.response.summary(),
+        }
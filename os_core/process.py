@@ -1,26 +1,165 @@
 import itertools
+import threading
+
+# Linux's PID_MAX_LIMIT on 64-bit systems
+DEFAULT_PID_MAX = 4194304
+_PID_PAGE_BITS = 4096
+
+
+class PidAllocator:
+    """A PID namespace that hands out and recycles PIDs in 1..pid_max.
+
+    Fresh PIDs come from an `itertools.count`, whose `next()` is atomic under
+    the GIL, so the common path takes no lock. Released PIDs are recorded in a
+    free bitmap (one int per 4096-PID page, with a free count per page, like
+    Linux's pidmap) and are only reused after the fresh range runs out; that
+    slow path scans cyclically from the last recycled PID under a lock.
+    """
+
+    def __init__(self, pid_max=DEFAULT_PID_MAX):
+        if pid_max < 1:
+            raise ValueError("pid_max must be a positive integer.")
+        self.pid_max = pid_max
+        self._fresh = itertools.count(1)
+        self._lock = threading.Lock()
+        self._free_pages = {}  # page index: bitmap int of released PIDs
+        self._free_counts = {}  # page index: set bits in that page
+        self._cursor = 0  # PID the cyclic scan resumes from
+
+    def allocate(self):
+        pid = next(self._fresh)
+        if pid <= self.pid_max:
+            return pid
+        with self._lock:
+            return self._recycle()
+
+    def _recycle(self):
+        if not self._free_pages:
+            raise RuntimeError(f"PID space exhausted (pid_max={self.pid_max}).")
+        pages = sorted(self._free_pages)
+        start_page, start_bit = divmod(self._cursor, _PID_PAGE_BITS)
+        # Pages at or after the cursor first, then wrap around
+        ordered = [page for page in pages if page >= start_page] + [page for page in pages if page < start_page]
+        candidates = [(page, self._free_pages[page]) for page in ordered]
+        if start_page in self._free_pages:
+            # The cursor's own page is split: bits above the cursor come first, the rest last
+            candidates[0] = (start_page, candidates[0][1] >> start_bit << start_bit)
+            candidates.append((start_page, self._free_pages[start_page]))
+        for page, bits in candidates:
+            if not bits:
+                continue
+            bit = (bits & -bits).bit_length() - 1
+            self._free_pages[page] ^= 1 << bit
+            self._free_counts[page] -= 1
+            if not self._free_counts[page]:
+                del self._free_pages[page], self._free_counts[page]
+            pid = page * _PID_PAGE_BITS + bit
+            self._cursor = pid + 1
+            return pid
+
+    def release(self, pid):
+        """Returns `pid` to the namespace for later reuse."""
+        if not 1 <= pid <= self.pid_max:
+            raise ValueError(f"PID {pid} is outside 1..{self.pid_max}.")
+        page, bit = divmod(pid, _PID_PAGE_BITS)
+        with self._lock:
+            bits = self._free_pages.get(page, 0)
+            if bits >> bit & 1:
+                raise ValueError(f"PID {pid} is already free.")
+            self._free_pages[page] = bits | 1 << bit
+            self._free_counts[page] = self._free_counts.get(page, 0) + 1
+
+    def free_count(self):
+        """Released PIDs waiting to be reused."""
+        with self._lock:
+            return sum(self._free_counts.values())
+
 
 class PCB:
-    _pid_counter = itertools.count(1)
+    # Slots keep a PCB small; simulations may hold millions of them
+    __slots__ = ('pid', 'name', 'state', 'memory_requirements_bytes', 'num_pages_required', '_page_table',
+                 'program_counter', '_registers', 'priority', '_open_files', 'bursts', 'burst_index',
+                 'burst_time', 'remaining_time', 'time_in_current_quantum', 'arrival_time', 'first_run_time',
+                 'completion_time', 'overhead_time', 'affinity', 'cpu', 'io_device', 'io_time', 'period', 'deadline', 'wcet',
+                 'absolute_deadline')
 
-    def __init__(self, name, memory_requirements_bytes, page_size, priority=0, burst_time=10): # MODIFIED: Added page_size parameter
-        self.pid = next(PCB._pid_counter)
+    default_pids = PidAllocator() # Namespace for PCBs created without one
+
+    def __init__(self, name, memory_requirements_bytes, page_size, priority=0, burst_time=10, bursts=None,
+                 pids=None): # MODIFIED: Added page_size parameter
+        self.pid = (pids if pids is not None else PCB.default_pids).allocate()
         self.name = name
         self.state = 'NEW'  # NEW, READY, RUNNING, WAITING, TERMINATED
         self.memory_requirements_bytes = memory_requirements_bytes
         if not isinstance(page_size, int) or page_size <= 0:
             raise ValueError("page_size must be a positive integer for PCB.")
         self.num_pages_required = (memory_requirements_bytes + page_size - 1) // page_size # Calculate pages
-        self.page_table = {}  # Virtual Page Num -> PageTableEntry object
+        self._page_table = None  # Virtual Page Num -> PageTableEntry object, created on first use
         self.program_counter = 0
-        self.registers = {}
+        self._registers = None
         self.priority = priority
-        self.open_files = []
+        self._open_files = None
+        # Alternating CPU and I/O burst lengths, starting and ending with CPU; None means one CPU burst
+        self.bursts = tuple(bursts) if bursts else None
+        self.burst_index = 0 # Index into bursts of the current phase
+        if self.bursts:
+            if len(self.bursts) % 2 == 0:
+                raise ValueError("bursts must alternate CPU and I/O and end with a CPU burst.")
+            burst_time = sum(self.bursts[0::2])
         self.burst_time = burst_time  # Total time needed
-        self.remaining_time = burst_time # Time left to execute
+        self.remaining_time = self.bursts[0] if self.bursts else burst_time # Time left in the current CPU burst
         self.time_in_current_quantum = 0 # For RR and MLFQ
+        self.arrival_time = 0 # Set by the simulation when the process is submitted
+        self.first_run_time = None # First dispatch, for response time
+        self.completion_time = None
+        self.overhead_time = 0 # Dispatch overhead ticks (context switch, cache, migration) charged to it
+        self.affinity = None # None = any CPU, else the set of CPU ids it may run on (SMP)
+        self.cpu = None # CPU the process was last placed on (SMP)
+        self.io_device = None # Name of the device its I/O goes to; None = the simulation's first device
+        self.io_time = 0 # Time spent blocked on I/O, including device queueing
+        # Real-time jobs (see os_core.realtime); None for ordinary processes
+        self.period = None # Release period of the task the job belongs to
+        self.deadline = None # Deadline relative to the release (arrival) time
+        self.wcet = None # Worst-case execution time of the task
+        self.absolute_deadline = None # arrival_time + deadline
+
+    # CPU-only processes never touch these, so the containers are only built when asked for
+
+    @property
+    def page_table(self):
+        if self._page_table is None:
+            self._page_table = {}
+        return self._page_table
+
+    @page_table.setter
+    def page_table(self, value):
+        self._page_table = value
+
+    @property
+    def registers(self):
+        if self._registers is None:
+            self._registers = {}
+        return self._registers
+
+    @registers.setter
+    def registers(self, value):
+        self._registers = value
+
+    @property
+    def open_files(self):
+        if self._open_files is None:
+            self._open_files = []
+        return self._open_files
+
+    @open_files.setter
+    def open_files(self, value):
+        self._open_files = value
+
+    def has_io_pending(self):
+        """True when the current CPU burst is followed by an I/O burst."""
+        return bool(self.bursts) and self.burst_index < len(self.bursts) - 1
 
     @staticmethod
     def reset_pid_counter():
-        """Resets the class-level PID counter to start from 1 again."""
-        PCB._pid_counter = itertools.count(1)
\ No newline at end of file
+        """Resets the default PID namespace to start from 1 again."""
+        PCB.default_pids = PidAllocator()
\ No newline at end of file
@@ -0,0 +1,185 @@
+import heapq
+import math
+import random
+
+from os_core.metrics import StreamingHistogram
+from os_core.process import PCB
+from os_core.simulation import DEFAULT_PAGE_SIZE
+
+# Jobs are named "<task>#<n>"; the monitor groups misses by the part before it
+JOB_SEPARATOR = '#'
+SCHEDULING_POLICIES = ('EDF', 'RM')
+
+
+class RealTimeTask:
+    """A periodic (or sporadic) task releasing one job every `period` ticks.
+
+    Each job needs at most `wcet` ticks of CPU and must finish within
+    `deadline` ticks of its release (the period when not given). A sporadic
+    task treats `period` as the minimum inter-arrival time and delays each
+    release by up to `jitter` extra ticks. With `bcet` set, actual execution
+    times are drawn between `bcet` and `wcet`.
+    """
+
+    def __init__(self, name, wcet, period, deadline=None, phase=0, sporadic=False, jitter=0, bcet=None):
+        if wcet <= 0 or period <= 0:
+            raise ValueError("wcet and period must be positive.")
+        deadline = period if deadline is None else deadline
+        if deadline < wcet:
+            raise ValueError(f"Task {name} cannot meet a deadline shorter than its WCET.")
+        if bcet is not None and not 0 < bcet <= wcet:
+            raise ValueError("bcet must be in 1..wcet.")
+        self.name = name
+        self.wcet = wcet
+        self.period = period
+        self.deadline = deadline
+        self.phase = phase
+        self.sporadic = sporadic
+        self.jitter = jitter
+        self.bcet = bcet
+
+    @property
+    def utilization(self):
+        return self.wcet / self.period
+
+    def __repr__(self):
+        return f"RealTimeTask({self.name!r}, wcet={self.wcet}, period={self.period}, deadline={self.deadline})"
+
+
+def release_jobs(tasks, horizon, pids=None, seed=None):
+    """Yields the job PCBs all `tasks` release before `horizon`, in arrival order.
+
+    Feed the result to `SchedulerSimulation.load_workload`; pass `pids=sim.pids`
+    so the jobs share the simulation's PID namespace.
+    """
+    rng = random.Random(seed)
+    releases = [(task.phase, index, 0) for index, task in enumerate(tasks)]
+    heapq.heapify(releases)
+    while releases:
+        release, index, number = heapq.heappop(releases)
+        if release >= horizon:
+            continue
+        task = tasks[index]
+        execution = rng.randint(task.bcet, task.wcet) if task.bcet is not None else task.wcet
+        job = PCB(name=f"{task.name}{JOB_SEPARATOR}{number}", memory_requirements_bytes=0,
+                  page_size=DEFAULT_PAGE_SIZE, burst_time=execution, pids=pids)
+        job.arrival_time = release
+        job.period = task.period
+        job.deadline = task.deadline
+        job.wcet = task.wcet
+        job.absolute_deadline = release + task.deadline
+        yield job
+        gap = task.period + (rng.randint(0, task.jitter) if task.sporadic and task.jitter else 0)
+        heapq.heappush(releases, (release + gap, index, number + 1))
+
+
+def utilization(tasks):
+    return sum(task.utilization for task in tasks)
+
+
+def liu_layland_bound(n):
+    """Rate-monotonic utilization bound n(2^(1/n) - 1) for `n` tasks."""
+    return n * (2 ** (1 / n) - 1) if n else 1.0
+
+
+def _response_times(tasks):
+    """Worst-case response time of each task under rate-monotonic priorities (None if unbounded)."""
+    ordered = sorted(tasks, key=lambda task: task.period)
+    results = {}
+    for i, task in enumerate(ordered):
+        higher = ordered[:i]
+        response = task.wcet + sum(other.wcet for other in higher)
+        while response <= task.deadline:
+            demand = task.wcet + sum(math.ceil(response / other.period) * other.wcet for other in higher)
+            if demand == response:
+                break
+            response = demand
+        results[task.name] = response if response <= task.deadline else None
+    return results
+
+
+def schedulability(tasks, policy='EDF'):
+    """Utilization-bound schedulability test for `tasks` under EDF or RM.
+
+    EDF with deadlines equal to periods is exact at U <= 1; with shorter
+    deadlines the density test is used, which is only sufficient (`schedulable`
+    is None when it is inconclusive). For RM the Liu & Layland bound is
+    sufficient, and task sets above it fall back to an exact response-time
+    analysis.
+    """
+    if policy not in SCHEDULING_POLICIES:
+        raise ValueError(f"policy must be one of {SCHEDULING_POLICIES}.")
+    total = utilization(tasks)
+    if policy == 'EDF':
+        implicit = all(task.deadline >= task.period for task in tasks)
+        load = total if implicit else sum(task.wcet / min(task.deadline, task.period) for task in tasks)
+        return {'policy': policy, 'utilization': total, 'bound': 1.0, 'passes_bound': load <= 1,
+                'schedulable': load <= 1 if implicit or load <= 1 else None}
+    bound = liu_layland_bound(len(tasks))
+    implicit = all(task.deadline == task.period for task in tasks)
+    passes_bound = implicit and total <= bound
+    response_times = _response_times(tasks)
+    return {'policy': policy, 'utilization': total, 'bound': bound, 'passes_bound': passes_bound,
+            'schedulable': all(r is not None for r in response_times.values()),
+            'response_times': response_times}
+
+
+class DeadlineMonitor:
+    """Simulation observer tracking deadline misses and lateness of real-time jobs.
+
+    Lateness is completion minus absolute deadline (negative when early).
+    Tardiness (lateness clamped at 0) goes into a `StreamingHistogram` for
+    percentiles. Processes without a deadline are ignored.
+    """
+
+    def __init__(self, significant_bits=7):
+        self.released = 0
+        self.completed = 0
+        self.misses = 0
+        self.misses_by_task = {}
+        self.tardiness = StreamingHistogram(significant_bits)
+        self.lateness_total = 0
+        self.lateness_min = None
+        self.lateness_max = None
+        self._live = {}  # pid: absolute deadline of released, unfinished jobs
+
+    def on_event(self, event, time, pcb):
+        if pcb.absolute_deadline is None:
+            return
+        if event == 'arrive':
+            self.released += 1
+            self._live[pcb.pid] = pcb.absolute_deadline
+        elif event == 'exit':
+            self._live.pop(pcb.pid, None)
+            lateness = time - pcb.absolute_deadline
+            self.completed += 1
+            self.lateness_total += lateness
+            self.lateness_min = lateness if self.lateness_min is None else min(self.lateness_min, lateness)
+            self.lateness_max = lateness if self.lateness_max is None else max(self.lateness_max, lateness)
+            self.tardiness.record(max(0, lateness))
+            if lateness > 0:
+                self.misses += 1
+                task = pcb.name.rsplit(JOB_SEPARATOR, 1)[0]
+                self.misses_by_task[task] = self.misses_by_task.get(task, 0) + 1
+
+    def overdue(self, time):
+        """Unfinished jobs whose deadline has already passed at `time`."""
+        return sum(1 for deadline in self._live.values() if deadline < time)
+
+    def summary(self, time=None):
+        """Miss counts and lateness statistics; pass the current time to count overdue jobs too."""
+        overdue = self.overdue(time) if time is not None else 0
+        return {
+            'released': self.released,
+            'completed': self.completed,
+            'misses': self.misses,
+            'overdue': overdue,
+            'miss_ratio': (self.misses + overdue) / self.released if self.released else 0.0,
+            'misses_by_task': dict(self.misses_by_task),
+            'lateness': {
+                'mean': self.lateness_total / self.completed if self.completed else None,
+                'min': self.lateness_min,
+                'max': self.lateness_max,
+            },
+            'tardiness': self.tardiness.summary(),
+        }
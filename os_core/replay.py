@@ -0,0 +1,181 @@
+import itertools
+import struct
+
+from os_core.simulation import OVERHEAD
+
+# Log layout: MAGIC, then records of
+#   <BqI header (event code, time, pid), followed by
+#   arrive:   <IH (burst_time, name length) + UTF-8 name
+#   dispatch: <II (quantum, overhead ticks charged before it runs)
+#   end:      nothing; written by close() with the final simulation time
+# all little-endian. One log holds one run; records are only ever appended to it.
+LOG_MAGIC = b"MOSLOG1\0"
+EVENTS = ('arrive', 'dispatch', 'expire', 'preempt', 'block', 'wakeup', 'exit', 'end')
+_EVENT_CODES = {event: code for code, event in enumerate(EVENTS)}
+_HEADER = struct.Struct('<BqI')
+_ARRIVE = struct.Struct('<IH')
+_DISPATCH = struct.Struct('<II')
+# Events that take the CPU away from the dispatched process
+_STOP_EVENTS = ('expire', 'preempt', 'block', 'exit')
+
+
+class EventRecorder:
+    """Simulation observer appending every scheduling decision to a binary log.
+
+    Attach it with `EventRecorder(path).attach(sim)`; every `get_next`
+    decision is logged as a `dispatch` record with its quantum, and every state
+    transition with its time and PID. Call `close()` (or use it as a context
+    manager) when the run ends, so the log records the final time. An
+    existing file at `path` is overwritten.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.sim = None
+        self.records = 0
+        self._file = open(path, 'wb')  # A log from an earlier run at this path is replaced
+        self._file.write(LOG_MAGIC)
+
+    def attach(self, sim):
+        self.sim = sim
+        sim.observers.append(self)
+        return self
+
+    def on_event(self, event, time, pcb):
+        write = self._file.write
+        write(_HEADER.pack(_EVENT_CODES[event], time, pcb.pid))
+        if event == 'arrive':
+            name = pcb.name.encode('utf-8')[:0xFFFF]
+            write(_ARRIVE.pack(pcb.burst_time, len(name)))
+            write(name)
+        elif event == 'dispatch':
+            sim = self.sim
+            write(_DISPATCH.pack(int(sim.current_time_slice), sim.overhead_remaining) if sim else _DISPATCH.pack(0, 0))
+        self.records += 1
+
+    def close(self):
+        if self._file.closed:
+            return
+        if self.sim is not None:
+            self._file.write(_HEADER.pack(_EVENT_CODES['end'], self.sim.time, 0))
+            self.sim.observers.remove(self)
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def read_log(path):
+    """Streams `(event, time, pid, extra)` records from a log.
+
+    `extra` is `(name, burst_time)` for arrivals, `(quantum, overhead)` for
+    dispatches and None otherwise. A torn final record (e.g. after a crash)
+    raises ValueError.
+    """
+    with open(path, 'rb') as f:
+        if f.read(len(LOG_MAGIC)) != LOG_MAGIC:
+            raise ValueError(f"Not a scheduling log: {path}")
+        while True:
+            header = f.read(_HEADER.size)
+            if not header:
+                return
+            if len(header) < _HEADER.size:
+                raise ValueError(f"Truncated scheduling log: {path}")
+            code, time, pid = _HEADER.unpack(header)
+            event = EVENTS[code]
+            extra = None
+            if event == 'arrive':
+                burst, length = _ARRIVE.unpack(_read_exact(f, _ARRIVE.size, path))
+                extra = (_read_exact(f, length, path).decode('utf-8'), burst)
+            elif event == 'dispatch':
+                extra = _DISPATCH.unpack(_read_exact(f, _DISPATCH.size, path))
+            yield event, time, pid, extra
+
+
+def _read_exact(f, size, path):
+    data = f.read(size)
+    if len(data) < size:
+        raise ValueError(f"Truncated scheduling log: {path}")
+    return data
+
+
+def decisions(path):
+    """Streams the `(time, pid, quantum)` dispatch decisions of a log."""
+    for event, time, pid, extra in read_log(path):
+        if event == 'dispatch':
+            yield time, pid, extra[0]
+
+
+def diff_decisions(path_a, path_b, limit=None):
+    """Yields `(index, decision_a, decision_b)` wherever two logs decided differently.
+
+    A missing decision (one log is shorter) shows up as None. Stops after
+    `limit` differences.
+    """
+    pairs = itertools.zip_longest(decisions(path_a), decisions(path_b))
+    differences = ((index, a, b) for index, (a, b) in enumerate(pairs) if a != b)
+    return itertools.islice(differences, limit)
+
+
+def replay(path):
+    """Rebuilds the timeline and per-process metrics from a log, without any scheduler.
+
+    The result has the same `time`, `timeline` and `processes` entries as
+    `SchedulerSimulation.results()` for the recorded run.
+    """
+    timeline = []
+    state = {}  # pid: [name, arrival, burst, first_run, io_time, blocked_at]
+    processes = {}
+    running = None  # (pid, dispatch time, overhead)
+    end_time = 0
+
+    def segment(pid, start, end):
+        if end <= start:
+            return
+        gap_start = timeline[-1][2] if timeline else 0
+        if start > gap_start:
+            segment(None, gap_start, start)
+        if timeline and timeline[-1][0] == pid and timeline[-1][2] == start:
+            timeline[-1][2] = end
+        else:
+            timeline.append([pid, start, end])
+
+    def run_until(time):
+        pid, start, overhead = running
+        segment(OVERHEAD, start, min(start + overhead, time))
+        segment(pid, start + overhead, time)
+
+    for event, time, pid, extra in read_log(path):
+        end_time = max(end_time, time)
+        if event == 'arrive':
+            state[pid] = [extra[0], time, extra[1], None, 0, None]
+        elif event == 'dispatch':
+            running = (pid, time, extra[1])
+            if state[pid][3] is None:
+                state[pid][3] = time
+        elif event in _STOP_EVENTS and running is not None and running[0] == pid:
+            run_until(time)
+            running = None
+        if event == 'block':
+            state[pid][5] = time
+        elif event == 'wakeup':
+            state[pid][4] += time - state[pid][5]
+        elif event == 'exit':
+            name, arrival, burst, first_run, io_time, _ = state.pop(pid)
+            turnaround = time - arrival
+            processes[pid] = {
+                'pid': pid, 'name': name, 'arrival': arrival, 'burst': burst, 'completion': time,
+                'turnaround': turnaround, 'waiting': turnaround - burst - io_time, 'io': io_time,
+                'response': first_run - arrival,
+            }
+    if running is not None:
+        run_until(end_time)
+    segment(None, timeline[-1][2] if timeline else 0, end_time)
+    return {
+        'time': end_time,
+        'timeline': [tuple(s) for s in timeline],
+        'processes': processes,
+    }
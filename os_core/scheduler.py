@@ -1,5 +1,42 @@
 from abc import ABC, abstractmethod
 from collections import deque # Add deque for other schedulers
+import heapq
+import itertools
+import math
+import random
+
+class _VersionedDeque(deque):
+    """Deque that counts its mutations, so renderings of it can be cached."""
+    version = 0
+
+    def append(self, item):
+        self.version += 1
+        super().append(item)
+
+    def appendleft(self, item):
+        self.version += 1
+        super().appendleft(item)
+
+    def extend(self, items):
+        self.version += 1
+        super().extend(items)
+
+    def pop(self):
+        self.version += 1
+        return super().pop()
+
+    def popleft(self):
+        self.version += 1
+        return super().popleft()
+
+    def remove(self, item):
+        self.version += 1
+        super().remove(item)
+
+    def clear(self):
+        self.version += 1
+        super().clear()
+
 
 class Scheduler(ABC):
     @abstractmethod
@@ -10,21 +47,188 @@ class Scheduler(ABC):
     def get_next(self):
         pass
 
+    def should_preempt(self, running, candidate):
+        """Whether a newly ready `candidate` should take the CPU from `running`."""
+        return False
+
+    def on_exit(self, pcb):
+        """Called when a dispatched process terminates, to drop per-process state."""
+        self.forget(pcb)
+
+    def forget(self, pcb):
+        """Drops per-process state (levels, passes, vruntime...) of a process leaving this scheduler."""
+        pass
+
+    def export_state(self, pcb):
+        """Per-process state to carry to another scheduler of the same kind (see `import_state`)."""
+        return None
+
+    def import_state(self, pcb, state):
+        """Installs `export_state()` output from another scheduler before `pcb` is added here."""
+        pass
+
+    def requeue(self, pcb, ran, quantum_expired):
+        """Returns a process that gave up the CPU after running `ran` ticks."""
+        self.add_process(pcb)
+
+    def tick(self):
+        """Called once per simulated time unit."""
+        pass
+
+    @abstractmethod
+    def remove_process(self, pcb):
+        """Takes a queued (not running) process out of the scheduler; False if absent."""
+        pass
+
+    @abstractmethod
+    def ready_processes(self):
+        """Iterates the queued processes in no particular order."""
+        pass
+
+    def queue_lengths(self):
+        """Number of processes in each displayed queue."""
+        return [len(self)]
+
+    def summary(self):
+        """Cheap overview for UIs: total ready processes and per-queue lengths."""
+        lengths = self.queue_lengths()
+        return {'ready': sum(lengths), 'queues': lengths}
+
+    @staticmethod
+    def _format_pcb(pcb):
+        return f"{pcb.name}({pcb.remaining_time})"
+
+    def _render_queue(self, queue_id, version, header, count, items, max_items=None, page=0):
+        """Renders one queue as "header: A -> B ... N more", cached until it changes.
+
+        `version` must change whenever the queue does; `items(limit)` returns the
+        queued PCBs in display order and only needs to produce the first `limit`.
+        With `max_items`, only page `page` of that size is rendered.
+        """
+        cache = self.__dict__.setdefault('_render_cache', {})
+        key = (version, header, count, max_items, page)
+        cached = cache.get(queue_id)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        if not count:
+            text = header + "Empty"
+        elif not max_items:
+            text = header + " -> ".join([self._format_pcb(p) for p in items(None)])
+        else:
+            page = max(0, min(page, (count - 1) // max_items))
+            start = page * max_items
+            stop = min(start + max_items, count)
+            shown = itertools.islice(items(stop), start, stop)
+            text = header + (f"... {start} earlier -> " if start else "") + " -> ".join([self._format_pcb(p) for p in shown])
+            if count > stop:
+                text += f" ... {count - stop} more"
+        cache[queue_id] = (key, text)
+        return text
+
 # MLFQ Scheduler Example
 class MLFQScheduler(Scheduler):
-    def __init__(self, levels=3, time_quanta=None):
+    """Multi-level feedback queue.
+
+    Each PCB's level is tracked explicitly in `level_of`, so lookups are O(1)
+    and do not depend on quanta being distinct. A process is demoted once the
+    CPU time it used at its level (summed across yields, so giving up the CPU
+    just before the quantum ends does not game the scheduler) reaches that
+    level's allotment. Every `boost_interval` ticks all processes go back to
+    the top queue, and with `aging_threshold` set a process that waited that
+    many ticks in a queue is promoted one level.
+    """
+
+    def __init__(self, levels=3, time_quanta=None, boost_interval=None, allotments=None, aging_threshold=None):
         self.levels = levels
-        self.queues = [deque() for _ in range(levels)] # Use deque for queues
+        self.queues = [_VersionedDeque() for _ in range(levels)] # Use deque for queues
         self.time_quanta = time_quanta or [5, 10, 15] # Adjusted default quanta
+        self.allotments = allotments or list(self.time_quanta) # CPU time allowed per level before demotion
+        self.boost_interval = boost_interval
+        self.aging_threshold = aging_threshold
+        self.level_of = {} # pid: current level
+        self.allotment_used = {} # pid: CPU time used at the current level
+        self.ticks = 0
+        self.boosts = 0
+        self._enqueued_at = {} # pid: tick the process entered its queue (for aging)
 
-    def add_process(self, pcb, level=0): # Allow specifying level, default to highest
-        if 0 <= level < self.levels:
-            pcb.state = 'READY'
-            self.queues[level].append(pcb)
-        else:
+    def add_process(self, pcb, level=None): # Defaults to the level the process already holds, else the highest
+        if level is None:
+            level = self.level_of.get(pcb.pid, 0)
+        elif not 0 <= level < self.levels:
             # Add to highest priority queue if level is invalid
-            self.queues[0].append(pcb)
+            level = 0
+        if self.level_of.get(pcb.pid) != level:
+            self.allotment_used[pcb.pid] = 0
+        self.level_of[pcb.pid] = level
+        self._enqueued_at[pcb.pid] = self.ticks
+        pcb.state = 'READY'
+        self.queues[level].append(pcb)
+
+    def get_level(self, pcb):
+        return self.level_of.get(pcb.pid, 0)
+
+    def requeue(self, pcb, ran, quantum_expired):
+        level = self.get_level(pcb)
+        used = self.allotment_used.get(pcb.pid, 0) + ran
+        if quantum_expired or used >= self.allotments[level]:
+            self.add_process(pcb, level=min(level + 1, self.levels - 1))
+            self.allotment_used[pcb.pid] = 0
+        else:
+            self.allotment_used[pcb.pid] = used
+            self.add_process(pcb, level=level)
 
+    def tick(self):
+        self.ticks += 1
+        if self.boost_interval and self.ticks % self.boost_interval == 0:
+            self.boost()
+        elif self.aging_threshold:
+            self._age()
+
+    def boost(self):
+        """Moves every process, queued or not, back to the top level."""
+        top = self.queues[0]
+        for queue in self.queues[1:]:
+            top.extend(queue)
+            queue.clear()
+        self.level_of = dict.fromkeys(self.level_of, 0)
+        self.allotment_used = dict.fromkeys(self.allotment_used, 0)
+        self.boosts += 1
+
+    def _age(self):
+        # Queues are FIFO, so only the head of each can have waited long enough
+        for level in range(1, self.levels):
+            queue = self.queues[level]
+            while queue and self.ticks - self._enqueued_at[queue[0].pid] >= self.aging_threshold:
+                pcb = queue.popleft()
+                self.add_process(pcb, level=level - 1)
+
+    def forget(self, pcb):
+        for table in (self.level_of, self.allotment_used, self._enqueued_at):
+            table.pop(pcb.pid, None)
+
+    def export_state(self, pcb):
+        return self.level_of.get(pcb.pid, 0), self.allotment_used.get(pcb.pid, 0)
+
+    def import_state(self, pcb, state):
+        level, used = state
+        self.level_of[pcb.pid] = min(level, self.levels - 1)
+        self.allotment_used[pcb.pid] = used
+
+    def __len__(self):
+        return sum(len(queue) for queue in self.queues)
+
+    def remove_process(self, pcb):
+        queue = self.queues[self.get_level(pcb)]
+        if pcb in queue:
+            queue.remove(pcb)
+            return True
+        return False
+
+    def ready_processes(self):
+        # Lowest levels first: those are the best candidates to migrate
+        for queue in reversed(self.queues):
+            yield from reversed(queue)
 
     def get_next(self):
         for lvl, queue in enumerate(self.queues):
@@ -34,18 +238,35 @@ class MLFQScheduler(Scheduler):
                 return pcb, self.time_quanta[lvl]
         return None, None
 
-    def get_all_queues_str_list(self):
-        return [f"Q{i} (TQ:{self.time_quanta[i]}): " + (" -> ".join([f"{p.name}({p.remaining_time})" for p in self.queues[i]]) if self.queues[i] else "Empty") for i in range(self.levels)]
+    def queue_lengths(self):
+        return [len(queue) for queue in self.queues]
+
+    def get_all_queues_str_list(self, max_items=None, page=0):
+        return [self._render_queue(i, queue.version, f"Q{i} (TQ:{self.time_quanta[i]}): ", len(queue),
+                                   lambda limit, queue=queue: queue, max_items, page)
+                for i, queue in enumerate(self.queues)]
 
 # FIFO Scheduler
 class FIFOScheduler(Scheduler):
     def __init__(self):
-        self.ready_queue = deque()
+        self.ready_queue = _VersionedDeque()
+
+    def __len__(self):
+        return len(self.ready_queue)
 
     def add_process(self, pcb):
         pcb.state = 'READY'
         self.ready_queue.append(pcb)
 
+    def remove_process(self, pcb):
+        if pcb in self.ready_queue:
+            self.ready_queue.remove(pcb)
+            return True
+        return False
+
+    def ready_processes(self):
+        return reversed(self.ready_queue)
+
     def get_next(self):
         if self.ready_queue:
             pcb = self.ready_queue.popleft()
@@ -54,19 +275,32 @@ class FIFOScheduler(Scheduler):
             return pcb, float('inf')
         return None, None
 
-    def get_all_queues_str_list(self): # For consistent interface
-        return ["FIFO: " + (" -> ".join([f"{p.name}({p.remaining_time})" for p in self.ready_queue]) if self.ready_queue else "Empty")]
+    def get_all_queues_str_list(self, max_items=None, page=0): # For consistent interface
+        return [self._render_queue(0, self.ready_queue.version, "FIFO: ", len(self.ready_queue),
+                                   lambda limit: self.ready_queue, max_items, page)]
 
 # Round Robin Scheduler
 class RoundRobinScheduler(Scheduler):
     def __init__(self, time_quantum=5):
-        self.ready_queue = deque()
+        self.ready_queue = _VersionedDeque()
         self.time_quantum = time_quantum
 
+    def __len__(self):
+        return len(self.ready_queue)
+
     def add_process(self, pcb):
         pcb.state = 'READY'
         self.ready_queue.append(pcb)
 
+    def remove_process(self, pcb):
+        if pcb in self.ready_queue:
+            self.ready_queue.remove(pcb)
+            return True
+        return False
+
+    def ready_processes(self):
+        return reversed(self.ready_queue)
+
     def get_next(self):
         if self.ready_queue:
             pcb = self.ready_queue.popleft()
@@ -74,5 +308,669 @@ class RoundRobinScheduler(Scheduler):
             return pcb, self.time_quantum
         return None, None
 
-    def get_all_queues_str_list(self): # For consistent interface
-        return ["RR: " + (" -> ".join([f"{p.name}({p.remaining_time})" for p in self.ready_queue]) if self.ready_queue else "Empty")]
\ No newline at end of file
+    def get_all_queues_str_list(self, max_items=None, page=0): # For consistent interface
+        return [self._render_queue(0, self.ready_queue.version, "RR: ", len(self.ready_queue),
+                                   lambda limit: self.ready_queue, max_items, page)]
+
+class _LazyHeap:
+    """Binary heap of PCBs with O(log n) push/pop and O(1) lazy removal.
+
+    Removed or re-keyed entries are only marked dead and skipped when they reach
+    the top, so no O(n) search is ever needed.
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._entries = {}  # pid: [key, seq, pcb, alive]
+        self._seq = itertools.count()
+        self.version = 0  # Bumped on every mutation, for render caching
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def _ident(item):
+        return item.pid
+
+    def __contains__(self, pcb):
+        return self._ident(pcb) in self._entries
+
+    def push(self, key, pcb):
+        self.remove(pcb)
+        entry = [key, next(self._seq), pcb, True]
+        self.version += 1
+        self._entries[self._ident(pcb)] = entry
+        heapq.heappush(self._heap, entry)
+
+    def remove(self, pcb):
+        entry = self._entries.pop(self._ident(pcb), None)
+        if entry is None:
+            return False
+        self.version += 1
+        entry[3] = False
+        return True
+
+    def _prune(self):
+        while self._heap and not self._heap[0][3]:
+            heapq.heappop(self._heap)
+
+    def peek(self):
+        self._prune()
+        return self._heap[0][2] if self._heap else None
+
+    def peek_key(self):
+        self._prune()
+        return self._heap[0][0] if self._heap else None
+
+    def pop(self):
+        self._prune()
+        if not self._heap:
+            return None
+        entry = heapq.heappop(self._heap)
+        self.version += 1
+        del self._entries[self._ident(entry[2])]
+        return entry[2]
+
+    def __iter__(self):
+        return (entry[2] for entry in self._entries.values())
+
+    def ordered(self, limit=None):
+        """Live PCBs in key order; the first `limit` cost O(n log limit)."""
+        entries = sorted(self._entries.values()) if limit is None else heapq.nsmallest(limit, self._entries.values())
+        return [entry[2] for entry in entries]
+
+
+class _HeapScheduler(Scheduler):
+    """Common base for schedulers backed by a `_LazyHeap` keyed per PCB."""
+    label = "HEAP"
+
+    def __init__(self, time_quantum=float('inf')):
+        self.ready_queue = _LazyHeap()
+        self.time_quantum = time_quantum
+
+    def __len__(self):
+        return len(self.ready_queue)
+
+    @abstractmethod
+    def _key(self, pcb):
+        """Heap key; the smallest key is dispatched first."""
+        pass
+
+    def add_process(self, pcb):
+        pcb.state = 'READY'
+        self.ready_queue.push(self._key(pcb), pcb)
+
+    def remove_process(self, pcb):
+        return self.ready_queue.remove(pcb)
+
+    def ready_processes(self):
+        return iter(self.ready_queue)
+
+    def get_next(self):
+        pcb = self.ready_queue.pop()
+        if pcb is None:
+            return None, None
+        pcb.state = 'RUNNING'
+        return pcb, self.time_quantum
+
+    def get_all_queues_str_list(self, max_items=None, page=0): # For consistent interface
+        return [self._render_queue(0, self.ready_queue.version, f"{self.label}: ", len(self.ready_queue),
+                                   self.ready_queue.ordered, max_items, page)]
+
+
+# Shortest Job First (non-preemptive)
+class SJFScheduler(_HeapScheduler):
+    label = "SJF"
+
+    def _key(self, pcb):
+        return pcb.remaining_time
+
+
+# Shortest Remaining Time First (preemptive SJF)
+class SRTFScheduler(_HeapScheduler):
+    label = "SRTF"
+
+    def _key(self, pcb):
+        return pcb.remaining_time
+
+    def should_preempt(self, running, candidate):
+        return candidate.remaining_time < running.remaining_time
+
+
+# Static priority scheduler: a lower `pcb.priority` value runs first
+class PriorityScheduler(_HeapScheduler):
+    label = "PRIO"
+
+    def __init__(self, time_quantum=float('inf'), preemptive=False):
+        super().__init__(time_quantum)
+        self.preemptive = preemptive
+
+    def _key(self, pcb):
+        return pcb.priority
+
+    def should_preempt(self, running, candidate):
+        return self.preemptive and candidate.priority < running.priority
+
+
+# Earliest Deadline First: the ready job with the nearest absolute deadline runs, preemptively
+class EDFScheduler(_HeapScheduler):
+    label = "EDF"
+
+    def _key(self, pcb):
+        # Processes without a deadline only get the CPU when no real-time job is ready
+        return pcb.absolute_deadline if pcb.absolute_deadline is not None else float('inf')
+
+    def should_preempt(self, running, candidate):
+        return self._key(candidate) < self._key(running)
+
+
+# Rate Monotonic: static priorities, the task with the shortest period runs first, preemptively
+class RateMonotonicScheduler(_HeapScheduler):
+    label = "RM"
+
+    def _key(self, pcb):
+        return pcb.period if pcb.period is not None else float('inf')
+
+    def should_preempt(self, running, candidate):
+        return self._key(candidate) < self._key(running)
+
+
+class _FenwickTree:
+    """Prefix sums over ticket counts with O(log n) update and weighted search."""
+
+    def __init__(self, size=16):
+        self.size = size
+        self.tree = [0] * (size + 1)
+        self.values = [0] * size
+        self.total = 0
+
+    def _grow(self, min_size):
+        size = self.size
+        while size < min_size:
+            size *= 2
+        values = self.values + [0] * (size - self.size)
+        # Rebuild in O(n) rather than n updates
+        tree = [0] + values[:]
+        for i in range(1, size + 1):
+            parent = i + (i & -i)
+            if parent <= size:
+                tree[parent] += tree[i]
+        self.size, self.values, self.tree = size, values, tree
+
+    def set(self, index, value):
+        if index >= self.size:
+            self._grow(index + 1)
+        delta = value - self.values[index]
+        self.values[index] = value
+        self.total += delta
+        i = index + 1
+        while i <= self.size:
+            self.tree[i] += delta
+            i += i & -i
+
+    def find(self, target):
+        """Smallest index whose prefix sum exceeds `target` (0 <= target < total)."""
+        pos = 0
+        step = 1 << (self.size.bit_length() - 1)
+        while step:
+            nxt = pos + step
+            if nxt <= self.size and self.tree[nxt] <= target:
+                pos = nxt
+                target -= self.tree[nxt]
+            step >>= 1
+        return pos
+
+
+# Lottery scheduling: each slot holds a process' tickets in a Fenwick tree
+class LotteryScheduler(Scheduler):
+    def __init__(self, time_quantum=5, default_tickets=100, seed=None):
+        self.time_quantum = time_quantum
+        self.default_tickets = default_tickets
+        self.random = random.Random(seed)
+        self.tickets = {}  # pid: tickets, kept across re-adds
+        self._tree = _FenwickTree()
+        self._slot_of = {}  # pid: slot index
+        self._slots = []  # slot index: PCB or None
+        self._free_slots = []
+        self._version = 0
+
+    def __len__(self):
+        return len(self._slot_of)
+
+    def add_process(self, pcb, tickets=None):
+        if tickets is not None:
+            self.tickets[pcb.pid] = tickets
+        if pcb.pid in self._slot_of:
+            self.remove_process(pcb)
+        count = self.tickets.setdefault(pcb.pid, self.default_tickets)
+        if count <= 0:
+            raise ValueError("tickets must be a positive integer.")
+        pcb.state = 'READY'
+        if self._free_slots:
+            slot = self._free_slots.pop()
+            self._slots[slot] = pcb
+        else:
+            slot = len(self._slots)
+            self._slots.append(pcb)
+        self._slot_of[pcb.pid] = slot
+        self._tree.set(slot, count)
+        self._version += 1
+
+    def forget(self, pcb):
+        self.tickets.pop(pcb.pid, None)
+
+    def export_state(self, pcb):
+        return self.tickets.get(pcb.pid)
+
+    def import_state(self, pcb, state):
+        if state is not None:
+            self.tickets[pcb.pid] = state
+
+    def remove_process(self, pcb):
+        slot = self._slot_of.pop(pcb.pid, None)
+        if slot is None:
+            return False
+        self._tree.set(slot, 0)
+        self._slots[slot] = None
+        self._free_slots.append(slot)
+        self._version += 1
+        return True
+
+    def ready_processes(self):
+        return (self._slots[slot] for slot in self._slot_of.values())
+
+    def get_next(self):
+        if not self._slot_of:
+            return None, None
+        slot = self._tree.find(self.random.randrange(self._tree.total))
+        pcb = self._slots[slot]
+        self.remove_process(pcb)
+        pcb.state = 'RUNNING'
+        return pcb, self.time_quantum
+
+    def _format_pcb(self, pcb):
+        return f"{pcb.name}({pcb.remaining_time})[{self.tickets[pcb.pid]}t]"
+
+    def _queued_in_slot_order(self, limit):
+        slots = sorted(self._slot_of.values()) if limit is None else heapq.nsmallest(limit, self._slot_of.values())
+        return [self._slots[slot] for slot in slots]
+
+    def get_all_queues_str_list(self, max_items=None, page=0): # For consistent interface
+        return [self._render_queue(0, self._version, f"LOTTERY ({self._tree.total} tickets): ", len(self),
+                                   self._queued_in_slot_order, max_items, page)]
+
+
+# Stride scheduling: deterministic proportional share, lowest pass value runs next
+class StrideScheduler(Scheduler):
+    STRIDE1 = 1 << 20
+
+    def __init__(self, time_quantum=5, default_tickets=100):
+        self.time_quantum = time_quantum
+        self.default_tickets = default_tickets
+        self.ready_queue = _LazyHeap()
+        self.tickets = {}  # pid: tickets
+        self.pass_value = {}  # pid: pass
+        self.global_pass = 0
+
+    def __len__(self):
+        return len(self.ready_queue)
+
+    def stride(self, pid):
+        return self.STRIDE1 // self.tickets[pid]
+
+    def add_process(self, pcb, tickets=None):
+        if tickets is not None:
+            self.tickets[pcb.pid] = tickets
+        if self.tickets.setdefault(pcb.pid, self.default_tickets) <= 0:
+            raise ValueError("tickets must be a positive integer.")
+        if pcb.pid not in self.pass_value:
+            # Newcomers start at the current global pass so they cannot monopolize the CPU
+            self.pass_value[pcb.pid] = self.global_pass
+        pcb.state = 'READY'
+        self.ready_queue.push(self.pass_value[pcb.pid], pcb)
+
+    def requeue(self, pcb, ran, quantum_expired):
+        # Charge the CPU time actually used, so short yields cost proportionally less
+        if pcb.pid in self.pass_value:
+            self.pass_value[pcb.pid] += self.stride(pcb.pid) * ran
+        self.add_process(pcb)
+
+    def remove_process(self, pcb):
+        return self.ready_queue.remove(pcb)
+
+    def ready_processes(self):
+        return iter(self.ready_queue)
+
+    def forget(self, pcb):
+        for table in (self.tickets, self.pass_value):
+            table.pop(pcb.pid, None)
+
+    def export_state(self, pcb):
+        # Passes only mean something next to the global pass, so the lag behind it travels
+        if pcb.pid not in self.pass_value:
+            return None
+        return self.tickets[pcb.pid], self.pass_value[pcb.pid] - self.global_pass
+
+    def import_state(self, pcb, state):
+        if state is not None:
+            self.tickets[pcb.pid], lag = state
+            self.pass_value[pcb.pid] = self.global_pass + lag
+
+    def get_next(self):
+        pcb = self.ready_queue.pop()
+        if pcb is None:
+            return None, None
+        self.global_pass = max(self.global_pass, self.pass_value[pcb.pid])
+        pcb.state = 'RUNNING'
+        return pcb, self.time_quantum
+
+    def get_all_queues_str_list(self, max_items=None, page=0): # For consistent interface
+        return [self._render_queue(0, self.ready_queue.version, "STRIDE: ", len(self.ready_queue),
+                                   self.ready_queue.ordered, max_items, page)]
+
+
+# Nice-to-weight table from the Linux CFS scheduler (nice -20 .. 19)
+CFS_NICE_0_WEIGHT = 1024
+CFS_PRIO_TO_WEIGHT = [
+    88761, 71755, 56483, 46273, 36291,
+    29154, 23254, 18705, 14949, 11916,
+    9548, 7620, 6100, 4904, 3906,
+    3121, 2501, 1991, 1586, 1277,
+    1024, 820, 655, 526, 423,
+    335, 272, 215, 172, 137,
+    110, 87, 70, 56, 45,
+    36, 29, 23, 18, 15,
+]
+
+
+# Completely Fair Scheduler: lowest virtual runtime runs next; `pcb.priority` is the nice value
+class CFSScheduler(Scheduler):
+    def __init__(self, sched_latency=24, min_granularity=3):
+        self.sched_latency = sched_latency
+        self.min_granularity = min_granularity
+        self.ready_queue = _LazyHeap()  # keyed by vruntime; only the minimum is ever needed
+        self.vruntime = {}  # pid: virtual runtime
+        self.min_vruntime = 0
+        self.total_weight = 0
+
+    def __len__(self):
+        return len(self.ready_queue)
+
+    @staticmethod
+    def weight(pcb):
+        nice = max(-20, min(19, pcb.priority))
+        return CFS_PRIO_TO_WEIGHT[nice + 20]
+
+    def add_process(self, pcb):
+        if pcb in self.ready_queue:
+            self.remove_process(pcb)
+        # Sleepers and newcomers must not bank unbounded credit
+        vruntime = max(self.vruntime.get(pcb.pid, self.min_vruntime), self.min_vruntime)
+        self.vruntime[pcb.pid] = vruntime
+        self.total_weight += self.weight(pcb)
+        pcb.state = 'READY'
+        self.ready_queue.push(vruntime, pcb)
+
+    def requeue(self, pcb, ran, quantum_expired):
+        if pcb.pid in self.vruntime:
+            self.vruntime[pcb.pid] += ran * CFS_NICE_0_WEIGHT / self.weight(pcb)
+        self.add_process(pcb)
+
+    def remove_process(self, pcb):
+        if not self.ready_queue.remove(pcb):
+            return False
+        self.total_weight -= self.weight(pcb)
+        return True
+
+    def ready_processes(self):
+        return iter(self.ready_queue)
+
+    def forget(self, pcb):
+        self.vruntime.pop(pcb.pid, None)
+
+    def export_state(self, pcb):
+        # Relative to min_vruntime, as Linux does when moving a task between run queues
+        vruntime = self.vruntime.get(pcb.pid)
+        return None if vruntime is None else vruntime - self.min_vruntime
+
+    def import_state(self, pcb, state):
+        if state is not None:
+            self.vruntime[pcb.pid] = self.min_vruntime + state
+
+    def time_slice(self, pcb):
+        share = self.sched_latency * self.weight(pcb) / (self.total_weight + self.weight(pcb))
+        return max(self.min_granularity, math.ceil(share))
+
+    def get_next(self):
+        pcb = self.ready_queue.pop()
+        if pcb is None:
+            return None, None
+        self.total_weight -= self.weight(pcb)
+        self.min_vruntime = max(self.min_vruntime, self.vruntime[pcb.pid])
+        pcb.state = 'RUNNING'
+        return pcb, self.time_slice(pcb)
+
+    def get_all_queues_str_list(self, max_items=None, page=0): # For consistent interface
+        return [self._render_queue(0, self.ready_queue.version, "CFS: ", len(self.ready_queue),
+                                   self.ready_queue.ordered, max_items, page)]
+
+
+class _EntityHeap(_LazyHeap):
+    """A `_LazyHeap` that can also hold `TaskGroup`s, identified by object."""
+
+    @staticmethod
+    def _ident(item):
+        return id(item)
+
+
+class TaskGroup:
+    """A node of the `GroupScheduler` hierarchy (like a cgroup with cpu.shares).
+
+    Runnable children (PCBs and subgroups) wait in a heap keyed by virtual
+    runtime, so each level costs O(log n). With a `quota`, the group may only
+    use that many ticks of CPU per `period` before it is throttled.
+    """
+
+    def __init__(self, name, shares=CFS_NICE_0_WEIGHT, parent=None, quota=None, period=100):
+        if shares <= 0:
+            raise ValueError("shares must be positive.")
+        if quota is not None and (quota <= 0 or period <= 0):
+            raise ValueError("quota and period must be positive.")
+        self.name = name
+        self.shares = shares
+        self.parent = parent
+        self.quota = quota
+        self.period = period
+        self.queue = _EntityHeap()  # Runnable PCBs and subgroups, keyed by vruntime
+        self.vruntime = 0  # Within the parent
+        self.min_vruntime = 0
+        self.runtime_used = 0  # Ticks used in the current period
+        self.throttled = False
+        self.throttle_count = 0
+
+    def path(self):
+        """This group and its ancestors, innermost first."""
+        group = self
+        while group is not None:
+            yield group
+            group = group.parent
+
+    def __repr__(self):
+        return f"TaskGroup({self.name!r}, shares={self.shares}, quota={self.quota})"
+
+
+# Hierarchical fair scheduling: CFS per level, across groups of processes weighted by their shares
+class GroupScheduler(Scheduler):
+    def __init__(self, time_quantum=4):
+        self.time_quantum = time_quantum
+        self.root = TaskGroup('root')
+        self.groups = {'root': self.root}
+        self.group_of = {}  # pid: TaskGroup the process belongs to (root unless assigned)
+        self.vruntime = {}  # pid: virtual runtime within its group
+        self.ticks = 0
+        self._count = 0  # Queued PCBs across all groups
+        self._current = None  # Last dispatched PCB, charged per tick while RUNNING
+        self._quota_groups = []
+
+    def __len__(self):
+        return self._count
+
+    def create_group(self, name, shares=CFS_NICE_0_WEIGHT, parent=None, quota=None, period=100):
+        if name in self.groups:
+            raise ValueError(f"Group {name} already exists.")
+        parent = self.groups[parent] if isinstance(parent, str) else (parent or self.root)
+        group = TaskGroup(name, shares, parent, quota, period)
+        self.groups[name] = group
+        if quota is not None:
+            self._quota_groups.append(group)
+        return group
+
+    def assign(self, pcb, group):
+        """Moves `pcb` into `group` (a TaskGroup or its name), even while it is queued."""
+        group = self.groups[group] if isinstance(group, str) else group
+        queued = self.remove_process(pcb)
+        self.group_of[pcb.pid] = group
+        self.vruntime.pop(pcb.pid, None)
+        if queued:
+            self.add_process(pcb)
+
+    # ----- Hierarchy upkeep -----
+
+    def _activate(self, group):
+        """Puts a group that has runnable work back into its ancestors' queues."""
+        while group.parent is not None and len(group.queue) and not group.throttled and group not in group.parent.queue:
+            parent = group.parent
+            group.vruntime = max(group.vruntime, parent.min_vruntime)
+            parent.queue.push(group.vruntime, group)
+            group = parent
+
+    def _deactivate(self, group):
+        """Takes groups left without runnable work out of their ancestors' queues."""
+        while group.parent is not None and not len(group.queue) and group.parent.queue.remove(group):
+            group = group.parent
+
+    def _throttle(self, group):
+        group.throttled = True
+        group.throttle_count += 1
+        if group.parent.queue.remove(group):
+            self._deactivate(group.parent)
+
+    def _charge(self, pcb, ran):
+        if pcb.pid in self.vruntime:
+            self.vruntime[pcb.pid] += ran * CFS_NICE_0_WEIGHT / CFSScheduler.weight(pcb)
+        for group in self.group_of.get(pcb.pid, self.root).path():
+            if group.parent is None:
+                break
+            group.vruntime += ran * CFS_NICE_0_WEIGHT / group.shares
+            if group in group.parent.queue:
+                group.parent.queue.push(group.vruntime, group)
+            if group.quota is not None:
+                group.runtime_used += ran
+                if group.runtime_used >= group.quota and not group.throttled:
+                    self._throttle(group)
+
+    # ----- Scheduler interface -----
+
+    def add_process(self, pcb):
+        group = self.group_of.setdefault(pcb.pid, self.root)
+        if group.queue.remove(pcb):
+            self._count -= 1
+        vruntime = max(self.vruntime.get(pcb.pid, group.min_vruntime), group.min_vruntime)
+        self.vruntime[pcb.pid] = vruntime
+        pcb.state = 'READY'
+        group.queue.push(vruntime, pcb)
+        self._count += 1
+        self._activate(group)
+
+    def requeue(self, pcb, ran, quantum_expired):
+        # CPU time was already charged tick by tick
+        self._current = None
+        self.add_process(pcb)
+
+    def remove_process(self, pcb):
+        group = self.group_of.get(pcb.pid, self.root)
+        if not group.queue.remove(pcb):
+            return False
+        self._count -= 1
+        self._deactivate(group)
+        return True
+
+    def ready_processes(self):
+        for group in self.groups.values():
+            for item in group.queue:
+                if not isinstance(item, TaskGroup):
+                    yield item
+
+    def on_exit(self, pcb):
+        self._current = None
+        self.forget(pcb)
+
+    def forget(self, pcb):
+        self.vruntime.pop(pcb.pid, None)
+        self.group_of.pop(pcb.pid, None)
+
+    def export_state(self, pcb):
+        group = self.group_of.get(pcb.pid, self.root)
+        vruntime = self.vruntime.get(pcb.pid)
+        return group.name, None if vruntime is None else vruntime - group.min_vruntime
+
+    def import_state(self, pcb, state):
+        # Groups are matched by name; a process whose group does not exist here joins the root
+        name, lag = state
+        group = self.groups.get(name, self.root)
+        self.group_of[pcb.pid] = group
+        if lag is not None:
+            self.vruntime[pcb.pid] = group.min_vruntime + lag
+
+    def tick(self):
+        self.ticks += 1
+        pcb = self._current
+        if pcb is not None and pcb.state == 'RUNNING':
+            self._charge(pcb, 1)
+        for group in self._quota_groups:
+            if self.ticks % group.period == 0:
+                group.runtime_used = 0
+                if group.throttled:
+                    group.throttled = False
+                    self._activate(group)
+
+    def time_slice(self, pcb):
+        """The quantum, cut short where an ancestor's remaining quota is smaller."""
+        slice_ = self.time_quantum
+        for group in self.group_of[pcb.pid].path():
+            if group.quota is not None:
+                slice_ = min(slice_, group.quota - group.runtime_used)
+        return max(1, slice_)
+
+    def get_next(self):
+        group = self.root
+        item = group.queue.peek()
+        while isinstance(item, TaskGroup):
+            group.min_vruntime = max(group.min_vruntime, item.vruntime)
+            group = item
+            item = group.queue.peek()
+        if item is None:
+            return None, None
+        group.queue.pop()
+        self._count -= 1
+        group.min_vruntime = max(group.min_vruntime, self.vruntime[item.pid])
+        self._deactivate(group)
+        item.state = 'RUNNING'
+        self._current = item
+        return item, self.time_slice(item)
+
+    def queue_lengths(self):
+        return [sum(1 for item in group.queue if not isinstance(item, TaskGroup)) for group in self.groups.values()]
+
+    def _format_pcb(self, item):
+        if isinstance(item, TaskGroup):
+            return f"[{item.name}]"
+        return super()._format_pcb(item)
+
+    def get_all_queues_str_list(self, max_items=None, page=0): # For consistent interface
+        lines = []
+        for i, group in enumerate(self.groups.values()):
+            header = f"{group.name} ({group.shares}{', throttled' if group.throttled else ''}): "
+            lines.append(self._render_queue(i, group.queue.version, header, len(group.queue),
+                                            group.queue.ordered, max_items, page))
+        return lines
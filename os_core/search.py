@@ -0,0 +1,205 @@
+import bisect
+import fnmatch
+import re
+
+# Paths always start with '/', so (key, _PAST_PATHS) sorts after every (key, path)
+_PAST_PATHS = '\U0010ffff'
+_GLOB = re.compile(r'[*?[]')
+_GLOB_TOKENS = re.compile(r'\[[^\]]*\]|[*?[]')  # Wildcards and [...] classes; what is left is literal
+# Batches up to this size update the sorted lists in place; larger ones rebuild them
+_BULK = 256
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def extension(name):
+    """Lower-case extension without the dot ('' if there is none); 'a.tar.gz' -> 'gz'."""
+    stem, dot, ext = name.rpartition('.')
+    return ext.lower() if dot and stem else ''
+
+
+class MetadataIndex:
+    """Search index over the paths of a file tree.
+
+    Names are looked up through a trigram index mapping every trigram of a
+    lower-cased name to its paths, so a query only checks the paths sharing
+    all of its trigrams. There are a few thousand trigrams however many paths
+    are indexed, which keeps the number of containers small. Extensions map
+    straight to their paths. Sizes and modification times are kept in sorted
+    lists searched with bisect. `update()` and `remove_tree()` keep all of it
+    up to date incrementally; batches larger than `_BULK` paths rebuild the
+    sorted lists in one linear pass instead of inserting one by one.
+
+    `name` queries are case-insensitive substrings, or case-sensitive glob
+    patterns when they contain `*`, `?` or `[`. Sizes only exist for files.
+    """
+
+    def __init__(self, entries=()):
+        self._entries = {}  # path: (name, is_dir, size, mtime)
+        self._trigrams = {}  # trigram of the lower-cased name: set of paths
+        self._exts = {}  # extension: set of paths
+        self._paths = []  # Sorted paths, so a subtree is one contiguous range
+        self._sizes = []  # Sorted (size, path) of files
+        self._mtimes = []  # Sorted (mtime, path)
+        self.update(entries)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, path):
+        return path in self._entries
+
+    def _link(self, path, is_dir, size, mtime):
+        name = path.rsplit('/', 1)[-1]
+        self._entries[path] = (name, is_dir, size, mtime)
+        trigrams = self._trigrams
+        for trigram in _trigrams(name.lower()):
+            paths = trigrams.get(trigram)
+            if paths is None:
+                trigrams[trigram] = {path}
+            else:
+                paths.add(path)
+        if not is_dir:
+            ext = extension(name)
+            paths = self._exts.get(ext)
+            if paths is None:
+                self._exts[ext] = {path}
+            else:
+                paths.add(path)
+
+    def _unlink(self, path):
+        name, is_dir, size, mtime = self._entries.pop(path)
+        for trigram in _trigrams(name.lower()):
+            paths = self._trigrams[trigram]
+            paths.discard(path)
+            if not paths:
+                del self._trigrams[trigram]
+        if not is_dir:
+            ext = extension(name)
+            self._exts[ext].discard(path)
+            if not self._exts[ext]:
+                del self._exts[ext]
+        return path, is_dir, size, mtime
+
+    def _unsort(self, removed, paths=True):
+        """Takes `_unlink()` results out of the sorted lists."""
+        if len(removed) > _BULK:
+            gone = {path for path, _, _, _ in removed}
+            if paths:
+                self._paths = [path for path in self._paths if path not in gone]
+            self._sizes = [pair for pair in self._sizes if pair[1] not in gone]
+            self._mtimes = [pair for pair in self._mtimes if pair[1] not in gone]
+            return
+        for path, is_dir, size, mtime in removed:
+            if paths:
+                _remove_sorted(self._paths, path)
+            if not is_dir:
+                _remove_sorted(self._sizes, (size, path))
+            _remove_sorted(self._mtimes, (mtime, path))
+
+    def update(self, entries):
+        """Indexes `(path, is_dir, size, mtime)` entries, replacing what was indexed for those paths."""
+        entries = list(entries)
+        self._unsort([self._unlink(entry[0]) for entry in entries if entry[0] in self._entries])
+        for path, is_dir, size, mtime in entries:
+            self._link(path, is_dir, size, mtime)
+        if len(entries) > _BULK:
+            # Timsort merges the sorted old list with the new run in linear time
+            self._paths = sorted(self._paths + [entry[0] for entry in entries])
+            self._sizes = sorted(self._sizes + [(size, path) for path, is_dir, size, _ in entries if not is_dir])
+            self._mtimes = sorted(self._mtimes + [(mtime, path) for path, _, _, mtime in entries])
+            return
+        for path, is_dir, size, mtime in entries:
+            bisect.insort(self._paths, path)
+            if not is_dir:
+                bisect.insort(self._sizes, (size, path))
+            bisect.insort(self._mtimes, (mtime, path))
+
+    def add(self, path, is_dir, size, mtime):
+        self.update([(path, is_dir, size, mtime)])
+
+    def remove_tree(self, path):
+        """Drops a path and every path below it."""
+        lo, hi = self._subtree(path)
+        stale = self._paths[lo:hi]
+        del self._paths[lo:hi]
+        if path in self._entries:
+            stale.append(path)
+            _remove_sorted(self._paths, path)
+        self._unsort([self._unlink(stale_path) for stale_path in stale], paths=False)
+
+    def _subtree(self, path):
+        """Range of `_paths` holding the paths below `path`."""
+        prefix = path.rstrip('/') + '/'
+        # '0' is the character after '/', so every path below sorts before prefix[:-1] + '0'
+        return bisect.bisect_left(self._paths, prefix), bisect.bisect_left(self._paths, prefix[:-1] + '0')
+
+    def _trigram_sets(self, query):
+        """Posting sets every match must appear in, smallest first; empty if the query is too short."""
+        literals = [part.lower() for part in _GLOB_TOKENS.split(query)] if _GLOB.search(query) else [query.lower()]
+        trigrams = set().union(*(_trigrams(part) for part in literals))
+        return sorted((self._trigrams.get(trigram, ()) for trigram in trigrams), key=len)
+
+    @staticmethod
+    def _range(pairs, low, high):
+        lo = 0 if low is None else bisect.bisect_left(pairs, (low,))
+        hi = len(pairs) if high is None else bisect.bisect_right(pairs, (high, _PAST_PATHS))
+        return lo, max(lo, hi)
+
+    def search(self, name=None, ext=None, kind=None, min_size=None, max_size=None, after=None, before=None,
+               path='/'):
+        """Sorted paths below `path` matching every given filter.
+
+        `ext` is an extension without the dot, `kind` 'f' or 'd', and the size
+        and mtime bounds are inclusive. Each filter's index says how many
+        candidates it would produce, so only the smallest candidate set is
+        materialized; the other filters are checked on its metadata.
+        """
+        sized = min_size is not None or max_size is not None
+        ext = ext.lower().lstrip('.') if ext is not None else None
+        # (number of candidates, how to list them)
+        plans = [(len(self._entries), lambda: self._entries)]
+        if name is not None:
+            sets = self._trigram_sets(name)
+            if sets:
+                plans.append((len(sets[0]), lambda: set(sets[0]).intersection(*sets[1:])))
+        if ext is not None:
+            paths = self._exts.get(ext, ())
+            plans.append((len(paths), lambda: paths))
+        if sized:
+            size_lo, size_hi = self._range(self._sizes, min_size, max_size)
+            plans.append((size_hi - size_lo, lambda: [pair[1] for pair in self._sizes[size_lo:size_hi]]))
+        if after is not None or before is not None:
+            mtime_lo, mtime_hi = self._range(self._mtimes, after, before)
+            plans.append((mtime_hi - mtime_lo, lambda: [pair[1] for pair in self._mtimes[mtime_lo:mtime_hi]]))
+        if path.strip('/'):
+            path_lo, path_hi = self._subtree(path)
+            plans.append((path_hi - path_lo, lambda: self._paths[path_lo:path_hi]))
+        candidates = min(plans, key=lambda plan: plan[0])[1]()
+
+        glob = name is not None and _GLOB.search(name)
+        needle = name.lower() if name is not None and not glob else None
+        prefix = path.rstrip('/') + '/'
+        entries = self._entries
+        results = []
+        for candidate in candidates:
+            entry_name, is_dir, size, mtime = entries[candidate]
+            if (candidate.startswith(prefix)
+                    and (needle is None or needle in entry_name.lower())
+                    and (not glob or fnmatch.fnmatchcase(entry_name, name))
+                    and (ext is None or (not is_dir and extension(entry_name) == ext))
+                    and (kind is None or kind == ('d' if is_dir else 'f'))
+                    and (not sized or (not is_dir and (min_size is None or size >= min_size)
+                                       and (max_size is None or size <= max_size)))
+                    and (after is None or mtime >= after) and (before is None or mtime <= before)):
+                results.append(candidate)
+        results.sort()
+        return results
+
+
+def _remove_sorted(items, item):
+    index = bisect.bisect_left(items, item)
+    if index < len(items) and items[index] == item:
+        del items[index]
@@ -0,0 +1,405 @@
+import heapq
+import itertools
+import math
+
+from os_core.devices import IODevice
+from os_core.process import PCB, PidAllocator
+
+# Processes created by the simulator are CPU-only; the page size just has to be valid.
+DEFAULT_PAGE_SIZE = 4096
+# Timeline label for ticks the CPU spends on overhead (e.g. migration) instead of a process
+OVERHEAD = 'overhead'
+
+
+def pcb_from_entry(entry, pids=None):
+    """Turns a workload entry into a PCB with its `arrival_time` set.
+
+    Entries are PCBs (already carrying `arrival_time`) or
+    `(name, burst_time, arrival_time[, priority[, phases]])` tuples, where
+    `phases` alternates CPU and I/O burst lengths as in `os_core.workload`.
+    New PCBs take their PID from the `pids` namespace.
+    """
+    if isinstance(entry, PCB):
+        return entry
+    priority = entry[3] if len(entry) > 3 else 0
+    phases = entry[4] if len(entry) > 4 and entry[4] and len(entry[4]) > 1 else None
+    pcb = PCB(name=entry[0], memory_requirements_bytes=0, page_size=DEFAULT_PAGE_SIZE,
+              priority=priority, burst_time=entry[1], bursts=phases, pids=pids)
+    pcb.arrival_time = entry[2]
+    return pcb
+
+
+def entry_arrival(entry):
+    return entry.arrival_time if isinstance(entry, PCB) else entry[2]
+
+
+class SchedulerSimulation:
+    """Headless, tick-based CPU scheduling simulation.
+
+    Drives any `Scheduler` one time unit at a time: admits arriving processes,
+    dispatches, expires quanta and retires finished processes. No GUI code lives
+    here, so it can run in tests and batch jobs; the visualizer only renders it.
+
+    `observers` receive every state transition as `on_event(event, time, pcb)`
+    (see `os_core.metrics.MetricsCollector`). Long runs that only need those
+    aggregates can pass `keep_finished=False` and `record_timeline=False` so
+    finished PCBs and timeline segments are not retained.
+
+    Switching is not free: dispatching a different process than the one that
+    ran last costs `context_switch_cost` ticks, and a process resuming after
+    others used the CPU pays up to `cache_penalty` ticks to rewarm its cache,
+    scaled by how many foreign ticks ran since (`cache_decay` of them evict it
+    completely). Both are charged as overhead on the simulation clock.
+
+    PIDs come from the simulation's own `pids` namespace (pass one to share it,
+    as the CPUs of an `SMPSimulation` do). Without `keep_finished` a finished
+    process is reaped and its PID recycled, so PCBs handed to `submit` should
+    then be created with `pids=sim.pids`.
+    """
+
+    def __init__(self, scheduler, devices=None, observers=None, keep_finished=True, record_timeline=True,
+                 context_switch_cost=0, cache_penalty=0, cache_decay=10, pids=None):
+        if context_switch_cost < 0 or cache_penalty < 0 or cache_decay <= 0:
+            raise ValueError("Switch costs must be non-negative and cache_decay positive.")
+        self.scheduler = scheduler
+        self.pids = pids if pids is not None else PidAllocator()
+        self.observers = list(observers or [])
+        self.keep_finished = keep_finished
+        self.record_timeline = record_timeline
+        self.devices = {device.name: device for device in (devices or [IODevice()])}
+        self._default_device = next(iter(self.devices))
+        self._blocked_since = {}  # pid: (time it blocked, ticks it ran before blocking)
+        self.processes = {}  # pid: PCB
+        self.time = 0
+        self.running_process = None
+        self.current_time_slice = 0
+        self.time_slice_elapsed = 0
+        self.timeline = []  # [pid or None or OVERHEAD, start, end] segments, merged when contiguous
+        self.last_event = None  # 'dispatched', 'running', 'overhead', 'finished', 'expired', 'blocked', 'idle'
+        self.last_process = None  # PCB the last event refers to
+        self._pending = []  # Heap of (arrival_time, seq, PCB) not yet arrived
+        self._pending_seq = itertools.count()
+        self._live = 0  # Submitted processes that have not terminated
+        self._arrivals = None  # Optional iterator of workload entries, consumed lazily
+        self._next_arrival = None
+        self.pending_overhead = {}  # pid: extra ticks charged at its next dispatch (e.g. migration)
+        self.overhead_remaining = 0  # Overhead ticks left before the running process makes progress
+        self.busy_time = 0  # Ticks spent running processes
+        self.overhead_time = 0
+        self.context_switch_cost = context_switch_cost
+        self.cache_penalty = cache_penalty
+        self.cache_decay = cache_decay
+        self._last_pid = None  # Process that ran on this CPU most recently
+        self._cache_stamp = {}  # pid: busy_time when it last ran (only with a cache penalty)
+
+    # ----- Workload -----
+
+    def add_process(self, name, burst_time, arrival_time=None, priority=0, bursts=None):
+        """Creates a PCB and admits it now, or queues it until `arrival_time`."""
+        pcb = PCB(name=name, memory_requirements_bytes=0, page_size=DEFAULT_PAGE_SIZE,
+                  priority=priority, burst_time=burst_time, bursts=bursts, pids=self.pids)
+        self.submit(pcb, arrival_time)
+        return pcb
+
+    def submit(self, pcb, arrival_time=None):
+        """Registers an existing PCB with the simulation."""
+        pcb.arrival_time = self.time if arrival_time is None else arrival_time
+        self.processes[pcb.pid] = pcb
+        self._live += 1
+        if pcb.arrival_time <= self.time:
+            self._admit(pcb)
+        else:
+            heapq.heappush(self._pending, (pcb.arrival_time, next(self._pending_seq), pcb))
+
+    def load_workload(self, workload):
+        """Streams workload entries into the simulation as their arrival time comes.
+
+        Each entry is a PCB or a `(name, burst_time, arrival_time[, priority])`
+        tuple; entries must be ordered by arrival time. The iterable is consumed
+        lazily, so generators over very large workloads are fine.
+        """
+        self._arrivals = iter(workload)
+        self._next_arrival = None
+        self._pull_arrival()
+
+    def _pull_arrival(self):
+        self._next_arrival = next(self._arrivals, None) if self._arrivals is not None else None
+        if self._next_arrival is None:
+            self._arrivals = None
+
+    def _admit_arrivals(self):
+        while self._next_arrival is not None:
+            entry = self._next_arrival
+            if entry_arrival(entry) > self.time:
+                break
+            self._pull_arrival()
+            pcb = pcb_from_entry(entry, self.pids)
+            self.submit(pcb, pcb.arrival_time)
+        while self._pending and self._pending[0][0] <= self.time:
+            self._admit(heapq.heappop(self._pending)[2])
+
+    def _admit(self, pcb):
+        if pcb.state == 'NEW':  # Migrated processes are already READY and arrived elsewhere
+            self._notify('arrive', pcb)
+        self._enqueue(pcb)
+        self._check_preemption(pcb)
+
+    def _check_preemption(self, pcb):
+        running = self.running_process
+        if running and self.scheduler.should_preempt(running, pcb):
+            self._preempt()
+
+    def _preempt(self):
+        pcb = self.running_process
+        pcb.state = 'READY'
+        pcb.time_in_current_quantum = 0
+        self.running_process = None
+        ran = self.time_slice_elapsed
+        self.time_slice_elapsed = 0
+        self._notify('preempt', pcb)
+        self.scheduler.requeue(pcb, ran, False)
+
+    def _enqueue(self, pcb):
+        self.scheduler.add_process(pcb)
+
+    def _notify(self, event, pcb):
+        for observer in self.observers:
+            observer.on_event(event, self.time, pcb)
+
+    # ----- I/O -----
+
+    def _block(self, pcb, ran):
+        """Moves a process whose CPU burst ended into its next I/O burst."""
+        pcb.burst_index += 1
+        pcb.state = 'WAITING'
+        self._blocked_since[pcb.pid] = (self.time, ran)
+        self._notify('block', pcb)
+        device = self.devices[pcb.io_device or self._default_device]
+        device.submit(pcb, pcb.bursts[pcb.burst_index])
+
+    def _wake(self, pcb):
+        """Starts the CPU burst after a completed I/O and hands the process back."""
+        blocked_at, ran = self._blocked_since.pop(pcb.pid)
+        pcb.io_time += self.time - blocked_at
+        pcb.burst_index += 1
+        pcb.remaining_time = pcb.bursts[pcb.burst_index]
+        pcb.time_in_current_quantum = 0
+        pcb.state = 'READY'
+        self._notify('wakeup', pcb)
+        # A voluntary yield: MLFQ keeps the level of processes that block before their quantum ends
+        self.scheduler.requeue(pcb, ran, False)
+
+    def _advance_clock(self):
+        self.time += 1
+        self.scheduler.tick()
+
+    def _service_devices(self):
+        """Serves one tick of I/O and returns the processes woken up."""
+        woken = []
+        for device in self.devices.values():
+            for pcb in device.tick():
+                self._wake(pcb)
+                woken.append(pcb)
+        return woken
+
+    def withdraw(self, pcb):
+        """Removes a queued process from this simulation (e.g. to migrate it), dropping its scheduler state."""
+        if pcb is self.running_process or not self.scheduler.remove_process(pcb):
+            return False
+        self.scheduler.forget(pcb)
+        del self.processes[pcb.pid]
+        self._live -= 1
+        self.pending_overhead.pop(pcb.pid, None)
+        self._cache_stamp.pop(pcb.pid, None)
+        return True
+
+    def load(self):
+        """Runnable processes on this CPU: the queue plus the running one."""
+        return len(self.scheduler) + (1 if self.running_process else 0)
+
+    # ----- Scheduler switching -----
+
+    def set_scheduler(self, scheduler):
+        """Replaces the scheduler, moving every ready or running process into the new one."""
+        readd = []
+        readd_pids = set()
+        if self.running_process:
+            self._notify('preempt', self.running_process)
+            self.running_process.state = 'READY'
+            self.running_process.time_in_current_quantum = 0
+            readd.append(self.running_process)
+            readd_pids.add(self.running_process.pid)
+            self.running_process = None
+            self.current_time_slice = 0
+            self.time_slice_elapsed = 0
+        for pcb in self.processes.values():
+            # Processes blocked on I/O come back through requeue() when their device wakes them
+            if (pcb.state not in ('TERMINATED', 'WAITING') and pcb.pid not in readd_pids
+                    and pcb.arrival_time <= self.time):
+                readd.append(pcb)
+        self.scheduler = scheduler
+        for pcb in readd:
+            self._enqueue(pcb)
+
+    # ----- Execution -----
+
+    def _dispatch(self):
+        pcb, time_slice = self.scheduler.get_next()
+        if pcb is None:
+            return None
+        self.running_process = pcb
+        self.current_time_slice = time_slice if time_slice != float('inf') else pcb.remaining_time
+        self.time_slice_elapsed = 0
+        pcb.time_in_current_quantum = 0
+        if pcb.first_run_time is None:
+            pcb.first_run_time = self.time
+        self.overhead_remaining = self._dispatch_overhead(pcb)
+        self._notify('dispatch', pcb)
+        return pcb
+
+    def _dispatch_overhead(self, pcb):
+        """Ticks to charge before `pcb` makes progress after being dispatched."""
+        overhead = self.pending_overhead.pop(pcb.pid, 0)
+        if self._last_pid is not None and self._last_pid != pcb.pid:
+            overhead += self.context_switch_cost
+        self._last_pid = pcb.pid
+        stamp = self._cache_stamp.get(pcb.pid)
+        if self.cache_penalty and stamp is not None and self.busy_time > stamp:
+            foreign = min(self.busy_time - stamp, self.cache_decay)
+            overhead += math.ceil(self.cache_penalty * foreign / self.cache_decay)
+        return overhead
+
+    def _requeue_after_quantum(self, pcb, ran):
+        pcb.state = 'READY'
+        pcb.time_in_current_quantum = 0
+        self._notify('expire', pcb)
+        self.scheduler.requeue(pcb, ran, True)
+
+    def _record(self, pid):
+        if not self.record_timeline:
+            return
+        if self.timeline and self.timeline[-1][0] == pid and self.timeline[-1][2] == self.time:
+            self.timeline[-1][2] = self.time + 1
+        else:
+            self.timeline.append([pid, self.time, self.time + 1])
+
+    def step(self):
+        """Advances the simulation by one time unit and returns the event name."""
+        self._admit_arrivals()
+        if self.running_process is None:
+            self._dispatch()
+
+        pcb = self.running_process
+        if pcb and self.overhead_remaining > 0:
+            self._record(OVERHEAD)
+            self.overhead_remaining -= 1
+            self.overhead_time += 1
+            pcb.overhead_time += 1
+            self._advance_clock()
+            for woken in self._service_devices():
+                self._check_preemption(woken)
+            self.last_event = 'overhead'
+            self.last_process = pcb
+            self._admit_arrivals()
+            return self.last_event
+
+        self._record(pcb.pid if pcb else None)
+        if pcb:
+            self.busy_time += 1
+            if self.cache_penalty:
+                self._cache_stamp[pcb.pid] = self.busy_time
+            pcb.remaining_time -= 1
+            pcb.time_in_current_quantum += 1
+            self.time_slice_elapsed += 1
+        self._advance_clock()
+        # I/O finishing during this tick is served before the running process may block on a new request
+        woken = self._service_devices()
+
+        self.last_process = pcb
+        if pcb is None:
+            self.last_event = 'idle'
+        elif pcb.remaining_time <= 0 and pcb.has_io_pending():
+            ran = self.time_slice_elapsed
+            self.running_process = None
+            self.time_slice_elapsed = 0
+            self._block(pcb, ran)
+            self.last_event = 'blocked'
+        elif pcb.remaining_time <= 0:
+            pcb.state = 'TERMINATED'
+            pcb.completion_time = self.time
+            self._live -= 1
+            self.scheduler.on_exit(pcb)
+            self._notify('exit', pcb)
+            self._cache_stamp.pop(pcb.pid, None)
+            if not self.keep_finished:
+                del self.processes[pcb.pid]
+                self.pids.release(pcb.pid)
+            self.running_process = None
+            self.time_slice_elapsed = 0
+            self.last_event = 'finished'
+        elif self.time_slice_elapsed >= self.current_time_slice:
+            ran = self.time_slice_elapsed
+            self.running_process = None
+            self.time_slice_elapsed = 0
+            self._requeue_after_quantum(pcb, ran)
+            self.last_event = 'expired'
+        else:
+            self.last_event = 'running'
+        for woken_pcb in woken:
+            self._check_preemption(woken_pcb)
+
+        # Pick the successor right away so observers see who holds the CPU next.
+        self._admit_arrivals()
+        if self.running_process is None and self._dispatch() and pcb is None:
+            self.last_event = 'dispatched'
+            self.last_process = self.running_process
+        return self.last_event
+
+    def is_done(self):
+        """True when nothing is running, queued or still due to arrive."""
+        return self._live == 0 and self._next_arrival is None
+
+    def run(self, workload=None, max_time=None):
+        """Runs until every process finishes (or `max_time`) and returns the results."""
+        if workload is not None:
+            self.load_workload(workload)
+        while not self.is_done():
+            if max_time is not None and self.time >= max_time:
+                break
+            self.step()
+        return self.results()
+
+    # ----- Results -----
+
+    def process_metrics(self, pcb):
+        """Turnaround, ready-queue waiting, I/O and response time of one finished PCB."""
+        turnaround = pcb.completion_time - pcb.arrival_time
+        return {
+            'pid': pcb.pid,
+            'name': pcb.name,
+            'arrival': pcb.arrival_time,
+            'burst': pcb.burst_time,
+            'completion': pcb.completion_time,
+            'turnaround': turnaround,
+            'waiting': turnaround - pcb.burst_time - pcb.io_time,
+            'io': pcb.io_time,
+            'response': pcb.first_run_time - pcb.arrival_time,
+        }
+
+    def results(self):
+        """Timeline segments plus per-process and averaged metrics."""
+        finished = [pcb for pcb in self.processes.values() if pcb.state == 'TERMINATED']
+        metrics = {pcb.pid: self.process_metrics(pcb) for pcb in finished}
+        averages = {}
+        if metrics:
+            for key in ('turnaround', 'waiting', 'response'):
+                averages[key] = sum(m[key] for m in metrics.values()) / len(metrics)
+        return {
+            'time': self.time,
+            'busy_time': self.busy_time,
+            'overhead_time': self.overhead_time,
+            'devices': {name: {'busy_time': d.busy_time, 'completed': d.completed} for name, d in self.devices.items()},
+            'timeline': [tuple(segment) for segment in self.timeline],
+            'processes': metrics,
+            'averages': averages,
+        }
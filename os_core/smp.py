@@ -0,0 +1,215 @@
+import heapq
+import itertools
+
+from os_core.process import PidAllocator
+from os_core.simulation import SchedulerSimulation, pcb_from_entry, entry_arrival
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list (p in 0..100)."""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-p * len(sorted_values) // 100))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class SMPSimulation:
+    """Multi-core scheduling simulation with per-CPU run queues.
+
+    Every CPU is a `SchedulerSimulation` with its own scheduler instance, built
+    by `scheduler_factory`. New processes are pushed to the least loaded CPU
+    their affinity allows; every `balance_interval` ticks queues are evened out
+    (push migration), and an idle CPU steals queued work from the busiest one.
+    A migrated process that already ran pays `migration_cost` ticks of overhead
+    on its next dispatch, standing in for the cache it left behind.
+    `observers` are attached to every CPU (a `MetricsCollector` should be built
+    with the same `num_cpus`), as are the context-switch and cache costs and
+    the retention options of `SchedulerSimulation`.
+    """
+
+    def __init__(self, scheduler_factory, num_cpus=2, migration_cost=1, balance_interval=10, work_stealing=True,
+                 observers=None, context_switch_cost=0, cache_penalty=0, cache_decay=10, keep_finished=True,
+                 record_timeline=True):
+        if num_cpus <= 0:
+            raise ValueError("num_cpus must be a positive integer.")
+        self.scheduler_factory = scheduler_factory
+        self.pids = PidAllocator()  # One namespace shared by every CPU
+        self.cpus = [SchedulerSimulation(scheduler_factory(), observers=observers, pids=self.pids,
+                                         context_switch_cost=context_switch_cost, cache_penalty=cache_penalty,
+                                         cache_decay=cache_decay, keep_finished=keep_finished,
+                                         record_timeline=record_timeline)
+                     for _ in range(num_cpus)]
+        self.migration_cost = migration_cost
+        self.balance_interval = balance_interval
+        self.work_stealing = work_stealing
+        self.time = 0
+        self.migrations = 0
+        self.steals = 0
+        self.migration_overhead = 0  # Migration cost charged, excluding charges dropped by a later migration
+        self._pending = []  # Heap of (arrival_time, seq, PCB)
+        self._pending_seq = itertools.count()
+        self._arrivals = None
+        self._next_arrival = None
+
+    # ----- Workload -----
+
+    def add_process(self, name, burst_time, arrival_time=None, priority=0, affinity=None):
+        pcb = pcb_from_entry((name, burst_time, self.time if arrival_time is None else arrival_time, priority), self.pids)
+        pcb.affinity = set(affinity) if affinity is not None else None
+        self.submit(pcb, pcb.arrival_time)
+        return pcb
+
+    def submit(self, pcb, arrival_time=None):
+        pcb.arrival_time = self.time if arrival_time is None else arrival_time
+        if pcb.arrival_time <= self.time:
+            self._place(pcb)
+        else:
+            heapq.heappush(self._pending, (pcb.arrival_time, next(self._pending_seq), pcb))
+
+    def load_workload(self, workload):
+        """Streams arrival-ordered workload entries, like `SchedulerSimulation.load_workload`."""
+        self._arrivals = iter(workload)
+        self._pull_arrival()
+
+    def _pull_arrival(self):
+        self._next_arrival = next(self._arrivals, None) if self._arrivals is not None else None
+        if self._next_arrival is None:
+            self._arrivals = None
+
+    def _admit_arrivals(self):
+        while self._next_arrival is not None and entry_arrival(self._next_arrival) <= self.time:
+            pcb = pcb_from_entry(self._next_arrival, self.pids)
+            self._pull_arrival()
+            self._place(pcb)
+        while self._pending and self._pending[0][0] <= self.time:
+            self._place(heapq.heappop(self._pending)[2])
+
+    # ----- Placement and balancing -----
+
+    @staticmethod
+    def allowed(pcb, cpu_id):
+        return pcb.affinity is None or cpu_id in pcb.affinity
+
+    def _place(self, pcb):
+        candidates = [i for i in range(len(self.cpus)) if self.allowed(pcb, i)]
+        if not candidates:
+            raise ValueError(f"Process PID {pcb.pid} has no CPU in its affinity set.")
+        cpu_id = min(candidates, key=lambda i: self.cpus[i].load())
+        pcb.cpu = cpu_id
+        self.cpus[cpu_id].submit(pcb, pcb.arrival_time)
+
+    def _pick_migratable(self, src_id, dst_id):
+        for pcb in self.cpus[src_id].scheduler.ready_processes():
+            if self.allowed(pcb, dst_id):
+                return pcb
+        return None
+
+    def migrate(self, pcb, src_id, dst_id):
+        """Moves a queued process between CPUs with its scheduler state, charging the migration cost."""
+        src, dst = self.cpus[src_id], self.cpus[dst_id]
+        # Not yet paid on the source; withdraw drops it and the new move charges afresh
+        unpaid = src.pending_overhead.get(pcb.pid, 0)
+        state = src.scheduler.export_state(pcb)  # MLFQ level, stride pass, vruntime... move with the process
+        if not self.allowed(pcb, dst_id) or not src.withdraw(pcb):
+            return False
+        self.migration_overhead -= unpaid
+        dst.scheduler.import_state(pcb, state)
+        dst.submit(pcb, pcb.arrival_time)
+        pcb.cpu = dst_id
+        if self.migration_cost and pcb.first_run_time is not None:
+            dst.pending_overhead[pcb.pid] = dst.pending_overhead.get(pcb.pid, 0) + self.migration_cost
+            self.migration_overhead += self.migration_cost
+        self.migrations += 1
+        return True
+
+    def balance(self):
+        """Push migration: moves queued work from the busiest to the idlest CPU."""
+        for _ in range(sum(len(cpu.scheduler) for cpu in self.cpus)):
+            loads = [cpu.load() for cpu in self.cpus]
+            busiest = max(range(len(loads)), key=loads.__getitem__)
+            idlest = min(range(len(loads)), key=loads.__getitem__)
+            if loads[busiest] - loads[idlest] <= 1:
+                return
+            pcb = self._pick_migratable(busiest, idlest)
+            if pcb is None or not self.migrate(pcb, busiest, idlest):
+                return
+
+    def steal(self, thief_id):
+        """Work stealing: an idle CPU pulls one queued process from the busiest CPU."""
+        victims = sorted(range(len(self.cpus)), key=lambda i: len(self.cpus[i].scheduler), reverse=True)
+        for victim_id in victims:
+            if victim_id == thief_id or not len(self.cpus[victim_id].scheduler):
+                continue
+            pcb = self._pick_migratable(victim_id, thief_id)
+            if pcb is not None and self.migrate(pcb, victim_id, thief_id):
+                self.steals += 1
+                return True
+        return False
+
+    # ----- Execution -----
+
+    def step(self):
+        self._admit_arrivals()
+        if self.balance_interval and self.time % self.balance_interval == 0:
+            self.balance()
+        if self.work_stealing:
+            for cpu_id, cpu in enumerate(self.cpus):
+                if cpu.load() == 0:
+                    self.steal(cpu_id)
+        for cpu in self.cpus:
+            cpu.step()
+        self.time += 1
+
+    def is_done(self):
+        if self._pending or self._next_arrival is not None:
+            return False
+        return all(cpu.is_done() for cpu in self.cpus)
+
+    def run(self, workload=None, max_time=None):
+        if workload is not None:
+            self.load_workload(workload)
+        while not self.is_done():
+            if max_time is not None and self.time >= max_time:
+                break
+            self.step()
+        return self.results()
+
+    # ----- Results -----
+
+    def results(self):
+        """Per-process metrics, per-CPU utilization and tail latencies."""
+        metrics = {}
+        for cpu in self.cpus:
+            for pcb in cpu.processes.values():
+                if pcb.state == 'TERMINATED':
+                    metrics[pcb.pid] = cpu.process_metrics(pcb)
+
+        latency = {}
+        for key in ('turnaround', 'waiting', 'response'):
+            values = sorted(m[key] for m in metrics.values())
+            latency[key] = {
+                'mean': sum(values) / len(values) if values else None,
+                'p50': percentile(values, 50),
+                'p95': percentile(values, 95),
+                'p99': percentile(values, 99),
+                'max': values[-1] if values else None,
+            }
+
+        elapsed = self.time or 1
+        cpus = [{
+            'cpu': i,
+            'utilization': cpu.busy_time / elapsed,
+            'overhead': cpu.overhead_time / elapsed,
+            'timeline': [tuple(segment) for segment in cpu.timeline],
+        } for i, cpu in enumerate(self.cpus)]
+        return {
+            'time': self.time,
+            'processes': metrics,
+            'latency': latency,
+            'cpus': cpus,
+            'utilization': sum(c['utilization'] for c in cpus) / len(cpus),
+            'migrations': self.migrations,
+            'steals': self.steals,
+            'migration_overhead': self.migration_overhead,
+            'overhead_time': sum(cpu.overhead_time for cpu in self.cpus),
+        }
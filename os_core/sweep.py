@@ -0,0 +1,118 @@
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+
+from os_core.metrics import MetricsCollector
+from os_core.scheduler import (FIFOScheduler, RoundRobinScheduler, MLFQScheduler, SJFScheduler, SRTFScheduler,
+                               PriorityScheduler, LotteryScheduler, StrideScheduler, CFSScheduler, EDFScheduler,
+                               RateMonotonicScheduler)
+from os_core.simulation import SchedulerSimulation
+from os_core.smp import SMPSimulation
+from os_core.workload import read_trace
+
+SCHEDULERS = {
+    'FIFO': FIFOScheduler, 'RR': RoundRobinScheduler, 'MLFQ': MLFQScheduler, 'SJF': SJFScheduler,
+    'SRTF': SRTFScheduler, 'Priority': PriorityScheduler, 'Lottery': LotteryScheduler,
+    'Stride': StrideScheduler, 'CFS': CFSScheduler, 'EDF': EDFScheduler, 'RM': RateMonotonicScheduler,
+}
+# Config keys consumed by the simulation; every other key goes to the scheduler constructor
+SIMULATION_KEYS = ('cores', 'context_switch_cost', 'cache_penalty', 'cache_decay', 'migration_cost', 'balance_interval',
+                   'work_stealing', 'max_time')
+# Only meaningful with several cores; dropped from single-core configs
+SMP_KEYS = ('migration_cost', 'balance_interval', 'work_stealing')
+HIGHER_IS_BETTER = ('throughput', 'cpu_utilization', 'completed')
+LATENCY_COLUMNS = tuple(f"{metric}_{stat}" for metric in ('turnaround', 'waiting', 'response')
+                        for stat in ('mean', 'p50', 'p95', 'p99'))
+METRIC_COLUMNS = ('time', 'completed', 'throughput', 'cpu_utilization', 'context_switches') + LATENCY_COLUMNS
+DEFAULT_TABLE_COLUMNS = ('throughput', 'cpu_utilization', 'context_switches', 'turnaround_mean', 'turnaround_p95',
+                         'waiting_p95', 'response_p99')
+
+
+def grid(scheduler, **axes):
+    """Every combination of the value lists in `axes`, as configs for `scheduler`.
+
+    `grid('MLFQ', levels=[3], time_quanta=[[2, 4, 8], [3, 6, 9]], cores=[1, 2])`
+    yields four configs. Scalars are treated as single-value axes.
+    """
+    names = list(axes)
+    values = [value if isinstance(value, (list, tuple, range)) else [value] for value in axes.values()]
+    for combination in itertools.product(*values):
+        config = {'scheduler': scheduler}
+        config.update(zip(names, combination))
+        yield config
+
+
+def run_config(trace_path, config):
+    """Runs one config over the trace and returns its flattened metrics row.
+
+    Only aggregates are kept (no finished PCBs, no timeline), so the memory of
+    a run does not grow with the trace.
+    """
+    options = dict(config)
+    scheduler_class = SCHEDULERS[options.pop('scheduler')]
+    cores = options.pop('cores', 1)
+    max_time = options.pop('max_time', None)
+    sim_options = {key: options.pop(key) for key in SIMULATION_KEYS if key in options}
+
+    collector = MetricsCollector(num_cpus=cores)
+    if cores == 1:
+        for key in SMP_KEYS:
+            sim_options.pop(key, None)
+        sim = SchedulerSimulation(scheduler_class(**options), observers=[collector], keep_finished=False,
+                                  record_timeline=False, **sim_options)
+    else:
+        sim = SMPSimulation(lambda: scheduler_class(**options), num_cpus=cores, observers=[collector],
+                            keep_finished=False, record_timeline=False, **sim_options)
+    sim.run(read_trace(trace_path), max_time=max_time)
+
+    summary = collector.summary()
+    row = dict(config)
+    row['time'] = sim.time
+    for key in ('completed', 'throughput', 'cpu_utilization', 'context_switches'):
+        row[key] = summary[key]
+    for column in LATENCY_COLUMNS:
+        metric, stat = column.split('_')
+        row[column] = summary[metric][stat]
+    return row
+
+
+def sweep(trace_path, configs, rank_by='turnaround_mean', max_workers=None):
+    """Runs every config over the trace in a process pool and returns rows ranked best first.
+
+    Metrics in `HIGHER_IS_BETTER` rank descending, all others ascending.
+    `max_workers=1` runs serially in this process, which is easier to debug.
+    """
+    configs = list(configs)
+    if max_workers == 1:
+        rows = [run_config(trace_path, config) for config in configs]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            rows = list(executor.map(run_config, itertools.repeat(trace_path), configs))
+    return rank(rows, rank_by)
+
+
+def rank(rows, rank_by='turnaround_mean'):
+    descending = rank_by in HIGHER_IS_BETTER
+    # Rows without a value (nothing finished) always sort last
+    missing = [row for row in rows if row.get(rank_by) is None]
+    present = sorted((row for row in rows if row.get(rank_by) is not None),
+                     key=lambda row: row[rank_by], reverse=descending)
+    return present + missing
+
+
+def format_table(rows, columns=None):
+    """Renders ranked rows as a plain-text table."""
+    if not rows:
+        return ""
+    if columns is None:
+        config_keys = list(dict.fromkeys(key for row in rows for key in row if key not in METRIC_COLUMNS))
+        columns = config_keys + list(DEFAULT_TABLE_COLUMNS)
+
+    def cell(value):
+        if isinstance(value, float):
+            return f"{value:.3f}"
+        return "-" if value is None else str(value)
+
+    table = [["#"] + columns] + [[str(i)] + [cell(row.get(column)) for column in columns]
+                                 for i, row in enumerate(rows, 1)]
+    widths = [max(len(line[i]) for line in table) for i in range(len(table[0]))]
+    return "\n".join("  ".join(text.ljust(width) for text, width in zip(line, widths)).rstrip() for line in table)
@@ -0,0 +1,172 @@
+import itertools
+import math
+import random
+import struct
+import sys
+from array import array
+
+# Trace file layout: MAGIC, then blocks of
+#   <II header (records, phases), arrival int64[records], priority int32[records],
+#   phase_count uint32[records], phases uint32[phases]
+# all little-endian. Blocks are independent, so readers stream one at a time.
+TRACE_MAGIC = b"MOSTRC1\0"
+_BLOCK_HEADER = struct.Struct('<II')
+DEFAULT_BLOCK_SIZE = 65536
+
+BURST_DISTRIBUTIONS = ('pareto', 'lognormal', 'exponential', 'fixed')
+
+
+class WorkloadGenerator:
+    """Synthetic, seeded workloads for scheduler benchmarks.
+
+    Arrivals form a Poisson process (exponential inter-arrival times at
+    `arrival_rate` per tick). CPU bursts follow a heavy-tailed Pareto or
+    lognormal distribution (or exponential/fixed) with mean `mean_burst`. With
+    probability `io_probability` a process alternates CPU and I/O phases.
+
+    Records are `(name, burst_time, arrival_time, priority, phases)` tuples where
+    `phases` alternates CPU and I/O durations, starts and ends with CPU, and
+    `burst_time` is the total CPU time. All times are whole ticks.
+    """
+
+    def __init__(self, seed=None, arrival_rate=0.2, burst_distribution='pareto', mean_burst=10,
+                 pareto_alpha=1.5, lognormal_sigma=1.0, max_burst=None, io_probability=0.0,
+                 cpu_phases=(2, 5), mean_io=5, priority_range=(0, 0), name_prefix="T"):
+        if burst_distribution not in BURST_DISTRIBUTIONS:
+            raise ValueError(f"burst_distribution must be one of {BURST_DISTRIBUTIONS}.")
+        if arrival_rate <= 0 or mean_burst <= 0:
+            raise ValueError("arrival_rate and mean_burst must be positive.")
+        if burst_distribution == 'pareto' and pareto_alpha <= 1:
+            raise ValueError("pareto_alpha must be > 1 for the mean to exist.")
+        self.random = random.Random(seed)
+        self.arrival_rate = arrival_rate
+        self.burst_distribution = burst_distribution
+        self.mean_burst = mean_burst
+        self.pareto_alpha = pareto_alpha
+        self.lognormal_sigma = lognormal_sigma
+        self.max_burst = max_burst
+        self.io_probability = io_probability
+        self.cpu_phases = cpu_phases
+        self.mean_io = mean_io
+        self.priority_range = priority_range
+        self.name_prefix = name_prefix
+
+    def sample_burst(self):
+        """One CPU burst length (>= 1 tick)."""
+        rng = self.random
+        if self.burst_distribution == 'pareto':
+            scale = self.mean_burst * (self.pareto_alpha - 1) / self.pareto_alpha
+            value = scale * rng.paretovariate(self.pareto_alpha)
+        elif self.burst_distribution == 'lognormal':
+            mu = math.log(self.mean_burst) - self.lognormal_sigma ** 2 / 2
+            value = rng.lognormvariate(mu, self.lognormal_sigma)
+        elif self.burst_distribution == 'exponential':
+            value = rng.expovariate(1 / self.mean_burst)
+        else:
+            value = self.mean_burst
+        burst = max(1, round(value))
+        return min(burst, self.max_burst) if self.max_burst else burst
+
+    def sample_phases(self):
+        if self.io_probability and self.random.random() < self.io_probability:
+            cpu_count = self.random.randint(*self.cpu_phases)
+        else:
+            cpu_count = 1
+        phases = [self.sample_burst()]
+        for _ in range(cpu_count - 1):
+            phases.append(max(1, round(self.random.expovariate(1 / self.mean_io))))
+            phases.append(self.sample_burst())
+        return phases
+
+    def generate(self, count=None, start_time=0):
+        """Yields `count` records (endlessly if None) in arrival order."""
+        clock = float(start_time)
+        indices = itertools.count() if count is None else range(count)
+        for index in indices:
+            clock += self.random.expovariate(self.arrival_rate)
+            phases = self.sample_phases()
+            priority = self.random.randint(*self.priority_range)
+            yield (f"{self.name_prefix}{index}", sum(phases[0::2]), int(clock), priority, tuple(phases))
+
+
+def _to_little_endian(column):
+    if sys.byteorder == 'big':
+        column.byteswap()
+    return column
+
+
+def write_trace(path, records, block_size=DEFAULT_BLOCK_SIZE):
+    """Writes workload records to a compact columnar trace file and returns the count.
+
+    Records are consumed as a stream and flushed every `block_size` records, so
+    memory stays bounded for arbitrarily large workloads. Names are not stored;
+    readers name records by their index.
+    """
+    written = 0
+    with open(path, 'wb') as f:
+        f.write(TRACE_MAGIC)
+        block = []
+        for record in records:
+            block.append(record)
+            if len(block) >= block_size:
+                _write_block(f, block)
+                written += len(block)
+                block = []
+        if block:
+            _write_block(f, block)
+            written += len(block)
+    return written
+
+
+def _write_block(f, block):
+    arrivals = array('q', (record[2] for record in block))
+    priorities = array('i', (record[3] if len(record) > 3 else 0 for record in block))
+    phase_counts = array('I')
+    phases = array('I')
+    for record in block:
+        record_phases = record[4] if len(record) > 4 and record[4] else (record[1],)
+        phase_counts.append(len(record_phases))
+        phases.extend(record_phases)
+    f.write(_BLOCK_HEADER.pack(len(block), len(phases)))
+    for column in (arrivals, priorities, phase_counts, phases):
+        _to_little_endian(column).tofile(f)
+
+
+def _read_column(f, typecode, count):
+    column = array(typecode)
+    if count:
+        column.fromfile(f, count)
+    return _to_little_endian(column)
+
+
+def read_trace(path, name_prefix="T"):
+    """Streams `(name, burst_time, arrival_time, priority, phases)` records from a trace file.
+
+    Only one block is held in memory at a time, so the result can be handed
+    straight to `SchedulerSimulation.run` or `load_workload`.
+    """
+    with open(path, 'rb') as f:
+        if f.read(len(TRACE_MAGIC)) != TRACE_MAGIC:
+            raise ValueError(f"Not a workload trace file: {path}")
+        index = 0
+        while True:
+            header = f.read(_BLOCK_HEADER.size)
+            if not header:
+                return
+            if len(header) < _BLOCK_HEADER.size:
+                raise ValueError(f"Truncated trace file: {path}")
+            count, phase_total = _BLOCK_HEADER.unpack(header)
+            try:
+                arrivals = _read_column(f, 'q', count)
+                priorities = _read_column(f, 'i', count)
+                phase_counts = _read_column(f, 'I', count)
+                phases = _read_column(f, 'I', phase_total)
+            except EOFError:
+                raise ValueError(f"Truncated trace file: {path}")
+            offset = 0
+            for i in range(count):
+                record_phases = tuple(phases[offset:offset + phase_counts[i]])
+                offset += phase_counts[i]
+                yield (f"{name_prefix}{index}", sum(record_phases[0::2]), arrivals[i], priorities[i], record_phases)
+                index += 1
+
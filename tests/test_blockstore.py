@@ -0,0 +1,59 @@
+import random
+import unittest
+from os_core.blockstore import BlockStore
+
+
+class TestBlockStore(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.data = random.Random(5).randbytes(200_000)
+
+    def test_identical_content_is_stored_once(self):
+        """Test duplicates only add references"""
+        store = BlockStore(block_size=4096)
+        first = store.put(self.data)
+        second = store.put(self.data)
+        self.assertEqual(first, second)
+        self.assertEqual(store.read(first), self.data)
+        stats = store.stats()
+        self.assertEqual(stats['stored_bytes'], len(self.data))
+        self.assertEqual(stats['logical_bytes'], 2 * len(self.data))
+        self.assertAlmostEqual(stats['dedup_ratio'], 2.0)
+
+    def test_release_frees_unreferenced_blocks(self):
+        """Test blocks disappear once their last reference is released"""
+        store = BlockStore(block_size=4096)
+        digests = store.put(self.data)
+        store.ref(digests)
+        store.release(digests)
+        self.assertEqual(store.refcount(digests[0]), 1)
+        store.release(digests)
+        self.assertEqual(store.refcount(digests[0]), 0)
+        self.assertEqual(store.stats(), {'blocks': 0, 'stored_bytes': 0, 'logical_bytes': 0, 'dedup_ratio': 1.0})
+
+    def test_content_defined_chunking_survives_insertions(self):
+        """Test an insertion near the start only changes the blocks around it under CDC"""
+        shifted = self.data[:100] + b'inserted' + self.data[100:]
+        fixed, cdc = BlockStore(block_size=4096), BlockStore('cdc', block_size=4096)
+        for store in (fixed, cdc):
+            store.put(self.data)
+            store.put(shifted)
+        self.assertGreater(fixed.stored_bytes, 1.9 * len(self.data))
+        self.assertLess(cdc.stored_bytes, 1.2 * len(self.data))
+        sizes = [len(block) for block in cdc.split(self.data)]
+        self.assertTrue(all(1024 <= size <= 16384 for size in sizes[:-1]))
+        self.assertEqual(sum(sizes), len(self.data))
+
+    def test_sha256_and_validation(self):
+        """Test the SHA-256 option and rejected settings"""
+        store = BlockStore(hash_name='sha256')
+        self.assertEqual(len(store.put(b'abc')[0]), 32)
+        with self.assertRaises(ValueError):
+            BlockStore(chunking='rabin')
+        with self.assertRaises(ValueError):
+            BlockStore(hash_name='md5')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,141 @@
+import base64
+import hashlib
+import unittest
+from cryptography.fernet import Fernet
+from os_core import crypto
+
+
+def _apply(content, patch):
+    writes, length = patch
+    content = bytearray(content)
+    for offset, data in writes:
+        content[offset:offset + len(data)] = data
+    del content[length:]
+    return bytes(content)
+
+
+class TestChunkedEncryption(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.key = Fernet.generate_key()
+        self.plain = bytes(range(100))
+        self.content = crypto.encrypt(self.key, self.plain, chunk_size=16)
+
+    def _reader(self, content, log=None):
+        def read(offset, size):
+            if log is not None:
+                log.append((offset, size))
+            return content[offset:offset + size]
+        return read
+
+    def test_round_trip(self):
+        """Test every size, including empty and exact multiples of the chunk size"""
+        for size in (0, 1, 15, 16, 17, 64, 100):
+            content = crypto.encrypt(self.key, self.plain[:size], chunk_size=16)
+            self.assertTrue(crypto.is_chunked(content))
+            self.assertEqual(crypto.decrypt(self.key, content), self.plain[:size])
+            self.assertEqual(crypto.plaintext_size(self._reader(content)), size)
+
+    def test_pread_decrypts_only_overlapping_chunks(self):
+        """Test random access reads the header and just the needed tokens"""
+        log = []
+        data = crypto.pread(self.key, self._reader(self.content, log), 30, 4)
+        self.assertEqual(data, self.plain[30:34])
+        self.assertEqual(len(log), 3)  # Header, chunk 1, chunk 2
+        self.assertEqual(crypto.pread(self.key, self._reader(self.content), 95, 50), self.plain[95:])
+
+    def test_pwrite_rewrites_one_token(self):
+        """Test an in-place write re-encrypts only the chunk it touches"""
+        patch = crypto.pwrite_patch(self.key, self._reader(self.content), 40, b'XY')
+        writes, length = patch
+        self.assertEqual(len(writes), 1)
+        self.assertEqual(len(writes[0][1]), crypto.token_size(8 + 16))
+        self.assertEqual(length, len(self.content))
+        expected = self.plain[:40] + b'XY' + self.plain[42:]
+        self.assertEqual(crypto.decrypt(self.key, _apply(self.content, patch)), expected)
+
+    def test_pwrite_grows_with_zero_fill(self):
+        """Test writes past the end zero-fill the gap and move the last-chunk marker"""
+        content = _apply(self.content, crypto.pwrite_patch(self.key, self._reader(self.content), 130, b'end'))
+        self.assertEqual(crypto.decrypt(self.key, content), self.plain + bytes(30) + b'end')
+
+    def test_truncate(self):
+        """Test shrinking and growing the plaintext"""
+        for size in (0, 16, 37, 100, 120):
+            content = _apply(self.content, crypto.truncate_patch(self.key, self._reader(self.content), size))
+            self.assertEqual(crypto.decrypt(self.key, content), (self.plain + bytes(20))[:size])
+
+    def test_tampering_is_detected(self):
+        """Test reordered or dropped chunks fail to decrypt"""
+        token = crypto.token_size(8 + 16)
+        start = crypto.HEADER_SIZE
+        first, second = self.content[start:start + token], self.content[start + token:start + 2 * token]
+        swapped = self.content[:start] + second + first + self.content[start + 2 * token:]
+        with self.assertRaises(ValueError):
+            crypto.decrypt(self.key, swapped)
+
+        # Drop the last chunk and fix up the (unauthenticated) size in the header
+        header = crypto._header(96, 16)
+        dropped = header + self.content[crypto.HEADER_SIZE:crypto.HEADER_SIZE + 6 * token]
+        with self.assertRaises(ValueError):
+            crypto.decrypt(self.key, dropped)
+        with self.assertRaises(ValueError):
+            crypto.decrypt(Fernet.generate_key(), self.content)
+
+    def test_legacy_tokens_and_cipher_cache(self):
+        """Test whole-file tokens still decrypt and ciphers are reused per key"""
+        legacy = Fernet(self.key).encrypt(b'old format')
+        self.assertFalse(crypto.is_chunked(legacy))
+        self.assertEqual(crypto.decrypt(self.key, legacy), b'old format')
+        self.assertIs(crypto.cipher(self.key), crypto.cipher(self.key))
+
+
+
+class TestKeyDerivation(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        crypto._master_keys.clear()
+        self.salt = b's' * 16
+
+    def test_spec_format_and_determinism(self):
+        """Test specs carry algorithm, cost and both salts, and derive stable keys"""
+        spec = crypto.new_kdf('pbkdf2', 1000, salt=self.salt)
+        algorithm, cost, salt, file_salt = crypto.parse_kdf(spec)
+        self.assertEqual((algorithm, cost, salt, len(file_salt)), ('pbkdf2', (1000,), self.salt, 16))
+        key = crypto.derive_key('pw', spec)
+        self.assertEqual(key, crypto.derive_key('pw', spec))
+        self.assertNotEqual(key, crypto.derive_key('other', spec))
+        Fernet(key)  # A valid Fernet key
+
+    def test_shared_salt_derives_master_once(self):
+        """Test specs sharing the KDF salt reuse one cached master key"""
+        specs = [crypto.new_kdf('scrypt', (4, 8, 1), salt=self.salt) for _ in range(5)]
+        keys = {crypto.derive_key('pw', spec) for spec in specs}
+        self.assertEqual(len(keys), 5)
+        self.assertEqual(len(crypto._master_keys), 1)
+        crypto.derive_key('pw', crypto.new_kdf('scrypt', (4, 8, 1)))
+        self.assertEqual(len(crypto._master_keys), 2)
+
+    def test_cache_is_bounded(self):
+        """Test the least recently used master keys are evicted"""
+        for i in range(crypto.KDF_CACHE_SIZE + 5):
+            crypto.derive_key(f'pw{i}', crypto.new_kdf('pbkdf2', 10, salt=self.salt))
+        self.assertEqual(len(crypto._master_keys), crypto.KDF_CACHE_SIZE)
+
+    def test_invalid_specs(self):
+        """Test unknown algorithms and wrong cost arity are rejected"""
+        with self.assertRaises(ValueError):
+            crypto.new_kdf('md5')
+        with self.assertRaises(ValueError):
+            crypto.new_kdf('scrypt', 14)
+
+    def test_legacy_key(self):
+        """Test the legacy derivation is the old unsalted SHA-256"""
+        expected = base64.urlsafe_b64encode(hashlib.sha256(b'pw').digest())
+        self.assertEqual(crypto.legacy_key('pw'), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
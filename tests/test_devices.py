@@ -0,0 +1,51 @@
+import unittest
+from os_core.devices import IODevice
+from os_core.process import PCB
+
+
+class TestIODevice(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        PCB.reset_pid_counter()
+
+    def create_test_pcb(self, name):
+        return PCB(name=name, memory_requirements_bytes=0, page_size=4)
+
+    def test_fcfs_service(self):
+        """Test requests are served one at a time in arrival order"""
+        device = IODevice(channels=1)
+        a, b = self.create_test_pcb("A"), self.create_test_pcb("B")
+        device.submit(a, 2)
+        device.submit(b, 1)
+
+        self.assertEqual(device.tick(), [])
+        self.assertEqual(device.tick(), [a])
+        self.assertEqual(device.tick(), [b])
+        self.assertEqual(len(device), 0)
+        self.assertEqual(device.busy_time, 3)
+
+    def test_parallel_channels(self):
+        """Test multiple channels serve requests concurrently"""
+        device = IODevice(channels=2)
+        a, b = self.create_test_pcb("A"), self.create_test_pcb("B")
+        device.submit(a, 1)
+        device.submit(b, 1)
+
+        self.assertEqual(device.tick(), [a, b])
+
+    def test_configurable_service_time(self):
+        """Test fixed and callable service times override the requested duration"""
+        fixed = IODevice(service_time=3)
+        pcb = self.create_test_pcb("A")
+        fixed.submit(pcb, 10)
+        self.assertEqual([fixed.tick() for _ in range(3)][-1], [pcb])
+
+        doubled = IODevice(service_time=lambda duration: duration * 2)
+        doubled.submit(pcb, 1)
+        self.assertEqual(doubled.tick(), [])
+        self.assertEqual(doubled.tick(), [pcb])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,859 @@
+import io
+import mmap
+import random
+import os
+import pickle
+import tempfile
+import unittest
+from cryptography.fernet import Fernet
+from os_core import crypto
+from os_core.diskimage import DiskImage, write_image, is_image, ROOT_INODE, MODE_FILE
+from os_core.filesystem import FileSystem, Directory, File, CHUNK_SIZE
+
+
+class _TempFSTestCase(unittest.TestCase):
+    """Gives every test a FileSystem stored in its own temporary directory."""
+
+    state_name = "fs_state.pkl"
+    fs_options = {}
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.state = os.path.join(self.tmpdir.name, self.state_name)
+        self.fs = FileSystem(self.state, **self.fs_options)
+
+    def tearDown(self):
+        self.fs._attach(None)
+        self.tmpdir.cleanup()
+
+
+class TestFileSystemJournal(_TempFSTestCase):
+
+    def _reload(self, **kwargs):
+        fs = FileSystem(self.state, **kwargs)
+        fs.load()
+        return fs
+
+    def test_journal_replay_without_checkpoint(self):
+        """Test saved changes survive a restart through the journal alone"""
+        self.fs.mkdir('/docs')
+        self.fs.create_file('/docs/a.txt', b'hello')
+        self.fs.write_file('/docs/a.txt', b'hello world')
+        self.fs.create_file('/tmp.txt')
+        self.fs.delete_file('/tmp.txt')
+        self.fs.save()
+
+        self.assertFalse(os.path.exists(self.state))
+        fs = self._reload()
+        self.assertEqual(fs.list_dir('/'), ['docs'])
+        self.assertEqual(fs.read_file('/docs/a.txt'), (b'hello world', False))
+
+    def test_unsaved_changes_are_lost(self):
+        """Test only changes committed by save() are durable"""
+        self.fs.mkdir('/kept')
+        self.fs.save()
+        self.fs.mkdir('/lost')
+        self.assertEqual(self._reload().list_dir('/'), ['kept'])
+
+    def test_save_appends_only_the_change(self):
+        """Test save() cost follows the size of the change, not of the tree"""
+        for i in range(200):
+            self.fs.create_file(f'/f{i}', b'x' * 1000)
+        self.fs.save()
+        before = os.path.getsize(self.fs.journal_file)
+        self.fs.mkdir('/new')
+        self.fs.save()
+        self.assertLess(os.path.getsize(self.fs.journal_file) - before, 200)
+
+    def test_checkpoint_replaces_state_and_empties_journal(self):
+        """Test a large journal is folded into an atomically replaced checkpoint"""
+        fs = FileSystem(self.state, checkpoint_bytes=1000)
+        fs.mkdir('/d')
+        fs.save()
+        self.assertFalse(os.path.exists(self.state))
+        fs.create_file('/d/big', b'y' * 2000)
+        fs.save()
+
+        self.assertTrue(os.path.exists(self.state))
+        self.assertFalse(os.path.exists(self.state + '.tmp'))
+        self.assertEqual(os.path.getsize(fs.journal_file), 0)
+        fs.create_file('/d/small', b'z')
+        fs.save()
+
+        loaded = self._reload()
+        self.assertEqual(sorted(loaded.list_dir('/d')), ['big', 'small'])
+        self.assertEqual(loaded.read_file('/d/big')[0], b'y' * 2000)
+
+    def test_torn_tail_is_ignored_and_truncated(self):
+        """Test a half-written final record is dropped on load"""
+        self.fs.mkdir('/a')
+        self.fs.save()
+        good_size = os.path.getsize(self.fs.journal_file)
+        self.fs.mkdir('/b')
+        self.fs.save()
+        with open(self.fs.journal_file, 'r+b') as f:
+            f.truncate(os.path.getsize(self.fs.journal_file) - 3)
+
+        fs = self._reload()
+        self.assertEqual(fs.list_dir('/'), ['a'])
+        self.assertEqual(os.path.getsize(fs.journal_file), good_size)
+        fs.mkdir('/c')
+        fs.save()
+        self.assertEqual(sorted(self._reload().list_dir('/')), ['a', 'c'])
+
+    def test_corrupt_record_stops_replay(self):
+        """Test a record failing its checksum ends the replay"""
+        self.fs.mkdir('/a')
+        self.fs.mkdir('/b')
+        self.fs.save()
+        with open(self.fs.journal_file, 'r+b') as f:
+            f.seek(-1, os.SEEK_END)
+            last = f.read(1)
+            f.seek(-1, os.SEEK_END)
+            f.write(bytes([last[0] ^ 0xFF]))
+        self.assertEqual(self._reload().list_dir('/'), ['a'])
+
+    def test_stale_journal_after_checkpoint_crash(self):
+        """Test records already in the checkpoint are skipped when the journal was not truncated"""
+        self.fs.mkdir('/a')
+        self.fs.create_file('/a/f', b'1')
+        self.fs.save()
+        with open(self.fs.journal_file, 'rb') as f:
+            stale = f.read()
+        self.fs.checkpoint()
+        # Crash between os.replace and the journal truncation
+        with open(self.fs.journal_file, 'wb') as f:
+            f.write(stale)
+
+        fs = self._reload()
+        self.assertEqual(fs.list_dir('/a'), ['f'])
+        fs.mkdir('/b')
+        fs.save()
+        self.assertEqual(sorted(self._reload().list_dir('/')), ['a', 'b'])
+
+    def test_encrypted_files_replay_exactly(self):
+        """Test encryption changes are journaled with their ciphertext and key"""
+        self.fs.create_file('/secret', b'plain')
+        self.fs.encrypt_file('/secret', 'pw')
+        self.fs.save()
+
+        fs = self._reload()
+        content, encrypted = fs.read_file('/secret', decrypt_if_able=False)
+        self.assertTrue(encrypted)
+        self.assertEqual(content, self.fs.read_file('/secret', decrypt_if_able=False)[0])
+        fs.decrypt_file('/secret', 'pw')
+        fs.save()
+        self.assertEqual(self._reload().read_file('/secret'), (b'plain', False))
+
+    def test_legacy_pickle_loads(self):
+        """Test a state file written before journaling is still readable"""
+        root = Directory('/')
+        root.entries['old.txt'] = File('old.txt', b'legacy')
+        with open(self.state, 'wb') as f:
+            pickle.dump(root, f)
+
+        fs = self._reload()
+        self.assertEqual(fs.read_file('/old.txt'), (b'legacy', False))
+        fs.mkdir('/new')
+        fs.save()
+        self.assertEqual(sorted(self._reload().list_dir('/')), ['new', 'old.txt'])
+
+
+
+class TestPasswordEncryption(_TempFSTestCase):
+
+    state_name = "fs.img"
+    fs_options = {'disk_image': True, 'kdf_cost': (4, 8, 1)}
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        super().setUp()
+        for name in ('a', 'b'):
+            self.fs.create_file(f'/{name}', name.encode() * 3)
+            self.fs.encrypt_file(f'/{name}', 'hunter2')
+        crypto._master_keys.clear()
+
+    def test_files_get_salted_distinct_keys(self):
+        """Test files share the KDF salt but not their keys"""
+        a, b = self.fs._file('/a'), self.fs._file('/b')
+        self.assertTrue(a.kdf.startswith('scrypt$4$8$1$'))
+        self.assertEqual(crypto.parse_kdf(a.kdf)[2], crypto.parse_kdf(b.kdf)[2])
+        self.assertNotEqual(a.key, b.key)
+        self.assertNotEqual(a.key, crypto.legacy_key('hunter2'))
+
+    def test_bulk_decrypt_runs_kdf_once(self):
+        """Test decrypting several files under one password derives one master key"""
+        self.fs.decrypt_file('/a', 'hunter2')
+        self.fs.decrypt_file('/b', 'hunter2')
+        self.assertEqual(len(crypto._master_keys), 1)
+        self.assertEqual(self.fs.read_file('/b'), (b'bbb', False))
+        self.assertIsNone(self.fs._file('/b').kdf)
+
+    def test_wrong_password_fails(self):
+        """Test a wrong password leaves the file encrypted"""
+        with self.assertRaises(ValueError):
+            self.fs.decrypt_file('/a', 'wrong')
+        self.assertTrue(self.fs._file('/a').encrypted)
+
+    def test_kdf_spec_survives_journal_and_image(self):
+        """Test the KDF spec is persisted with the file"""
+        self.fs.save()
+        fs = FileSystem(self.state, disk_image=True)
+        fs.load()
+        fs.decrypt_file('/a', 'hunter2')
+        fs.save()
+        fs.checkpoint()
+        fs._attach(None)
+
+        fs = FileSystem(self.state, disk_image=True)
+        fs.load()
+        self.assertEqual(fs.read_file('/a'), (b'aaa', False))
+        self.assertEqual(fs._file('/b').kdf, self.fs._file('/b').kdf)
+        fs.decrypt_file('/b', 'hunter2')
+        fs._attach(None)
+
+    def test_derived_keys_are_never_persisted(self):
+        """Test only the KDF spec reaches the journal, the image and pickle checkpoints"""
+        key = self.fs._file('/a').key
+        self.fs.save()
+        with open(self.fs.journal_file, 'rb') as f:
+            self.assertNotIn(key, f.read())
+        self.fs.checkpoint()
+        with open(self.state, 'rb') as f:
+            self.assertNotIn(key, f.read())
+        self.assertEqual(self.fs._file('/a').key, key)  # Still usable in this session
+        self.assertNotIn(key, pickle.dumps(self.fs._file('/a')))
+
+        fs = FileSystem(self.state, disk_image=True)
+        fs.load()
+        locked = fs._file('/a')
+        self.assertIsNone(locked.key)
+        self.assertEqual(fs.read_file('/a', decrypt_if_able=False), (locked.content, True))
+        with self.assertRaisesRegex(ValueError, 'locked'):
+            fs.read_file('/a')
+        with self.assertRaises(ValueError):
+            fs.pread('/a', 0, 1)
+        with self.assertRaises(ValueError):
+            fs.unlock_file('/a', 'wrong')
+        fs.unlock_file('/a', 'hunter2')
+        self.assertEqual(fs.pread('/a', 0, 3), b'aaa')
+        self.assertEqual(fs.read_file('/a'), (b'aaa', True))
+        fs._attach(None)
+
+    def test_kdf_spec_length_is_checked_up_front(self):
+        """Test specs too long for a disk image inode are refused when created"""
+        with self.assertRaises(ValueError):
+            crypto.new_kdf('pbkdf2', (10 ** 30,))
+        fs = FileSystem(os.path.join(self.tmpdir.name, "big.img"), disk_image=True, kdf='pbkdf2',
+                        kdf_cost=(10 ** 30,))
+        fs.create_file('/x', b'x')
+        with self.assertRaises(ValueError):
+            fs.encrypt_file('/x', 'pw')
+        self.assertFalse(fs._file('/x').encrypted)
+
+    def test_legacy_password_files_still_decrypt(self):
+        """Test files keyed with the old unsalted SHA-256 derivation"""
+        key = crypto.legacy_key('old')
+        legacy = File('legacy', Fernet(key).encrypt(b'from before'), encrypted=True, key=key)
+        self.fs.root.entries['legacy'] = legacy
+        self.fs.decrypt_file('/legacy', 'old')
+        self.assertEqual(self.fs.read_file('/legacy'), (b'from before', False))
+
+
+class TestDeduplication(_TempFSTestCase):
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        super().setUp()
+        self.template = random.Random(3).randbytes(256000)
+        self.fs.mkdir('/t')
+        for i in range(20):
+            self.fs.create_file(f'/t/copy{i}', self.template)
+
+    def test_duplicate_writes_share_blocks(self):
+        """Test identical files are stored once"""
+        stats = self.fs.store.stats()
+        self.assertEqual(stats['stored_bytes'], len(self.template))
+        self.assertAlmostEqual(stats['dedup_ratio'], 20.0)
+        self.assertEqual(self.fs.read_file('/t/copy7')[0], self.template)
+
+    def test_copy_is_metadata_only_and_copy_on_write(self):
+        """Test copies share blocks until one of them is modified"""
+        self.fs.copy_file('/t/copy0', '/t/clone')
+        original, clone = self.fs._file('/t/copy0'), self.fs._file('/t/clone')
+        self.assertIs(original._blocks[1], clone._blocks[1])
+        self.assertEqual(self.fs.store.refcount(clone._blocks[1][0]), 21)
+
+        self.fs.pwrite('/t/clone', 0, b'changed')
+        self.assertEqual(self.fs.read_file('/t/copy0')[0], self.template)
+        self.assertEqual(self.fs.pread('/t/clone', 0, 9), b'changed' + self.template[7:9])
+        self.assertEqual(self.fs.store.refcount(original._blocks[1][0]), 20)
+        with self.assertRaises(FileExistsError):
+            self.fs.copy_file('/t/copy0', '/t/copy1')
+
+    def test_delete_and_overwrite_release_blocks(self):
+        """Test refcounts drop when files go away or get new content"""
+        for i in range(19):
+            self.fs.delete_file(f'/t/copy{i}')
+        self.assertEqual(self.fs.store.stats()['logical_bytes'], len(self.template))
+        self.fs.write_file('/t/copy19', b'small')
+        self.assertEqual(self.fs.store.stats()['stored_bytes'], 5)
+
+    def test_checkpoint_and_journal_keep_sharing(self):
+        """Test pickle checkpoints store shared blocks once and replayed copies share too"""
+        self.fs.save()
+        self.fs.checkpoint()
+        self.assertLess(os.path.getsize(self.fs.state_file), 2 * len(self.template))
+        self.fs.copy_file('/t/copy0', '/t/clone')
+        self.fs.save()
+
+        fs = FileSystem(self.fs.state_file)
+        fs.load()
+        self.assertEqual(fs.store.stats()['stored_bytes'], len(self.template))
+        self.assertEqual(fs.read_file('/t/clone')[0], self.template)
+        self.assertIs(fs._file('/t/clone')._blocks[0], fs.store)
+        self.assertEqual(fs.store.refcount(fs._file('/t/clone')._blocks[1][0]), 21)
+
+
+class TestDentryCache(_TempFSTestCase):
+
+    fs_options = {'dentry_cache_size': 4}
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        super().setUp()
+        for path in ('/a', '/a/b', '/a/b/c', '/x'):
+            self.fs.mkdir(path)
+        self.fs.create_file('/a/b/c/f.txt', b'data')
+
+    def test_resolve_caches_every_ancestor(self):
+        """Test a lookup caches the directories along the path and normalizes slashes"""
+        self.fs._dentries.clear()
+        parent, name = self.fs._resolve('/a//b/c/f.txt/')
+        self.assertEqual(name, 'f.txt')
+        self.assertIs(parent, self.fs.root.entries['a'].entries['b'].entries['c'])
+        self.assertEqual(list(self.fs._dentries), ['a', 'a/b', 'a/b/c'])
+        self.assertEqual(self.fs.read_file('/a/b/c/f.txt')[0], b'data')
+
+    def test_lru_eviction(self):
+        """Test the least recently used entry is evicted at capacity"""
+        self.fs._dentries.clear()
+        self.fs._resolve('/a/b/c/f.txt')
+        self.fs._resolve('/a/file')
+        self.fs._resolve('/x/file')
+        self.assertEqual(list(self.fs._dentries), ['a/b', 'a/b/c', 'a', 'x'])
+        self.fs.mkdir('/x/y')
+        self.fs._resolve('/x/y/file')
+        self.assertEqual(len(self.fs._dentries), 4)
+        self.assertNotIn('a/b', self.fs._dentries)
+
+    def test_rmdir_and_mkdir_invalidate(self):
+        """Test a removed and recreated directory is not served stale"""
+        self.fs._resolve('/x/new')
+        self.fs.rmdir('/x')
+        self.assertNotIn('x', self.fs._dentries)
+        with self.assertRaises(FileNotFoundError):
+            self.fs.create_file('/x/new')
+        self.fs.mkdir('/x')
+        self.fs.create_file('/x/new')
+        self.assertEqual(self.fs.list_dir('/x'), ['new'])
+
+    def test_rename_invalidates_subtree(self):
+        """Test renaming a directory drops the cached paths below it"""
+        self.fs._resolve('/a/b/c/f.txt')
+        self.fs.rename('/a/b', '/x/moved')
+        self.assertFalse(any(key.startswith('a/b') for key in self.fs._dentries))
+        with self.assertRaises(FileNotFoundError):
+            self.fs.read_file('/a/b/c/f.txt')
+        self.assertEqual(self.fs.read_file('/x/moved/c/f.txt')[0], b'data')
+        with self.assertRaises(ValueError):
+            self.fs.rename('/x', '/x/moved/c/inside')
+        with self.assertRaises(FileExistsError):
+            self.fs.rename('/a', '/x')
+
+    def test_rename_is_journaled(self):
+        """Test renames survive a restart"""
+        self.fs.rename('/a/b/c/f.txt', '/x/g.txt')
+        self.fs.save()
+        fs = FileSystem(self.fs.state_file)
+        fs.load()
+        self.assertEqual(fs.read_file('/x/g.txt')[0], b'data')
+        self.assertEqual(fs.list_dir('/a/b/c'), [])
+
+
+class TestFileHandles(_TempFSTestCase):
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        super().setUp()
+        self.fs.create_file('/log.txt', b'0123456789')
+
+    def test_read_seek_tell(self):
+        """Test sequential reads follow the position and seek supports every whence"""
+        with self.fs.open('/log.txt') as f:
+            self.assertEqual(f.read(4), b'0123')
+            self.assertEqual(f.tell(), 4)
+            self.assertEqual(f.seek(-2, os.SEEK_END), 8)
+            self.assertEqual(f.read(), b'89')
+            self.assertEqual(f.read(5), b'')
+            f.seek(1)
+            f.seek(2, os.SEEK_CUR)
+            self.assertEqual(f.read(2), b'34')
+            self.assertEqual(f.pread(7, 100), b'789')
+            self.assertEqual(f.tell(), 5)
+            with self.assertRaises(io.UnsupportedOperation):
+                f.write(b'x')
+        with self.assertRaises(ValueError):
+            f.read()
+
+    def test_write_pwrite_and_holes(self):
+        """Test overwrites in place and zero-filled writes past the end"""
+        with self.fs.open('/log.txt', 'r+') as f:
+            f.seek(2)
+            f.write(b'ab')
+            f.pwrite(12, b'Z')
+            self.assertEqual(f.tell(), 4)
+        self.assertEqual(self.fs.read_file('/log.txt')[0], b'01ab456789\0\0Z')
+
+        with self.fs.open('/log.txt', 'w') as f:
+            f.write(b'new')
+        self.assertEqual(self.fs.read_file('/log.txt')[0], b'new')
+
+    def test_append_mode_creates_and_appends(self):
+        """Test 'a' creates missing files and always writes at the end"""
+        with self.fs.open('/new.log', 'a') as f:
+            f.write(b'one\n')
+            f.seek(0)
+            f.write(b'two\n')
+        self.fs.append('/new.log', b'three\n')
+        self.assertEqual(self.fs.read_file('/new.log')[0], b'one\ntwo\nthree\n')
+
+    def test_chunked_storage_spans_chunks(self):
+        """Test writes and reads crossing chunk boundaries, and truncation"""
+        data = bytes(range(256)) * (CHUNK_SIZE // 128)
+        self.fs.append('/log.txt', data)
+        file_obj = self.fs._file('/log.txt')
+        self.assertEqual(file_obj.size, 10 + len(data))
+        self.assertTrue(all(len(chunk) == CHUNK_SIZE for chunk in file_obj._chunks[:-1]))
+
+        self.fs.pwrite('/log.txt', CHUNK_SIZE - 2, b'XXXX')
+        expected = bytearray(b'0123456789' + data)
+        expected[CHUNK_SIZE - 2:CHUNK_SIZE + 2] = b'XXXX'
+        self.assertEqual(self.fs.pread('/log.txt', CHUNK_SIZE - 4, 8), bytes(expected[CHUNK_SIZE - 4:CHUNK_SIZE + 4]))
+
+        self.fs.truncate('/log.txt', CHUNK_SIZE)
+        self.assertEqual(len(file_obj._chunks), 1)
+        self.assertEqual(self.fs.read_file('/log.txt')[0], bytes(expected[:CHUNK_SIZE]))
+
+    def test_append_does_not_copy_the_file(self):
+        """Test appending to a large file only touches the last chunk"""
+        self.fs.append('/log.txt', bytes(CHUNK_SIZE * 20))
+        file_obj = self.fs._file('/log.txt')
+        first_chunks = file_obj._chunks[:-1]
+        for _ in range(100):
+            self.fs.append('/log.txt', b'line\n')
+        self.assertTrue(all(a is b for a, b in zip(first_chunks, file_obj._chunks)))
+        self.assertEqual(self.fs.pread('/log.txt', file_obj.size - 5, 5), b'line\n')
+
+    def test_offset_writes_are_journaled(self):
+        """Test pwrite/truncate replay and their records stay small"""
+        self.fs.append('/log.txt', bytes(CHUNK_SIZE * 4))
+        self.fs.save()
+        before = os.path.getsize(self.fs.journal_file)
+        self.fs.append('/log.txt', b'tail')
+        self.fs.truncate('/log.txt', 14)
+        self.fs.pwrite('/log.txt', 0, b'AB')
+        self.fs.save()
+        self.assertLess(os.path.getsize(self.fs.journal_file) - before, 400)
+
+        fs = FileSystem(self.fs.state_file)
+        fs.load()
+        self.assertEqual(fs.read_file('/log.txt')[0], b'AB23456789\0\0\0\0')
+
+    def test_encrypted_file_offsets_address_plaintext(self):
+        """Test offset I/O on an encrypted file works on the decrypted bytes"""
+        self.fs.encrypt_file('/log.txt')
+        with self.fs.open('/log.txt', 'a') as f:
+            f.write(b'AB')
+        self.assertEqual(self.fs.pread('/log.txt', 8, 4), b'89AB')
+        self.assertEqual(self.fs.read_file('/log.txt'), (b'0123456789AB', True))
+
+    def test_encrypted_append_patches_ciphertext(self):
+        """Test appends to a large encrypted file journal only re-encrypted chunks"""
+        self.fs.append('/log.txt', bytes(CHUNK_SIZE * 8))
+        self.fs.encrypt_file('/log.txt')
+        self.fs.save()
+        before = os.path.getsize(self.fs.journal_file)
+        self.fs.append('/log.txt', b'secret line\n')
+        self.fs.save()
+        self.assertLess(os.path.getsize(self.fs.journal_file) - before, 200 * 1024)
+        with open(self.fs.journal_file, 'rb') as f:
+            self.assertNotIn(b'secret line', f.read())
+
+        fs = FileSystem(self.fs.state_file)
+        fs.load()
+        self.assertEqual(fs.pread('/log.txt', 10 + CHUNK_SIZE * 8, 100), b'secret line\n')
+        fs.truncate('/log.txt', 5)
+        self.assertEqual(fs.read_file('/log.txt'), (b'01234', True))
+
+
+class TestDiskImage(_TempFSTestCase):
+
+    state_name = "fs.img"
+    fs_options = {'disk_image': True}
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        super().setUp()
+        self.fs.mkdir('/docs')
+        self.fs.mkdir('/docs/deep')
+        self.fs.create_file('/docs/big.bin', bytes(range(256)) * 100)
+        self.fs.create_file('/docs/deep/empty')
+        self.fs.create_file('/secret', b'plain')
+        self.fs.encrypt_file('/secret')
+        self.fs.save()
+        self.fs.checkpoint()
+
+    def test_image_layout(self):
+        """Test the image is block aligned with a fully used, packed bitmap"""
+        self.assertTrue(is_image(self.state))
+        with DiskImage(self.state) as disk:
+            self.assertEqual(os.path.getsize(self.state), disk.total_blocks * disk.block_size)
+            self.assertEqual(disk.free_blocks(), 0)
+            self.assertEqual(sorted(disk.listdir(ROOT_INODE)), ['docs', 'secret'])
+            mode, encrypted, size, _, key, kdf = disk.inode(disk.listdir(ROOT_INODE)['secret'])
+            self.assertEqual((mode, encrypted, kdf), (MODE_FILE, True, None))
+            self.assertEqual(key, self.fs._file('/secret').key)
+
+    def test_load_is_lazy_and_zero_copy(self):
+        """Test loading reads metadata only and views come straight from the mapping"""
+        fs = FileSystem(self.state, disk_image=True)
+        fs.load()
+        big = fs._file('/docs/big.bin')
+        self.assertIsNone(big._content)
+        self.assertEqual(big.size, 25600)
+
+        self.assertEqual(fs.pread('/docs/big.bin', 1, 2), bytes([1, 2]))
+        view = big.view()
+        self.assertIsInstance(view.obj, mmap.mmap)
+        self.assertEqual(view[:3].tobytes(), bytes([0, 1, 2]))
+        self.assertIsNone(big._content)
+        view.release()
+
+        self.assertEqual(fs.read_file('/docs/big.bin')[0], bytes(range(256)) * 100)
+        self.assertIsNotNone(big._content)
+        self.assertEqual(fs.read_file('/secret'), (b'plain', True))
+        self.assertEqual(fs.list_dir('/docs/deep'), ['empty'])
+        fs._attach(None)
+
+    def test_journal_on_top_of_image(self):
+        """Test journaled changes replay over the image checkpoint"""
+        fs = FileSystem(self.state, disk_image=True)
+        fs.load()
+        fs.write_file('/docs/deep/empty', b'filled')
+        fs.delete_file('/secret')
+        fs.save()
+        fs._attach(None)
+
+        loaded = FileSystem(self.state, disk_image=True)
+        loaded.load()
+        self.assertEqual(loaded.read_file('/docs/deep/empty')[0], b'filled')
+        self.assertEqual(loaded.list_dir('/'), ['docs'])
+        self.assertEqual(len(loaded.read_file('/docs/big.bin')[0]), 25600)
+        loaded._attach(None)
+
+    def test_checkpoint_rebinds_files_to_new_image(self):
+        """Test a checkpoint releases in-memory content and keeps files readable"""
+        big = self.fs._file('/docs/big.bin')
+        self.assertIsNone(big._content)
+        self.assertEqual(big.read()[:2], bytes([0, 1]))
+
+    def test_checkpoint_unmaps_the_image_it_replaces(self):
+        """Test the old image is closed before being replaced and snapshots and clones stay readable"""
+        old = self.fs._disk
+        self.fs.snapshot('before')
+        clone = self.fs.clone()
+        self.fs.delete_file('/docs/big.bin')
+        self.fs.write_file('/docs/deep/empty', b'new')
+        self.fs.save()
+        self.fs.checkpoint()
+
+        self.assertTrue(old._mmap.closed)
+        view = self.fs.open_snapshot('before')
+        self.assertEqual(view.read_file('/docs/big.bin')[0], bytes(range(256)) * 100)
+        self.assertEqual(view.read_file('/docs/deep/empty')[0], b'')
+        self.assertEqual(clone.read_file('/secret'), (b'plain', True))
+        self.assertEqual(self.fs.read_file('/docs/deep/empty')[0], b'new')
+
+        newer = self.fs._disk
+        self.fs.load()  # Clones made before a reload stop reading from the image too
+        self.assertTrue(newer._mmap.closed)
+        self.assertEqual(clone.read_file('/docs/big.bin')[0], bytes(range(256)) * 100)
+
+    def test_write_image_and_rejects_other_files(self):
+        """Test images can be written from any tree and other files are rejected"""
+        root = Directory('/')
+        root.entries['a'] = File('a', b'x' * 5000)
+        path = os.path.join(self.tmpdir.name, "small.img")
+        inodes = write_image(path, root, seq=7, block_size=512)
+        self.assertEqual([ino for _, ino in inodes], [1, 2])
+        with DiskImage(path) as disk:
+            self.assertEqual((disk.seq, disk.block_size), (7, 512))
+            self.assertEqual(disk.view(2).tobytes(), b'x' * 5000)
+
+        fetched = []
+        streamed = os.path.join(self.tmpdir.name, "streamed.img")
+
+        class Watched(File):
+            def view(self):
+                fetched.append((self.name, os.path.exists(streamed)))
+                return super().view()
+
+        for name in ('b', 'c'):
+            root.entries[name] = Watched(name, name.encode() * 700)
+        write_image(streamed, root)
+        self.assertEqual(fetched, [('b', True), ('c', True)])  # Once each, only while writing
+
+        with open(path, 'wb') as f:
+            f.write(b'not an image, just some bytes ' * 4)
+        with self.assertRaises(ValueError):
+            DiskImage(path)
+
+
+class TestSnapshots(_TempFSTestCase):
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        super().setUp()
+        self.fs.mkdir('/docs')
+        self.fs.mkdir('/docs/deep')
+        self.fs.mkdir('/other')
+        self.fs.create_file('/docs/deep/a.txt', b'version 1')
+        self.fs.create_file('/other/b.txt', b'untouched')
+
+    def test_snapshots_are_not_persisted(self):
+        """Test snapshots stay in memory: a checkpoint and reload do not bring them back"""
+        self.fs.snapshot('s1')
+        self.fs.save()
+        self.fs.checkpoint()
+        fs = FileSystem(self.state)
+        fs.load()
+        self.assertEqual(fs.snapshots(), [])
+        self.assertEqual(fs.read_file('/other/b.txt')[0], b'untouched')
+
+    def test_snapshot_is_unaffected_by_later_changes(self):
+        """Test a snapshot keeps the tree as it was and shares untouched subtrees"""
+        self.fs.snapshot('s1')
+        old_root = self.fs.root
+        self.fs.write_file('/docs/deep/a.txt', b'version 2')
+        self.fs.pwrite('/docs/deep/a.txt', 0, b'V')
+        self.fs.create_file('/docs/new.txt', b'new')
+        self.fs.rename('/other/b.txt', '/b.txt')
+
+        view = self.fs.open_snapshot('s1')
+        self.assertEqual(view.read_file('/docs/deep/a.txt')[0], b'version 1')
+        self.assertEqual(view.list_dir('/docs'), ['deep'])
+        self.assertEqual(view.list_dir('/other'), ['b.txt'])
+        self.assertEqual(self.fs.read_file('/docs/deep/a.txt')[0], b'Version 2')
+        self.assertEqual(sorted(self.fs.list_dir('/')), ['b.txt', 'docs', 'other'])
+        # Only the changed paths were copied
+        self.assertIsNot(self.fs.root, old_root)
+        self.assertIsNot(self.fs.root.entries['docs'], old_root.entries['docs'])
+        self.fs.rmdir('/other')
+        self.assertIn('other', view.list_dir('/'))
+
+    def test_snapshot_view_is_read_only(self):
+        """Test every change to an opened snapshot is refused"""
+        self.fs.snapshot('s1')
+        view = self.fs.open_snapshot('s1')
+        for change in (lambda: view.write_file('/docs/deep/a.txt', b'x'), lambda: view.mkdir('/new'),
+                       lambda: view.delete_file('/other/b.txt'), lambda: view.pwrite('/other/b.txt', 0, b'x'),
+                       lambda: view.open('/fresh', 'w'), lambda: view.rollback('s1')):
+            with self.assertRaises(PermissionError):
+                change()
+        with self.assertRaises(FileExistsError):
+            self.fs.snapshot('s1')
+        with self.assertRaises(FileNotFoundError):
+            self.fs.open_snapshot('missing')
+
+    def test_rollback_restores_and_persists(self):
+        """Test rollback brings a snapshot back and survives a reload"""
+        self.fs.snapshot('s1')
+        self.fs.delete_file('/docs/deep/a.txt')
+        self.fs.create_file('/later.txt', b'later')
+        self.fs.save()
+        self.fs.rollback('s1')
+        self.assertEqual(self.fs.read_file('/docs/deep/a.txt')[0], b'version 1')
+        self.assertNotIn('later.txt', self.fs.list_dir('/'))
+        # The snapshot stays intact when the restored tree is changed again
+        self.fs.write_file('/docs/deep/a.txt', b'version 3')
+        self.assertEqual(self.fs.open_snapshot('s1').read_file('/docs/deep/a.txt')[0], b'version 1')
+
+        fs = FileSystem(self.fs.state_file)
+        fs.load()
+        self.assertEqual(fs.read_file('/docs/deep/a.txt')[0], b'version 1')
+        self.assertNotIn('later.txt', fs.list_dir('/'))
+
+    def test_clone_is_independent_and_never_persisted(self):
+        """Test clones and the original diverge without seeing each other's changes"""
+        clone = self.fs.clone()
+        clone.write_file('/docs/deep/a.txt', b'clone')
+        clone.create_file('/clone.txt')
+        clone.save()
+        clone.checkpoint()
+        self.fs.write_file('/other/b.txt', b'original')
+        self.assertEqual(self.fs.read_file('/docs/deep/a.txt')[0], b'version 1')
+        self.assertNotIn('clone.txt', self.fs.list_dir('/'))
+        self.assertEqual(clone.read_file('/other/b.txt')[0], b'untouched')
+        self.assertEqual(os.listdir(self.tmpdir.name), [])
+
+    def test_shared_blocks_are_freed_once_unreferenced(self):
+        """Test blocks kept alive by a snapshot are reclaimed when it is deleted"""
+        self.fs.create_file('/big', random.Random(5).randbytes(200000))
+        self.fs.snapshot('s1')
+        self.fs.delete_file('/big')
+        self.assertGreater(self.fs.store.stats()['stored_bytes'], 200000)
+        self.fs.delete_snapshot('s1')
+        self.assertLess(self.fs.store.stats()['stored_bytes'], 100)
+        self.assertEqual(self.fs.read_file('/other/b.txt')[0], b'untouched')
+        self.assertEqual(self.fs.snapshots(), [])
+
+    def test_checkpoint_leaves_out_unreferenced_blocks(self):
+        """Test blocks only a dropped clone used are not written into the checkpoint"""
+        clone = self.fs.clone()
+        clone.create_file('/scratch', random.Random(6).randbytes(200000))
+        del clone
+        self.fs.checkpoint()
+        self.assertLess(os.path.getsize(self.fs.state_file), 100000)
+        self.assertLess(self.fs.store.stats()['stored_bytes'], 100)
+
+
+class TestRecursiveOperations(_TempFSTestCase):
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        super().setUp()
+        for path in ('/src', '/src/sub', '/src/sub/deep', '/dst'):
+            self.fs.mkdir(path)
+        self.fs.create_file('/src/a.txt', b'a' * 10)
+        self.fs.create_file('/src/sub/b.py', b'b' * 200)
+        self.fs.create_file('/src/sub/deep/c.txt', b'c' * 3000)
+
+    def test_walk_is_top_down_and_prunable(self):
+        """Test walk yields every directory once, parents first, and honours pruning"""
+        walked = list(self.fs.walk('/src'))
+        self.assertEqual([entry[0] for entry in walked], ['/src', '/src/sub', '/src/sub/deep'])
+        self.assertEqual(walked[0], ('/src', ['sub'], ['a.txt']))
+        pruned = []
+        for dirpath, dirnames, _ in self.fs.walk('/'):
+            pruned.append(dirpath)
+            if 'sub' in dirnames:
+                dirnames.remove('sub')
+        self.assertEqual(pruned, ['/', '/src', '/dst'])
+
+    def test_copy_tree_shares_content(self):
+        """Test a recursive copy duplicates the tree but not the file blocks"""
+        stored = self.fs.store.stats()['stored_bytes']
+        self.fs.copy('/src', '/dst/copy')
+        self.assertEqual(self.fs.read_file('/dst/copy/sub/deep/c.txt')[0], b'c' * 3000)
+        self.assertEqual(self.fs.store.stats()['stored_bytes'], stored)
+        self.fs.write_file('/dst/copy/a.txt', b'changed')
+        self.assertEqual(self.fs.read_file('/src/a.txt')[0], b'a' * 10)
+        with self.assertRaises(ValueError):
+            self.fs.copy('/src', '/src/sub/again')
+        with self.assertRaises(FileExistsError):
+            self.fs.copy('/src', '/dst/copy')
+
+    def test_remove_tree_releases_blocks_and_replays(self):
+        """Test rm -r frees the subtree's blocks and the journal redoes copy and remove"""
+        self.fs.copy('/src', '/dst/copy')
+        self.fs.remove('/src')
+        self.assertEqual(self.fs.list_dir('/'), ['dst'])
+        self.assertEqual(self.fs.store.stats()['logical_bytes'], 3210)
+        self.fs.remove('/dst/copy/sub')
+        self.assertEqual(self.fs.store.stats()['stored_bytes'], 10)
+        with self.assertRaises(FileNotFoundError):
+            self.fs._resolve('/dst/copy/sub/deep/c.txt')
+        with self.assertRaises(ValueError):
+            self.fs.remove('/')
+        self.fs.save()
+
+        fs = FileSystem(self.fs.state_file)
+        fs.load()
+        self.assertEqual(list(fs.walk('/')), [('/', ['dst'], []), ('/dst', ['copy'], []),
+                                              ('/dst/copy', [], ['a.txt'])])
+        self.assertEqual(fs.store.stats()['stored_bytes'], 10)
+
+    def test_du_uses_cached_aggregates(self):
+        """Test du totals stay correct as files change and reuse unchanged subtrees"""
+        self.assertEqual(self.fs.du('/'), (3210, 3))
+        self.assertEqual(self.fs.du('/src/sub/b.py'), (200, 1))
+        deep = self.fs._dir('/src/sub/deep')
+        self.assertEqual(deep._usage, (3000, 1, 3000))
+        self.fs.append('/src/a.txt', b'x' * 5)
+        self.assertIsNone(self.fs.root._usage)
+        self.assertIsNotNone(deep._usage)
+        self.assertEqual(self.fs.du('/src'), (3215, 3))
+        self.fs.rename('/src/sub', '/dst/sub')
+        self.assertEqual((self.fs.du('/src'), self.fs.du('/dst')), ((15, 1), (3200, 2)))
+
+    def test_find_filters_and_prunes_by_size(self):
+        """Test find matches names, types and sizes"""
+        self.assertEqual(list(self.fs.find('/', name='*.txt')), ['/src/a.txt', '/src/sub/deep/c.txt'])
+        self.assertEqual(list(self.fs.find('/src', kind='d')), ['/src/sub', '/src/sub/deep'])
+        self.assertEqual(list(self.fs.find('/', min_size=100, max_size=1000)), ['/src/sub/b.py'])
+        self.fs.create_file('/dst/huge', bytes(5000))
+        self.assertEqual(list(self.fs.find('/', min_size=4000)), ['/dst/huge'])
+        self.fs._dir('/dst')._usage = (0, 0, 0)  # Pruning trusts the aggregate and never enters /dst
+        self.assertEqual(list(self.fs.find('/', min_size=4000)), [])
+
+
+class TestSearch(_TempFSTestCase):
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        super().setUp()
+        for path in ('/docs', '/docs/old', '/src'):
+            self.fs.mkdir(path)
+        self.fs.create_file('/docs/report.txt', b'r' * 100)
+        self.fs.create_file('/docs/old/report_2019.txt', b'o' * 10)
+        self.fs.create_file('/src/main.py', b'print()')
+
+    def test_search_filters(self):
+        """Test searches by name, extension, type, size and subtree"""
+        self.assertEqual(self.fs.search(name='report'), ['/docs/old/report_2019.txt', '/docs/report.txt'])
+        self.assertEqual(self.fs.search(name='*.py'), ['/src/main.py'])
+        self.assertEqual(self.fs.search(ext='txt', min_size=50), ['/docs/report.txt'])
+        self.assertEqual(self.fs.search(kind='d'), ['/docs', '/docs/old', '/src'])
+        self.assertEqual(self.fs.search(name='report', path='/docs/old'), ['/docs/old/report_2019.txt'])
+
+    def test_index_follows_changes(self):
+        """Test the index is updated by writes, moves, copies and removals"""
+        self.fs.search()
+        self.fs.append('/src/main.py', b'x' * 500)
+        self.fs.rename('/docs', '/archive')
+        self.fs.copy('/src', '/src_copy')
+        self.fs.create_file('/notes.md')
+        self.fs.remove('/archive/old')
+        self.assertEqual(self.fs.search(min_size=500), ['/src/main.py', '/src_copy/main.py'])
+        self.assertEqual(self.fs.search(name='report'), ['/archive/report.txt'])
+        self.assertEqual(self.fs.search(ext='md'), ['/notes.md'])
+        self.assertEqual(self.fs.search(kind='d'), ['/archive', '/src', '/src_copy'])
+        self.assertEqual(self.fs.search(name='report'), list(self.fs.find('/', name='*report*')))
+
+    def test_index_is_rebuilt_after_rollback_and_load(self):
+        """Test searches see the restored tree after a rollback or reload"""
+        self.fs.snapshot('s1')
+        self.fs.delete_file('/docs/report.txt')
+        self.assertEqual(self.fs.search(name='report.txt'), [])
+        self.fs.rollback('s1')
+        self.assertEqual(self.fs.search(name='report.txt'), ['/docs/report.txt'])
+
+        fs = FileSystem(self.fs.state_file)
+        fs.load()
+        self.assertEqual(fs.search(ext='py'), ['/src/main.py'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+import random
+import unittest
+from os_core.metrics import StreamingHistogram, MetricsCollector
+from os_core.simulation import SchedulerSimulation
+from os_core.scheduler import FIFOScheduler, RoundRobinScheduler
+from os_core.smp import SMPSimulation
+from os_core.process import PCB
+
+
+class TestStreamingHistogram(unittest.TestCase):
+
+    def test_small_values_are_exact(self):
+        """Test values below 2**significant_bits are counted exactly"""
+        histogram = StreamingHistogram()
+        for value in range(1, 101):
+            histogram.record(value)
+
+        self.assertEqual(histogram.percentile(50), 50)
+        self.assertEqual(histogram.percentile(99), 99)
+        self.assertEqual(histogram.percentile(100), 100)
+        self.assertEqual(histogram.mean(), 50.5)
+        self.assertEqual((histogram.min, histogram.max), (1, 100))
+
+    def test_relative_error_is_bounded(self):
+        """Test large-value percentiles stay within the bucket precision"""
+        rng = random.Random(7)
+        values = sorted(int(rng.paretovariate(1.2) * 1000) for _ in range(20000))
+        histogram = StreamingHistogram(significant_bits=7)
+        for value in values:
+            histogram.record(value)
+
+        for p in (50, 95, 99):
+            exact = values[-(-p * len(values) // 100) - 1]
+            self.assertLessEqual(abs(histogram.percentile(p) - exact), exact / 64)
+        self.assertLess(len(histogram.counts), 2000)
+
+    def test_merge(self):
+        """Test merging two histograms equals recording into one"""
+        a, b, both = StreamingHistogram(), StreamingHistogram(), StreamingHistogram()
+        for value in range(0, 1000, 3):
+            a.record(value)
+            both.record(value)
+        for value in range(5, 5000, 7):
+            b.record(value)
+            both.record(value)
+        a.merge(b)
+
+        self.assertEqual(a.counts, both.counts)
+        self.assertEqual(a.percentile(95), both.percentile(95))
+        with self.assertRaises(ValueError):
+            a.merge(StreamingHistogram(significant_bits=4))
+
+    def test_rejects_negative_values(self):
+        """Test negative samples are refused"""
+        with self.assertRaises(ValueError):
+            StreamingHistogram().record(-1)
+
+
+class TestMetricsCollector(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        PCB.reset_pid_counter()
+
+    def test_matches_simulation_results(self):
+        """Test the collector agrees with the per-process simulation metrics"""
+        collector = MetricsCollector()
+        sim = SchedulerSimulation(RoundRobinScheduler(time_quantum=2), observers=[collector])
+        result = sim.run([("A", 3, 0), ("B", 3, 0), ("C", 2, 10)])
+        summary = collector.summary()
+
+        self.assertEqual(summary['completed'], 3)
+        self.assertEqual(summary['arrivals'], 3)
+        self.assertEqual(summary['turnaround']['mean'], result['averages']['turnaround'])
+        self.assertEqual(summary['waiting']['mean'], result['averages']['waiting'])
+        self.assertEqual(summary['response']['max'], 2)
+        self.assertEqual(collector.busy_time, result['busy_time'])
+        self.assertEqual(summary['cpu_utilization'], 8 / 12)
+        self.assertEqual(summary['throughput'], 3 / 12)
+
+    def test_context_switches(self):
+        """Test only dispatches of a different process count as switches"""
+        collector = MetricsCollector()
+        sim = SchedulerSimulation(RoundRobinScheduler(time_quantum=2), observers=[collector])
+        sim.run([("A", 3, 0), ("B", 3, 0)])
+        self.assertEqual(collector.dispatches, 4)
+        self.assertEqual(collector.context_switches, 3)
+
+        collector = MetricsCollector()
+        sim = SchedulerSimulation(RoundRobinScheduler(time_quantum=2), observers=[collector])
+        sim.run([("A", 6, 0)])
+        self.assertEqual((collector.dispatches, collector.context_switches), (3, 0))
+
+    def test_dispatch_overhead_is_not_busy_time(self):
+        """Test context switch ticks count toward elapsed time but not utilization"""
+        collector = MetricsCollector()
+        sim = SchedulerSimulation(RoundRobinScheduler(time_quantum=2), observers=[collector],
+                                  context_switch_cost=3)
+        result = sim.run([("A", 10, 0), ("B", 10, 0), ("C", 10, 0)])
+        self.assertGreater(result['overhead_time'], 0)
+        self.assertEqual(collector.busy_time, 30)
+        self.assertEqual(collector.busy_time, result['busy_time'])
+        summary = collector.summary()
+        self.assertEqual(summary['elapsed'], 30 + result['overhead_time'])
+        self.assertAlmostEqual(summary['cpu_utilization'], 30 / summary['elapsed'])
+
+    def test_io_events(self):
+        """Test blocked time counts neither as CPU time nor as waiting"""
+        events = []
+
+        class Recorder:
+            def on_event(self, event, time, pcb):
+                events.append((event, time, pcb.name))
+
+        collector = MetricsCollector()
+        sim = SchedulerSimulation(FIFOScheduler(), observers=[collector, Recorder()])
+        sim.run([("A", 0, 0, 0, (1, 2, 1))])
+
+        self.assertEqual(events, [('arrive', 0, 'A'), ('dispatch', 0, 'A'), ('block', 1, 'A'),
+                                  ('wakeup', 3, 'A'), ('dispatch', 3, 'A'), ('exit', 4, 'A')])
+        self.assertEqual(collector.busy_time, 2)
+        self.assertEqual(collector.summary()['waiting']['max'], 0)
+
+    def test_streaming_run_keeps_nothing(self):
+        """Test a long run with keep_finished=False retains no per-process data"""
+        collector = MetricsCollector()
+        sim = SchedulerSimulation(FIFOScheduler(), observers=[collector], keep_finished=False, record_timeline=False)
+        sim.run((f"P{i}", 1, i) for i in range(5000))
+
+        self.assertEqual(sim.processes, {})
+        self.assertEqual(sim.timeline, [])
+        self.assertEqual(collector.completed, 5000)
+        self.assertEqual(collector.summary()['turnaround']['p99'], 1)
+
+    def test_smp_utilization(self):
+        """Test utilization is normalised by the number of CPUs"""
+        collector = MetricsCollector(num_cpus=2)
+        smp = SMPSimulation(FIFOScheduler, num_cpus=2, observers=[collector])
+        smp.run([("A", 4, 0), ("B", 4, 0)])
+
+        self.assertEqual(collector.completed, 2)
+        self.assertEqual(collector.context_switches, 0)
+        self.assertEqual(collector.summary()['cpu_utilization'], 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
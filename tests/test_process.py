@@ -0,0 +1,123 @@
+import threading
+import unittest
+from os_core.process import PCB, PidAllocator
+from os_core.simulation import SchedulerSimulation
+from os_core.scheduler import FIFOScheduler
+
+
+class TestPCB(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        PCB.reset_pid_counter()
+
+    def test_containers_are_created_lazily(self):
+        """Test page_table, registers and open_files only exist once used"""
+        pcb = PCB("P", 0, 4096)
+        self.assertIsNone(pcb._page_table)
+        self.assertIsNone(pcb._registers)
+        self.assertIsNone(pcb._open_files)
+
+        pcb.page_table[0] = 'pte'
+        pcb.open_files.append('f')
+        self.assertEqual(pcb.page_table, {0: 'pte'})
+        self.assertEqual(pcb.open_files, ['f'])
+        self.assertEqual(pcb.registers, {})
+
+    def test_containers_can_be_replaced(self):
+        """Test the lazy containers still accept assignment"""
+        pcb = PCB("P", 8192, 4096)
+        pcb.page_table = {1: 'pte'}
+        pcb.registers = {'ax': 1}
+        self.assertEqual(pcb.page_table[1], 'pte')
+        self.assertEqual(pcb.registers['ax'], 1)
+        self.assertEqual(pcb.num_pages_required, 2)
+
+    def test_slots(self):
+        """Test PCBs carry no per-instance __dict__"""
+        pcb = PCB("P", 0, 4096)
+        self.assertFalse(hasattr(pcb, '__dict__'))
+        with self.assertRaises(AttributeError):
+            pcb.unknown_field = 1
+
+
+class TestPidAllocator(unittest.TestCase):
+
+    def test_fresh_pids_are_sequential(self):
+        """Test PIDs count up from 1 until pid_max"""
+        pids = PidAllocator(pid_max=3)
+        self.assertEqual([pids.allocate() for _ in range(3)], [1, 2, 3])
+        with self.assertRaises(RuntimeError):
+            pids.allocate()
+
+    def test_released_pids_are_recycled_cyclically(self):
+        """Test freed PIDs are reused only after the fresh range runs out, in cyclic order"""
+        pids = PidAllocator(pid_max=5)
+        for _ in range(5):
+            pids.allocate()
+        pids.release(4)
+        pids.release(2)
+        self.assertEqual(pids.free_count(), 2)
+        self.assertEqual(pids.allocate(), 2)
+        pids.release(1)
+        self.assertEqual(pids.allocate(), 4)  # Resumes after the last recycled PID
+        self.assertEqual(pids.allocate(), 1)  # Then wraps around
+        with self.assertRaises(RuntimeError):
+            pids.allocate()
+
+    def test_recycling_across_pages(self):
+        """Test the free bitmap spans several pages"""
+        pids = PidAllocator(pid_max=10000)
+        for _ in range(10000):
+            pids.allocate()
+        for pid in (9000, 5000, 3):
+            pids.release(pid)
+        self.assertEqual([pids.allocate() for _ in range(3)], [3, 5000, 9000])
+
+    def test_invalid_release(self):
+        """Test double frees and out-of-range PIDs are rejected"""
+        pids = PidAllocator(pid_max=10)
+        pid = pids.allocate()
+        pids.release(pid)
+        with self.assertRaises(ValueError):
+            pids.release(pid)
+        with self.assertRaises(ValueError):
+            pids.release(11)
+
+    def test_threads_never_share_a_pid(self):
+        """Test concurrent allocation hands out unique PIDs"""
+        pids = PidAllocator(pid_max=2000)
+        for pid in range(1, 2001):
+            self.assertEqual(pids.allocate(), pid)
+        for pid in range(1, 2001):
+            pids.release(pid)
+        results = []
+
+        def worker():
+            results.append([pids.allocate() for _ in range(250)])
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        allocated = [pid for chunk in results for pid in chunk]
+        self.assertEqual(sorted(allocated), list(range(1, 2001)))
+
+    def test_simulations_have_separate_namespaces(self):
+        """Test two simulations in one interpreter both start at PID 1"""
+        first = SchedulerSimulation(FIFOScheduler())
+        second = SchedulerSimulation(FIFOScheduler())
+        self.assertEqual(first.add_process("A", 1).pid, 1)
+        self.assertEqual(second.add_process("B", 1).pid, 1)
+        self.assertEqual(first.add_process("C", 1).pid, 2)
+
+    def test_reaped_pids_are_reused(self):
+        """Test a simulation that drops finished processes recycles their PIDs"""
+        sim = SchedulerSimulation(FIFOScheduler(), keep_finished=False, pids=PidAllocator(pid_max=4))
+        sim.run((f"P{i}", 1, i) for i in range(20))
+        self.assertEqual(sim.pids.free_count(), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
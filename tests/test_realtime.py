@@ -0,0 +1,98 @@
+import unittest
+from os_core.realtime import (RealTimeTask, release_jobs, schedulability, liu_layland_bound, utilization,
+                              DeadlineMonitor)
+from os_core.scheduler import EDFScheduler, RateMonotonicScheduler, FIFOScheduler
+from os_core.simulation import SchedulerSimulation
+from os_core.process import PCB
+
+
+class TestRealTime(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        PCB.reset_pid_counter()
+        # U = 0.958: above the RM bound for 3 tasks, so only EDF meets every deadline
+        self.tasks = [RealTimeTask('A', 1, 4), RealTimeTask('B', 2, 6), RealTimeTask('C', 3, 8)]
+
+    def _run(self, scheduler, tasks, horizon):
+        monitor = DeadlineMonitor()
+        sim = SchedulerSimulation(scheduler, observers=[monitor])
+        sim.run(release_jobs(tasks, horizon, pids=sim.pids))
+        return monitor.summary(sim.time)
+
+    def test_release_jobs(self):
+        """Test periodic releases carry absolute deadlines and arrive in order"""
+        jobs = list(release_jobs([RealTimeTask('A', 1, 4), RealTimeTask('B', 2, 6, deadline=5)], 12))
+
+        self.assertEqual([(job.name, job.arrival_time) for job in jobs],
+                         [('A#0', 0), ('B#0', 0), ('A#1', 4), ('B#1', 6), ('A#2', 8)])
+        self.assertEqual(jobs[3].absolute_deadline, 11)
+        self.assertEqual((jobs[3].period, jobs[3].wcet, jobs[3].burst_time), (6, 2, 2))
+
+    def test_sporadic_release_respects_minimum_gap(self):
+        """Test sporadic jobs are at least one period apart"""
+        task = RealTimeTask('S', 1, 5, sporadic=True, jitter=4, bcet=1)
+        arrivals = [job.arrival_time for job in release_jobs([task], 500, seed=3)]
+        gaps = [b - a for a, b in zip(arrivals, arrivals[1:])]
+        self.assertTrue(all(5 <= gap <= 9 for gap in gaps))
+        self.assertGreater(len(set(gaps)), 1)
+
+    def test_edf_meets_all_deadlines(self):
+        """Test EDF schedules a feasible task set (U <= 1) without misses"""
+        summary = self._run(EDFScheduler(), self.tasks, 24)
+        self.assertEqual(summary['released'], 13)
+        self.assertEqual(summary['misses'], 0)
+        self.assertLess(summary['lateness']['max'], 0)
+
+    def test_rm_misses_above_bound(self):
+        """Test RM misses a deadline of the longest-period task"""
+        summary = self._run(RateMonotonicScheduler(), self.tasks, 24)
+        self.assertEqual(summary['misses'], 1)
+        self.assertEqual(summary['misses_by_task'], {'C': 1})
+        self.assertEqual(summary['tardiness']['max'], 2)
+
+    def test_rm_preempts_longer_period(self):
+        """Test a released short-period job preempts a long-period one under RM"""
+        scheduler = RateMonotonicScheduler()
+        short, long = PCB("S", 0, 4096), PCB("L", 0, 4096)
+        short.period, long.period = 4, 10
+        self.assertTrue(scheduler.should_preempt(long, short))
+        self.assertFalse(scheduler.should_preempt(short, long))
+
+    def test_overdue_jobs_count_as_misses(self):
+        """Test jobs still running past their deadline show up before they finish"""
+        monitor = DeadlineMonitor()
+        sim = SchedulerSimulation(FIFOScheduler(), observers=[monitor])
+        sim.load_workload(release_jobs([RealTimeTask('A', 3, 4), RealTimeTask('B', 3, 4)], 4, pids=sim.pids))
+        for _ in range(5):
+            sim.step()
+        self.assertEqual(monitor.summary(sim.time)['overdue'], 1)
+
+    def test_schedulability(self):
+        """Test the utilization bounds and response-time analysis"""
+        self.assertAlmostEqual(liu_layland_bound(3), 0.7798, places=4)
+        self.assertAlmostEqual(utilization(self.tasks), 23 / 24)
+
+        edf = schedulability(self.tasks, 'EDF')
+        rm = schedulability(self.tasks, 'RM')
+        self.assertTrue(edf['schedulable'])
+        self.assertFalse(rm['passes_bound'])
+        self.assertFalse(rm['schedulable'])
+        self.assertEqual(rm['response_times'], {'A': 1, 'B': 3, 'C': None})
+
+        # Harmonic periods are RM-schedulable up to U = 1 even above the bound
+        harmonic = [RealTimeTask('A', 1, 2), RealTimeTask('B', 2, 4)]
+        self.assertTrue(schedulability(harmonic, 'RM')['schedulable'])
+        with self.assertRaises(ValueError):
+            schedulability(harmonic, 'LLF')
+
+    def test_task_validation(self):
+        """Test impossible tasks are rejected"""
+        with self.assertRaises(ValueError):
+            RealTimeTask('X', 5, 10, deadline=4)
+        with self.assertRaises(ValueError):
+            RealTimeTask('X', 0, 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import os
+import tempfile
+import unittest
+from os_core.replay import EventRecorder, read_log, decisions, diff_decisions, replay
+from os_core.scheduler import RoundRobinScheduler, MLFQScheduler, FIFOScheduler
+from os_core.simulation import SchedulerSimulation
+from os_core.workload import WorkloadGenerator
+
+
+class TestReplay(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _record(self, name, scheduler, workload, **options):
+        path = os.path.join(self.tmpdir.name, name)
+        sim = SchedulerSimulation(scheduler, **options)
+        with EventRecorder(path).attach(sim):
+            result = sim.run(workload)
+        return path, result
+
+    def _workload(self):
+        return WorkloadGenerator(seed=5, arrival_rate=0.3, io_probability=0.5).generate(150)
+
+    def test_replay_reproduces_timeline(self):
+        """Test replaying a log rebuilds the exact timeline and metrics"""
+        for name, scheduler, options in (('rr', RoundRobinScheduler(3), {'context_switch_cost': 1}),
+                                         ('mlfq', MLFQScheduler(boost_interval=40), {'cache_penalty': 2})):
+            path, result = self._record(name, scheduler, self._workload(), **options)
+            replayed = replay(path)
+
+            self.assertEqual(replayed['timeline'], result['timeline'])
+            self.assertEqual(replayed['processes'], result['processes'])
+            self.assertEqual(replayed['time'], result['time'])
+
+    def test_log_records(self):
+        """Test the log holds arrivals, decisions and transitions in order"""
+        path, _ = self._record('fifo', FIFOScheduler(), [("A", 2, 0), ("B", 1, 1)])
+
+        self.assertEqual(list(read_log(path)), [
+            ('arrive', 0, 1, ('A', 2)), ('dispatch', 0, 1, (2, 0)), ('arrive', 1, 2, ('B', 1)),
+            ('exit', 2, 1, None), ('dispatch', 2, 2, (1, 0)), ('exit', 3, 2, None), ('end', 3, 0, None),
+        ])
+        self.assertEqual(list(decisions(path)), [(0, 1, 2), (2, 2, 1)])
+
+    def test_recording_again_replaces_the_log(self):
+        """Test a second run recorded to the same path does not append to the first"""
+        workload = [("A", 3, 0), ("B", 2, 0)]
+        path, _ = self._record('again', RoundRobinScheduler(2), workload)
+        first = list(read_log(path))
+        _, result = self._record('again', RoundRobinScheduler(2), workload)
+
+        self.assertEqual(list(read_log(path)), first)
+        self.assertEqual(replay(path)['timeline'], result['timeline'])
+
+    def test_diff_decisions(self):
+        """Test two policies are compared decision by decision"""
+        workload = [("A", 4, 0), ("B", 4, 0)]
+        rr2, _ = self._record('rr2', RoundRobinScheduler(2), workload)
+        rr4, _ = self._record('rr4', RoundRobinScheduler(4), workload)
+        same, _ = self._record('same', RoundRobinScheduler(2), workload)
+
+        self.assertEqual(list(diff_decisions(rr2, same)), [])
+        first = next(diff_decisions(rr2, rr4))
+        self.assertEqual(first, (0, (0, 1, 2), (0, 1, 4)))
+        self.assertEqual(len(list(diff_decisions(rr2, rr4, limit=2))), 2)
+        # The shorter log runs out of decisions
+        self.assertIsNone(list(diff_decisions(rr2, rr4))[-1][2])
+
+    def test_truncated_log(self):
+        """Test a torn final record is reported"""
+        path, _ = self._record('torn', FIFOScheduler(), [("A", 2, 0)])
+        with open(path, 'r+b') as f:
+            f.truncate(os.path.getsize(path) - 3)
+        with self.assertRaises(ValueError):
+            list(read_log(path))
+        with open(path, 'wb') as f:
+            f.write(b"garbage")
+        with self.assertRaises(ValueError):
+            list(read_log(path))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,9 @@
 import unittest
-from os_core.scheduler import Scheduler, FIFOScheduler, RoundRobinScheduler, MLFQScheduler
+from collections import Counter
+from os_core.scheduler import (Scheduler, FIFOScheduler, RoundRobinScheduler, MLFQScheduler, SJFScheduler,
+                               SRTFScheduler, PriorityScheduler, LotteryScheduler, StrideScheduler, CFSScheduler,
+                               GroupScheduler)
+from os_core.simulation import SchedulerSimulation
 from os_core.process import PCB
 
 
@@ -20,6 +24,16 @@ class TestScheduler(unittest.TestCase):
         with self.assertRaises(TypeError):
             Scheduler()  # Should not be able to instantiate abstract class
 
+        class Partial(Scheduler):
+            def add_process(self, pcb):
+                pass
+
+            def get_next(self):
+                return None, None
+
+        with self.assertRaises(TypeError):
+            Partial()  # remove_process and ready_processes are required too
+
     def test_fifo_scheduler_initialization(self):
         """Test FIFO scheduler initialization"""
         scheduler = FIFOScheduler()
@@ -272,6 +286,294 @@ class TestScheduler(unittest.TestCase):
             if next_pcb:  # MLFQ might have different interface
                 self.assertEqual(next_pcb.state, 'RUNNING')
 
+    def test_sjf_scheduler_shortest_first(self):
+        """Test SJF picks the shortest remaining burst first"""
+        scheduler = SJFScheduler()
+        for name, burst in (("Long", 9), ("Short", 2), ("Mid", 5)):
+            scheduler.add_process(self.create_test_pcb(name, burst_time=burst))
+
+        order = [scheduler.get_next()[0].name for _ in range(3)]
+        self.assertEqual(order, ["Short", "Mid", "Long"])
+        self.assertEqual(scheduler.get_next(), (None, None))
+
+    def test_heap_scheduler_lazy_removal(self):
+        """Test removed processes are skipped without being returned"""
+        scheduler = SJFScheduler()
+        pcb1 = self.create_test_pcb("P1", burst_time=1)
+        pcb2 = self.create_test_pcb("P2", burst_time=2)
+        scheduler.add_process(pcb1)
+        scheduler.add_process(pcb2)
+
+        self.assertTrue(scheduler.remove_process(pcb1))
+        self.assertFalse(scheduler.remove_process(pcb1))
+        self.assertEqual(len(scheduler), 1)
+        self.assertIs(scheduler.get_next()[0], pcb2)
+
+    def test_srtf_preempts_longer_job(self):
+        """Test SRTF preempts the running process when a shorter one arrives"""
+        sim = SchedulerSimulation(SRTFScheduler())
+        result = sim.run([("Long", 6, 0), ("Short", 2, 1)])
+
+        self.assertEqual(result['timeline'], [(1, 0, 1), (2, 1, 3), (1, 3, 8)])
+
+    def test_priority_scheduler_order(self):
+        """Test lower priority values run first"""
+        scheduler = PriorityScheduler()
+        scheduler.add_process(self.create_test_pcb("Low", priority=5))
+        scheduler.add_process(self.create_test_pcb("High", priority=0))
+
+        self.assertEqual(scheduler.get_next()[0].name, "High")
+
+    def test_lottery_scheduler_proportional_share(self):
+        """Test lottery draws are proportional to tickets"""
+        scheduler = LotteryScheduler(seed=7)
+        rich = self.create_test_pcb("Rich")
+        poor = self.create_test_pcb("Poor")
+        scheduler.add_process(rich, tickets=900)
+        scheduler.add_process(poor, tickets=100)
+
+        wins = 0
+        for _ in range(2000):
+            pcb, _ = scheduler.get_next()
+            wins += pcb is rich
+            scheduler.add_process(pcb)
+        self.assertGreater(wins, 1650)
+        self.assertLess(wins, 1950)
+
+    def test_lottery_scheduler_many_processes(self):
+        """Test the Fenwick tree grows and reuses slots"""
+        scheduler = LotteryScheduler(seed=1)
+        pcbs = [self.create_test_pcb(f"P{i}") for i in range(100)]
+        for pcb in pcbs:
+            scheduler.add_process(pcb)
+        drawn = {scheduler.get_next()[0].pid for _ in range(100)}
+
+        self.assertEqual(drawn, {pcb.pid for pcb in pcbs})
+        self.assertEqual(scheduler.get_next(), (None, None))
+
+    def test_stride_scheduler_share(self):
+        """Test stride scheduling gives CPU time in proportion to tickets"""
+        sim = SchedulerSimulation(StrideScheduler(time_quantum=1))
+        a = sim.add_process("A", 1000)
+        b = sim.add_process("B", 1000)
+        sim.scheduler.tickets[a.pid] = 300
+        sim.scheduler.tickets[b.pid] = 100
+        for _ in range(400):
+            sim.step()
+
+        self.assertAlmostEqual(1000 - a.remaining_time, 300, delta=2)
+        self.assertAlmostEqual(1000 - b.remaining_time, 100, delta=2)
+
+    def test_cfs_scheduler_weights(self):
+        """Test CFS favours lower nice values"""
+        sim = SchedulerSimulation(CFSScheduler())
+        fast = sim.add_process("Nice0", 1000, priority=0)
+        slow = sim.add_process("Nice5", 1000, priority=5)
+        for _ in range(600):
+            sim.step()
+
+        used_fast = 1000 - fast.remaining_time
+        used_slow = 1000 - slow.remaining_time
+        self.assertAlmostEqual(used_fast / used_slow, 1024 / 335, delta=0.4)
+
+    def test_mlfq_level_tracking_with_equal_quanta(self):
+        """Test MLFQ demotes correctly even when levels share a quantum"""
+        scheduler = MLFQScheduler(levels=3, time_quanta=[4, 4, 4])
+        pcb = self.create_test_pcb("P1")
+        scheduler.add_process(pcb)
+
+        for expected_level in (1, 2, 2):
+            scheduler.get_next()
+            scheduler.requeue(pcb, 4, True)
+            self.assertEqual(scheduler.get_level(pcb), expected_level)
+            self.assertEqual(len(scheduler.queues[expected_level]), 1)
+
+    def test_mlfq_anti_gaming_allotment(self):
+        """Test yielding just before the quantum ends still leads to demotion"""
+        scheduler = MLFQScheduler(levels=2, time_quanta=[5, 10])
+        pcb = self.create_test_pcb("Gamer")
+        scheduler.add_process(pcb)
+
+        scheduler.get_next()
+        scheduler.requeue(pcb, 4, False)
+        self.assertEqual(scheduler.get_level(pcb), 0)
+        scheduler.get_next()
+        scheduler.requeue(pcb, 4, False)
+        self.assertEqual(scheduler.get_level(pcb), 1)
+
+    def test_mlfq_priority_boost(self):
+        """Test the periodic boost moves every process back to the top queue"""
+        scheduler = MLFQScheduler(levels=3, boost_interval=10)
+        low = self.create_test_pcb("Low")
+        mid = self.create_test_pcb("Mid")
+        scheduler.add_process(low, level=2)
+        scheduler.add_process(mid, level=1)
+
+        for _ in range(10):
+            scheduler.tick()
+        self.assertEqual(scheduler.boosts, 1)
+        self.assertEqual([p.name for p in scheduler.queues[0]], ["Mid", "Low"])
+        self.assertEqual(scheduler.get_level(low), 0)
+
+    def test_mlfq_aging(self):
+        """Test a long-waiting process is promoted one level"""
+        scheduler = MLFQScheduler(levels=3, aging_threshold=5)
+        pcb = self.create_test_pcb("Starved")
+        scheduler.add_process(pcb, level=2)
+
+        for _ in range(5):
+            scheduler.tick()
+        self.assertEqual(scheduler.get_level(pcb), 1)
+        for _ in range(5):
+            scheduler.tick()
+        self.assertEqual(scheduler.get_level(pcb), 0)
+
+    def test_mlfq_boost_prevents_starvation(self):
+        """Test a demoted batch job still runs while interactive jobs keep arriving"""
+        sim = SchedulerSimulation(MLFQScheduler(levels=2, time_quanta=[2, 4], boost_interval=20))
+        batch = sim.add_process("Batch", 10)
+        sim.run([(f"I{i}", 2, t) for i, t in enumerate(range(3, 200, 2))], max_time=200)
+
+        self.assertEqual(batch.state, 'TERMINATED')
+
+    def test_queue_string_truncation_and_paging(self):
+        """Test truncated queue rendering with "... N more" and pages"""
+        scheduler = RoundRobinScheduler()
+        for i in range(10):
+            scheduler.add_process(self.create_test_pcb(f"P{i}", burst_time=1))
+
+        first = scheduler.get_all_queues_str_list(max_items=3)[0]
+        self.assertEqual(first, "RR: P0(1) -> P1(1) -> P2(1) ... 7 more")
+        last = scheduler.get_all_queues_str_list(max_items=3, page=3)[0]
+        self.assertEqual(last, "RR: ... 9 earlier -> P9(1)")
+        clamped = scheduler.get_all_queues_str_list(max_items=3, page=99)[0]
+        self.assertEqual(clamped, last)
+
+    def test_queue_string_cache_invalidation(self):
+        """Test cached renderings are reused until the queue changes"""
+        scheduler = MLFQScheduler(levels=2, time_quanta=[3, 6])
+        scheduler.add_process(self.create_test_pcb("P1", burst_time=5))
+
+        first = scheduler.get_all_queues_str_list()
+        self.assertIs(scheduler.get_all_queues_str_list()[0], first[0])
+        scheduler.add_process(self.create_test_pcb("P2", burst_time=8))
+        self.assertIn("P2(8)", scheduler.get_all_queues_str_list()[0])
+        scheduler.get_next()
+        self.assertNotIn("P1(5)", scheduler.get_all_queues_str_list()[0])
+
+    def test_heap_queue_string_in_key_order(self):
+        """Test heap-backed schedulers render their queue in scheduling order"""
+        scheduler = SJFScheduler()
+        for name, burst in (("C", 9), ("A", 1), ("B", 4)):
+            scheduler.add_process(self.create_test_pcb(name, burst_time=burst))
+
+        self.assertEqual(scheduler.get_all_queues_str_list(max_items=2)[0], "SJF: A(1) -> B(4) ... 1 more")
+
+    def test_scheduler_summary(self):
+        """Test the cheap length/summary API"""
+        scheduler = MLFQScheduler(levels=3)
+        scheduler.add_process(self.create_test_pcb("P1"), level=0)
+        scheduler.add_process(self.create_test_pcb("P2"), level=2)
+
+        self.assertEqual(len(scheduler), 2)
+        self.assertEqual(scheduler.summary(), {'ready': 2, 'queues': [1, 0, 1]})
+
+    def _cpu_time(self, sim):
+        used = Counter()
+        for pid, start, end in sim.timeline:
+            used[pid] += end - start
+        return used
+
+    def _group_sim(self, groups):
+        """Builds a GroupScheduler simulation with CPU-bound processes per group."""
+        scheduler = GroupScheduler()
+        sim = SchedulerSimulation(scheduler)
+        members = {}
+        for name, options, count in groups:
+            group = scheduler.create_group(name, **options)
+            members[name] = []
+            for i in range(count):
+                pcb = sim.add_process(f"{name}{i}", 1000)
+                scheduler.assign(pcb, group)
+                members[name].append(pcb.pid)
+        return scheduler, sim, members
+
+    def test_group_shares_split_cpu(self):
+        """Test groups get CPU in proportion to their shares"""
+        scheduler, sim, members = self._group_sim([('a', {'shares': 2048}, 2), ('b', {'shares': 1024}, 2)])
+        sim.run(max_time=300)
+        used = self._cpu_time(sim)
+
+        self.assertEqual(sum(used[pid] for pid in members['a']), 200)
+        self.assertEqual(sum(used[pid] for pid in members['b']), 100)
+
+    def test_group_isolates_process_count(self):
+        """Test a group with many processes does not crowd out a group with one"""
+        scheduler, sim, members = self._group_sim([('solo', {}, 1), ('crowd', {}, 4)])
+        sim.run(max_time=400)
+        used = self._cpu_time(sim)
+
+        self.assertAlmostEqual(used[members['solo'][0]], 200, delta=8)
+        self.assertAlmostEqual(sum(used[pid] for pid in members['crowd']), 200, delta=8)
+
+    def test_group_quota_throttles(self):
+        """Test a group is throttled after using its quota each period"""
+        scheduler, sim, members = self._group_sim([('limited', {'quota': 20, 'period': 100}, 1)])
+        sim.run(max_time=300)
+        used = self._cpu_time(sim)
+
+        self.assertEqual(used[members['limited'][0]], 60)
+        self.assertEqual(used[None], 240)
+        self.assertEqual(scheduler.groups['limited'].throttle_count, 3)
+
+    def test_group_quota_leaves_cpu_to_others(self):
+        """Test a throttled group's idle share goes to unthrottled groups"""
+        scheduler, sim, members = self._group_sim([('limited', {'quota': 10, 'period': 50}, 2), ('free', {}, 1)])
+        sim.run(max_time=200)
+        used = self._cpu_time(sim)
+
+        self.assertEqual(sum(used[pid] for pid in members['limited']), 40)
+        self.assertEqual(used[members['free'][0]], 160)
+
+    def test_nested_groups(self):
+        """Test a parent's quota caps the combined use of its subgroups"""
+        scheduler = GroupScheduler()
+        sim = SchedulerSimulation(scheduler)
+        tenant = scheduler.create_group('tenant', quota=30, period=100)
+        for name in ('web', 'batch'):
+            scheduler.create_group(name, parent='tenant')
+            pcb = sim.add_process(name, 1000)
+            scheduler.assign(pcb, name)
+        sim.run(max_time=99)
+        used = self._cpu_time(sim)
+
+        self.assertEqual(used[1] + used[2], 30)
+        self.assertAlmostEqual(used[1], used[2], delta=4)
+        self.assertTrue(tenant.throttled)
+        self.assertEqual(scheduler.queue_lengths(), [0, 0, 1, 1])
+        self.assertTrue(scheduler.get_all_queues_str_list()[1].startswith("tenant (1024, throttled): ["))
+
+        sim.run(max_time=101)  # The next period lifts the throttle
+        self.assertFalse(tenant.throttled)
+
+    def test_group_scheduler_remove_and_reassign(self):
+        """Test queued processes can move between groups or leave"""
+        scheduler = GroupScheduler()
+        scheduler.create_group('g')
+        a, b = self.create_test_pcb("A"), self.create_test_pcb("B")
+        scheduler.add_process(a)
+        scheduler.add_process(b)
+        scheduler.assign(a, 'g')
+
+        self.assertEqual(len(scheduler), 2)
+        self.assertEqual(scheduler.queue_lengths(), [1, 1])
+        self.assertTrue(scheduler.remove_process(b))
+        self.assertFalse(scheduler.remove_process(b))
+        self.assertEqual(scheduler.get_next()[0], a)
+        self.assertEqual(scheduler.get_next(), (None, None))
+        with self.assertRaises(ValueError):
+            scheduler.create_group('g')
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
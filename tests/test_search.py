@@ -0,0 +1,91 @@
+import fnmatch
+import random
+import unittest
+from os_core.search import MetadataIndex, extension
+
+
+class TestMetadataIndex(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        rng = random.Random(9)
+        words = ['Report', 'photo', 'data', 'notes', 'backup']
+        exts = ['txt', 'PY', 'jpg', 'tar.gz', '']
+        self.entries = []
+        for i in range(2000):
+            name = f"{rng.choice(words)}_{i}" + (f".{rng.choice(exts)}" if i % 7 else '')
+            self.entries.append((f"/d{i % 13}/{name}", False, rng.randrange(100000), float(rng.randrange(10 ** 6))))
+        self.entries += [(f"/d{i}", True, 0, 0.0) for i in range(13)]
+        self.index = MetadataIndex(self.entries)
+
+    def brute_force(self, name=None, ext=None, kind=None, min_size=None, max_size=None, after=None, before=None,
+                    path='/'):
+        results = []
+        for entry_path, is_dir, size, mtime in self.entries:
+            entry_name = entry_path.rsplit('/', 1)[-1]
+            if not entry_path.startswith(path.rstrip('/') + '/'):
+                continue
+            if name is not None and not (fnmatch.fnmatchcase(entry_name, name) if any(c in name for c in '*?[')
+                                         else name.lower() in entry_name.lower()):
+                continue
+            if ext is not None and (is_dir or extension(entry_name) != ext.lower().lstrip('.')):
+                continue
+            if kind is not None and kind != ('d' if is_dir else 'f'):
+                continue
+            if (min_size is not None or max_size is not None) and (is_dir or size < (min_size or 0)
+                                                                   or (max_size is not None and size > max_size)):
+                continue
+            if (after is not None and mtime < after) or (before is not None and mtime > before):
+                continue
+            results.append(entry_path)
+        return sorted(results)
+
+    def test_queries_match_brute_force(self):
+        """Test every kind of filter, alone and combined, returns exactly the matching paths"""
+        queries = [
+            dict(name='report_1'), dict(name='PHOTO'), dict(name='_1?3.*'), dict(name='[dn]ot*'), dict(name='_9'),
+            dict(name='*.jpg', min_size=50000), dict(ext='py'), dict(ext='.GZ', path='/d3'), dict(ext=''),
+            dict(min_size=99000), dict(max_size=10, kind='f'), dict(after=990000), dict(before=5000, ext='txt'),
+            dict(kind='d'), dict(path='/d1'), dict(name='d1', kind='d'), dict(name='missing'),
+        ]
+        for query in queries:
+            with self.subTest(query=query):
+                self.assertEqual(self.index.search(**query), self.brute_force(**query))
+
+    def test_incremental_updates(self):
+        """Test add replaces a path's metadata and remove_tree drops a whole subtree"""
+        self.index.add('/d1/new.md', False, 123, 5.0)
+        self.assertEqual(self.index.search(ext='md'), ['/d1/new.md'])
+        self.index.add('/d1/new.md', False, 999999, 5.0)
+        self.assertEqual(self.index.search(min_size=999999), ['/d1/new.md'])
+        self.assertEqual(self.index.search(max_size=123, ext='md'), [])
+
+        self.index.remove_tree('/d1')
+        self.assertEqual(self.index.search(path='/d1'), [])
+        self.assertNotIn('/d1', self.index)
+        self.assertNotIn('/d10', self.index.search(kind='d', path='/d1'))
+        self.assertIn('/d10', self.index)
+        self.entries = [entry for entry in self.entries if not entry[0].startswith('/d1/') and entry[0] != '/d1']
+        self.assertEqual(len(self.index), len(self.entries))
+        self.assertEqual(self.index.search(name='report'), self.brute_force(name='report'))
+
+    def test_bulk_updates_keep_sorted_indexes(self):
+        """Test large batches give the same answers as one path at a time"""
+        extra = [(f"/bulk/file{i}.log", False, i, float(i)) for i in range(1000)]
+        self.index.update(extra)
+        self.entries += extra
+        query = dict(ext='log', min_size=10, max_size=19)
+        self.assertEqual(self.index.search(**query), self.brute_force(**query))
+        self.index.remove_tree('/bulk')
+        self.assertEqual(self.index.search(ext='log'), [])
+        self.assertEqual(self.index._sizes, sorted(self.index._sizes))
+
+    def test_extension(self):
+        """Test extensions are lower-cased and hidden files have none"""
+        self.assertEqual(extension('a.tar.GZ'), 'gz')
+        self.assertEqual(extension('.bashrc'), '')
+        self.assertEqual(extension('Makefile'), '')
+
+
+if __name__ == '__main__':
+    unittest.main()
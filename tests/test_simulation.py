@@ -0,0 +1,190 @@
+import unittest
+from os_core.simulation import SchedulerSimulation, OVERHEAD
+from os_core.scheduler import FIFOScheduler, RoundRobinScheduler, MLFQScheduler
+from os_core.devices import IODevice
+from os_core.process import PCB
+
+
+class TestSchedulerSimulation(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        PCB.reset_pid_counter()
+
+    def test_fifo_run_metrics(self):
+        """Test FIFO turnaround, waiting and response times"""
+        sim = SchedulerSimulation(FIFOScheduler())
+        result = sim.run([("A", 3, 0), ("B", 2, 0)])
+
+        self.assertEqual(result['time'], 5)
+        a, b = result['processes'][1], result['processes'][2]
+        self.assertEqual((a['turnaround'], a['waiting'], a['response']), (3, 0, 0))
+        self.assertEqual((b['turnaround'], b['waiting'], b['response']), (5, 3, 3))
+        self.assertEqual(result['averages']['waiting'], 1.5)
+        self.assertEqual(result['timeline'], [(1, 0, 3), (2, 3, 5)])
+
+    def test_round_robin_timeline(self):
+        """Test Round Robin alternates processes every quantum"""
+        sim = SchedulerSimulation(RoundRobinScheduler(time_quantum=2))
+        result = sim.run([("A", 3, 0), ("B", 3, 0)])
+
+        self.assertEqual(result['timeline'], [(1, 0, 2), (2, 2, 4), (1, 4, 5), (2, 5, 6)])
+        self.assertEqual(result['processes'][1]['completion'], 5)
+        self.assertEqual(result['processes'][2]['completion'], 6)
+
+    def test_mlfq_demotes_on_quantum_expiry(self):
+        """Test MLFQ moves a process down a level when its quantum expires"""
+        scheduler = MLFQScheduler(levels=3, time_quanta=[2, 4, 8])
+        sim = SchedulerSimulation(scheduler)
+        pcb = sim.add_process("A", 10)
+
+        sim.step()
+        self.assertEqual(sim.step(), 'expired')
+        self.assertIs(sim.running_process, pcb)
+        self.assertEqual(sim.current_time_slice, 4)
+
+    def test_late_arrival_and_idle(self):
+        """Test the CPU idles until a process arrives"""
+        sim = SchedulerSimulation(FIFOScheduler())
+        result = sim.run([("A", 2, 3)])
+
+        self.assertEqual(result['timeline'], [(None, 0, 3), (1, 3, 5)])
+        self.assertEqual(result['processes'][1]['response'], 0)
+        self.assertEqual(result['processes'][1]['turnaround'], 2)
+
+    def test_workload_is_consumed_lazily(self):
+        """Test generator workloads are only read as arrivals come due"""
+        pulled = []
+
+        def workload():
+            for i in range(3):
+                pulled.append(i)
+                yield (f"P{i}", 1, i * 10)
+
+        sim = SchedulerSimulation(FIFOScheduler())
+        sim.load_workload(workload())
+        sim.step()
+        self.assertEqual(pulled, [0, 1])
+        sim.run()
+        self.assertEqual(len(sim.processes), 3)
+
+    def test_set_scheduler_keeps_processes(self):
+        """Test switching scheduler mid-run re-queues live processes"""
+        sim = SchedulerSimulation(FIFOScheduler())
+        sim.add_process("A", 4)
+        sim.add_process("B", 4)
+        sim.step()
+
+        sim.set_scheduler(RoundRobinScheduler(time_quantum=1))
+        self.assertIsNone(sim.running_process)
+        self.assertEqual(len(sim.scheduler.ready_queue), 2)
+        result = sim.run()
+        self.assertEqual(len(result['processes']), 2)
+
+    def test_set_scheduler_leaves_blocked_processes_to_io(self):
+        """Test switching scheduler while a process waits on I/O does not dispatch it early"""
+        sim = SchedulerSimulation(RoundRobinScheduler(time_quantum=2))
+        a = sim.add_process("A", 4, bursts=[2, 10, 2])
+        sim.add_process("B", 20)
+        for _ in range(3):
+            sim.step()
+        self.assertEqual(a.state, 'WAITING')
+
+        sim.set_scheduler(FIFOScheduler())
+        self.assertNotIn(a, list(sim.scheduler.ready_processes()))
+        result = sim.run()
+        self.assertEqual(len(result['processes']), 2)
+        self.assertIsNotNone(a.completion_time)
+        self.assertEqual(a.io_time, 10)
+
+    def test_max_time(self):
+        """Test run stops at max_time"""
+        sim = SchedulerSimulation(FIFOScheduler())
+        result = sim.run([("A", 100, 0)], max_time=10)
+        self.assertEqual(result['time'], 10)
+        self.assertEqual(result['processes'], {})
+
+    def test_io_burst_blocks_and_wakes(self):
+        """Test a process waits on I/O while another uses the CPU"""
+        sim = SchedulerSimulation(FIFOScheduler())
+        io_bound = sim.add_process("IO", 0, bursts=[2, 3, 1])
+        cpu_bound = sim.add_process("CPU", 4)
+
+        sim.step()
+        self.assertEqual(sim.step(), 'blocked')
+        self.assertEqual(io_bound.state, 'WAITING')
+        result = sim.run()
+
+        self.assertEqual(result['timeline'], [(1, 0, 2), (2, 2, 6), (1, 6, 7)])
+        metrics = result['processes'][io_bound.pid]
+        self.assertEqual((metrics['io'], metrics['waiting'], metrics['turnaround']), (3, 1, 7))
+        self.assertEqual(result['devices']['disk']['completed'], 1)
+        self.assertEqual(cpu_bound.state, 'TERMINATED')
+
+    def test_cpu_idles_while_all_blocked(self):
+        """Test the CPU idles while the only process is on I/O"""
+        sim = SchedulerSimulation(RoundRobinScheduler(time_quantum=5))
+        result = sim.run([("A", 0, 0, 0, (1, 2, 1))])
+
+        self.assertEqual(result['timeline'], [(1, 0, 1), (None, 1, 3), (1, 3, 4)])
+
+    def test_mlfq_keeps_level_of_io_bound_process(self):
+        """Test an I/O-bound process that yields before its quantum stays on top"""
+        scheduler = MLFQScheduler(levels=3, time_quanta=[4, 8, 16])
+        sim = SchedulerSimulation(scheduler)
+        interactive = sim.add_process("I", 0, bursts=[1, 2, 1, 2, 1])
+        batch = sim.add_process("B", 40)
+        sim.run(max_time=6)
+
+        self.assertEqual(scheduler.get_level(interactive), 0)
+        self.assertEqual(scheduler.get_level(batch), 1)
+
+    def test_named_devices(self):
+        """Test processes are routed to the device they name"""
+        disk, net = IODevice('disk'), IODevice('net', service_time=1)
+        sim = SchedulerSimulation(FIFOScheduler(), devices=[disk, net])
+        pcb = sim.add_process("N", 0, bursts=[1, 10, 1])
+        pcb.io_device = 'net'
+        result = sim.run()
+
+        self.assertEqual(result['devices']['net']['completed'], 1)
+        self.assertEqual(result['devices']['disk']['completed'], 0)
+        self.assertEqual(result['time'], 3)
+
+    def test_context_switch_cost(self):
+        """Test switching to a different process is charged on the clock"""
+        sim = SchedulerSimulation(RoundRobinScheduler(time_quantum=2), context_switch_cost=1)
+        result = sim.run([("A", 3, 0), ("B", 3, 0)])
+
+        self.assertEqual(result['timeline'], [(1, 0, 2), (OVERHEAD, 2, 3), (2, 3, 5), (OVERHEAD, 5, 6),
+                                              (1, 6, 7), (OVERHEAD, 7, 8), (2, 8, 9)])
+        self.assertEqual(result['overhead_time'], 3)
+
+    def test_no_switch_cost_for_same_process(self):
+        """Test a process redispatched right after its own quantum pays nothing"""
+        sim = SchedulerSimulation(RoundRobinScheduler(time_quantum=2), context_switch_cost=3, cache_penalty=3)
+        result = sim.run([("A", 6, 0)])
+        self.assertEqual(result['time'], 6)
+
+    def test_cache_penalty_scales_with_foreign_ticks(self):
+        """Test a resumed process pays to rewarm its cache after others ran"""
+        sim = SchedulerSimulation(RoundRobinScheduler(time_quantum=1), cache_penalty=4, cache_decay=4)
+        result = sim.run([("A", 2, 0), ("B", 2, 0)])
+
+        self.assertEqual(result['timeline'], [(1, 0, 1), (2, 1, 2), (OVERHEAD, 2, 3), (1, 3, 4),
+                                              (OVERHEAD, 4, 5), (2, 5, 6)])
+
+    def test_switch_cost_penalizes_small_quanta(self):
+        """Test a tiny quantum loses throughput once switches cost time"""
+        workload = [(f"P{i}", 10, 0) for i in range(5)]
+        short = SchedulerSimulation(RoundRobinScheduler(time_quantum=1), context_switch_cost=1).run(workload)
+        long = SchedulerSimulation(RoundRobinScheduler(time_quantum=5), context_switch_cost=1).run(workload)
+
+        self.assertEqual(long['time'], 50 + 9)
+        self.assertGreater(short['time'], long['time'])
+        with self.assertRaises(ValueError):
+            SchedulerSimulation(FIFOScheduler(), context_switch_cost=-1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import unittest
+from os_core.smp import SMPSimulation, percentile
+from os_core.scheduler import FIFOScheduler, RoundRobinScheduler, MLFQScheduler, CFSScheduler
+from os_core.process import PCB
+
+
+class TestSMPSimulation(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        PCB.reset_pid_counter()
+
+    def test_initial_placement_spreads_load(self):
+        """Test new processes go to the least loaded CPU"""
+        smp = SMPSimulation(FIFOScheduler, num_cpus=2)
+        for i in range(4):
+            smp.add_process(f"P{i}", 5)
+
+        self.assertEqual([cpu.load() for cpu in smp.cpus], [2, 2])
+
+    def test_parallel_speedup(self):
+        """Test two CPUs finish independent work in half the time"""
+        workload = [(f"P{i}", 10, 0) for i in range(4)]
+        single = SMPSimulation(FIFOScheduler, num_cpus=1).run(workload)
+        PCB.reset_pid_counter()
+        dual = SMPSimulation(FIFOScheduler, num_cpus=2).run(workload)
+
+        self.assertEqual(single['time'], 40)
+        self.assertEqual(dual['time'], 20)
+        self.assertEqual(dual['utilization'], 1.0)
+
+    def test_affinity_is_respected(self):
+        """Test processes pinned to a CPU never run elsewhere"""
+        smp = SMPSimulation(RoundRobinScheduler, num_cpus=2, balance_interval=1)
+        pinned = [smp.add_process(f"P{i}", 3, affinity={0}) for i in range(3)]
+        result = smp.run()
+
+        self.assertEqual(smp.migrations, 0)
+        cpu1_pids = {seg[0] for seg in result['cpus'][1]['timeline']}
+        self.assertTrue(cpu1_pids.isdisjoint({p.pid for p in pinned}))
+
+    def test_work_stealing(self):
+        """Test an idle CPU steals queued work from a busy one"""
+        smp = SMPSimulation(FIFOScheduler, num_cpus=2, balance_interval=0, migration_cost=0)
+        pcbs = [smp.add_process(f"P{i}", 4, affinity={0}) for i in range(3)]
+        for pcb in pcbs:
+            pcb.affinity = None
+        result = smp.run()
+
+        self.assertGreaterEqual(smp.steals, 1)
+        self.assertLess(result['time'], 12)
+
+    def test_migration_cost_charged(self):
+        """Test a migrated process that already ran pays the migration cost"""
+        smp = SMPSimulation(RoundRobinScheduler, num_cpus=2, migration_cost=2, balance_interval=0,
+                            work_stealing=False)
+        pcb = smp.add_process("A", 6)
+        smp.step()
+        smp.cpus[0]._preempt()
+
+        self.assertTrue(smp.migrate(pcb, 0, 1))
+        result = smp.run()
+        self.assertEqual(result['migration_overhead'], 2)
+        self.assertEqual(result['processes'][pcb.pid]['completion'], 8)
+
+    def test_migration_overhead_excludes_other_overhead(self):
+        """Test context switch ticks are reported apart from the migration cost"""
+        smp = SMPSimulation(RoundRobinScheduler, num_cpus=2, migration_cost=2, balance_interval=0,
+                            work_stealing=False, context_switch_cost=1)
+        pcb = smp.add_process("A", 6)
+        other = smp.add_process("B", 6, affinity={0})
+        smp.step()
+        smp.cpus[0]._preempt()
+
+        self.assertTrue(smp.migrate(pcb, 0, 1))
+        self.assertTrue(smp.migrate(pcb, 1, 0))  # The first charge was never paid
+        result = smp.run()
+        self.assertEqual(result['migration_overhead'], 2)
+        self.assertGreater(result['overhead_time'], result['migration_overhead'])
+        self.assertIsNotNone(result['processes'][other.pid]['completion'])
+
+    def test_migration_moves_scheduler_state(self):
+        """Test a migrated process keeps its MLFQ level and the source forgets it"""
+        smp = SMPSimulation(lambda: MLFQScheduler(levels=3, time_quanta=[1, 2, 4]), num_cpus=2,
+                            balance_interval=0, work_stealing=False)
+        pcb = smp.add_process("A", 10)
+        smp.add_process("B", 10, affinity={0})
+        smp.step()  # A uses its level 0 quantum and is demoted
+        src, dst = smp.cpus[0].scheduler, smp.cpus[1].scheduler
+        self.assertEqual(src.get_level(pcb), 1)
+
+        self.assertTrue(smp.migrate(pcb, 0, 1))
+        self.assertNotIn(pcb.pid, src.level_of)
+        self.assertEqual(dst.get_level(pcb), 1)
+
+    def test_withdraw_drops_scheduler_state(self):
+        """Test withdrawing a process leaves no per-PID state in its scheduler"""
+        smp = SMPSimulation(CFSScheduler, num_cpus=1)
+        pcb = smp.add_process("A", 10)
+        smp.add_process("B", 10)
+        cpu = smp.cpus[0]
+        self.assertIn(pcb.pid, cpu.scheduler.vruntime)
+        self.assertTrue(cpu.withdraw(pcb))
+        self.assertNotIn(pcb.pid, cpu.scheduler.vruntime)
+
+    def test_tail_latency_report(self):
+        """Test latency percentiles are reported"""
+        result = SMPSimulation(FIFOScheduler, num_cpus=2).run([(f"P{i}", 2, 0) for i in range(10)])
+        self.assertEqual(result['latency']['turnaround']['p50'], 6)
+        self.assertEqual(result['latency']['turnaround']['max'], 10)
+        self.assertEqual(percentile([1, 2, 3, 4], 99), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import os
+import tempfile
+import unittest
+from os_core.sweep import grid, run_config, sweep, rank, format_table
+from os_core.workload import WorkloadGenerator, write_trace
+
+
+class TestSweep(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.trace = os.path.join(self.tmpdir.name, "workload.trace")
+        generator = WorkloadGenerator(seed=11, arrival_rate=0.15, mean_burst=6, max_burst=60)
+        write_trace(self.trace, generator.generate(300))
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_grid_expands_every_combination(self):
+        """Test the grid is the cartesian product of the axes"""
+        configs = list(grid('MLFQ', levels=3, time_quanta=[[2, 4, 8], [3, 6, 9]], cores=[1, 2]))
+        self.assertEqual(len(configs), 4)
+        self.assertEqual(configs[0], {'scheduler': 'MLFQ', 'levels': 3, 'time_quanta': [2, 4, 8], 'cores': 1})
+
+    def test_run_config_single_and_multi_core(self):
+        """Test one config produces a metrics row on one and on several cores"""
+        single = run_config(self.trace, {'scheduler': 'RR', 'time_quantum': 4})
+        dual = run_config(self.trace, {'scheduler': 'RR', 'time_quantum': 4, 'cores': 2})
+
+        self.assertEqual(single['completed'], 300)
+        self.assertEqual(dual['completed'], 300)
+        self.assertLess(dual['waiting_mean'], single['waiting_mean'])
+        self.assertEqual(single['time_quantum'], 4)
+
+    def test_smp_axes_reach_the_simulation(self):
+        """Test load balancing options can be swept on several cores and are ignored on one"""
+        configs = list(grid('RR', time_quantum=4, cores=[1, 2], balance_interval=[0, 5], work_stealing=[False, True]))
+        rows = [run_config(self.trace, config) for config in configs]
+
+        self.assertEqual(len(rows), 8)
+        self.assertTrue(all(row['completed'] == 300 for row in rows))
+        single = [row for row in rows if row['cores'] == 1]
+        self.assertEqual(len({row['waiting_mean'] for row in single}), 1)
+        dual = {(row['balance_interval'], row['work_stealing']): row for row in rows if row['cores'] == 2}
+        self.assertLess(dual[(5, True)]['waiting_mean'], dual[(0, False)]['waiting_mean'])
+
+    def test_parallel_sweep_matches_serial(self):
+        """Test the process pool gives the same ranking as a serial run"""
+        configs = list(grid('RR', time_quantum=[1, 4, 16], context_switch_cost=1))
+        parallel = sweep(self.trace, configs, rank_by='throughput', max_workers=2)
+        serial = sweep(self.trace, configs, rank_by='throughput', max_workers=1)
+
+        self.assertEqual(parallel, serial)
+        throughputs = [row['throughput'] for row in parallel]
+        self.assertEqual(throughputs, sorted(throughputs, reverse=True))
+        # With a switch cost the tiniest quantum cannot win
+        self.assertNotEqual(parallel[0]['time_quantum'], 1)
+
+    def test_rank_and_table(self):
+        """Test ranking direction, missing values and the text table"""
+        rows = [{'scheduler': 'A', 'turnaround_mean': 5.0}, {'scheduler': 'B', 'turnaround_mean': None},
+                {'scheduler': 'C', 'turnaround_mean': 2.0}]
+        ranked = rank(rows)
+        self.assertEqual([row['scheduler'] for row in ranked], ['C', 'A', 'B'])
+
+        table = format_table(ranked, columns=['scheduler', 'turnaround_mean']).splitlines()
+        self.assertEqual(table[0].split(), ['#', 'scheduler', 'turnaround_mean'])
+        self.assertEqual(table[1].split(), ['1', 'C', '2.000'])
+        self.assertEqual(table[3].split(), ['3', 'B', '-'])
+
+
+if __name__ == '__main__':
+    unittest.main()
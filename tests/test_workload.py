@@ -0,0 +1,88 @@
+import os
+import tempfile
+import unittest
+from os_core.workload import WorkloadGenerator, write_trace, read_trace
+from os_core.simulation import SchedulerSimulation
+from os_core.scheduler import RoundRobinScheduler
+from os_core.process import PCB
+
+
+class TestWorkload(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        PCB.reset_pid_counter()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.trace_path = os.path.join(self.tmpdir.name, "workload.trace")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_deterministic_seeding(self):
+        """Test the same seed yields the same workload"""
+        first = list(WorkloadGenerator(seed=42).generate(50))
+        second = list(WorkloadGenerator(seed=42).generate(50))
+        other = list(WorkloadGenerator(seed=43).generate(50))
+
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, other)
+
+    def test_arrivals_are_ordered_and_poisson(self):
+        """Test arrivals are non-decreasing with the requested rate"""
+        records = list(WorkloadGenerator(seed=1, arrival_rate=0.5).generate(4000))
+        arrivals = [r[2] for r in records]
+
+        self.assertEqual(arrivals, sorted(arrivals))
+        self.assertAlmostEqual(len(records) / arrivals[-1], 0.5, delta=0.05)
+
+    def test_heavy_tailed_bursts(self):
+        """Test Pareto and lognormal bursts have the requested mean and a long tail"""
+        for distribution in ('pareto', 'lognormal'):
+            generator = WorkloadGenerator(seed=3, burst_distribution=distribution, mean_burst=20, pareto_alpha=2.5)
+            bursts = sorted(generator.sample_burst() for _ in range(20000))
+            mean = sum(bursts) / len(bursts)
+            self.assertAlmostEqual(mean, 20, delta=3)
+            self.assertGreater(bursts[-1], 5 * mean)
+
+    def test_io_phases(self):
+        """Test interleaved CPU/I/O phases start and end with CPU"""
+        generator = WorkloadGenerator(seed=5, io_probability=1.0, cpu_phases=(3, 3))
+        for name, burst_time, arrival, priority, phases in generator.generate(20):
+            self.assertEqual(len(phases), 5)
+            self.assertEqual(burst_time, sum(phases[0::2]))
+
+    def test_invalid_distribution(self):
+        """Test unknown burst distributions are rejected"""
+        with self.assertRaises(ValueError):
+            WorkloadGenerator(burst_distribution='uniform')
+
+    def test_trace_round_trip(self):
+        """Test records survive the columnar trace file across blocks"""
+        records = list(WorkloadGenerator(seed=9, io_probability=0.5, priority_range=(0, 7)).generate(250))
+        self.assertEqual(write_trace(self.trace_path, iter(records), block_size=64), 250)
+
+        self.assertEqual(list(read_trace(self.trace_path)), records)
+
+    def test_trace_rejects_bad_files(self):
+        """Test non-trace and truncated files raise ValueError"""
+        with open(self.trace_path, 'wb') as f:
+            f.write(b"not a trace")
+        with self.assertRaises(ValueError):
+            list(read_trace(self.trace_path))
+
+        write_trace(self.trace_path, WorkloadGenerator(seed=1).generate(10))
+        with open(self.trace_path, 'r+b') as f:
+            f.truncate(os.path.getsize(self.trace_path) - 3)
+        with self.assertRaises(ValueError):
+            list(read_trace(self.trace_path))
+
+    def test_simulation_streams_trace(self):
+        """Test a trace file can drive a simulation directly"""
+        write_trace(self.trace_path, WorkloadGenerator(seed=11, max_burst=50).generate(100))
+        result = SchedulerSimulation(RoundRobinScheduler(time_quantum=4)).run(read_trace(self.trace_path))
+
+        self.assertEqual(len(result['processes']), 100)
+
+
+if __name__ == '__main__':
+    unittest.main()